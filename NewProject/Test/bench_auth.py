@@ -0,0 +1,59 @@
+"""
+Auth overhead benchmark (run from the NewProject directory):
+
+    python Test/bench_auth.py
+
+Measures the per-request cost of turning a bearer token into verified claims:
+python-jose decode (the old path), PyJWT decode (the fast backend, if installed) and
+app.core.security.decode_token with a warm claims cache (what a repeat request pays).
+No database is needed.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from jose import jwt as jose_jwt
+
+from app.core import security
+from app.core.config import settings
+from app.schemas.token import TokenPayload
+
+ROUNDS = 20000
+
+
+def per_call(func) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func()
+    return (time.perf_counter() - start) / ROUNDS
+
+
+def report(name, seconds, baseline=None):
+    speedup = f"   speedup: x{baseline / seconds:6.1f}" if baseline else ""
+    print(f"{name:<36} {seconds * 1e6:8.2f} us/request{speedup}")
+
+
+if __name__ == "__main__":
+    token = security.create_access_token({"sub": "bench_user"})
+
+    def with_jose():
+        TokenPayload(**jose_jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]))
+
+    def with_pyjwt():
+        TokenPayload(**security.pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]))
+
+    def with_cache():
+        TokenPayload(**security.decode_token(token))
+
+    print(f"Token -> verified claims -> TokenPayload (average of {ROUNDS} calls)")
+    baseline = per_call(with_jose)
+    report("python-jose decode", baseline)
+    if security.pyjwt is not None:
+        report("PyJWT decode", per_call(with_pyjwt), baseline)
+    else:
+        print("PyJWT decode                         (not installed)")
+    security.decode_token(token)  # warm the cache
+    report("decode_token, cached claims", per_call(with_cache), baseline)
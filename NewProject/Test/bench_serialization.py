@@ -0,0 +1,103 @@
+"""
+Serialization benchmark for the list endpoints (run from the NewProject directory):
+
+    python Test/bench_serialization.py
+
+Compares, per 100 prompts, the old path (PromptWithLikeStatus.from_orm per item, then FastAPI's
+response_model validation + serialization + json.dumps) with the fast path in
+app/api/serialization.py (one precompiled TypeAdapter validate + dump_json).
+No database is needed; the ORM objects are built in memory.
+"""
+import asyncio
+import os
+import sys
+import time
+import warnings
+from datetime import datetime
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+warnings.filterwarnings("ignore")  # from_orm is deprecated in pydantic v2
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.serialization import (
+    list_response, prompts_with_like_status, PROMPT_PUBLIC_LIST, PROMPT_WITH_LIKE_STATUS_LIST,
+)
+from app.database import models
+from app.schemas.prompt import PromptPublic, PromptWithLikeStatus
+
+ITEMS = 100
+ROUNDS = 300
+
+
+def build_rows():
+    author = models.User(id=1, username="bench_user")
+    rows = []
+    for i in range(ITEMS):
+        prompt = models.Prompt(
+            id=i + 1,
+            user_id=1,
+            content=("Write a short story about a robot learning to paint. " * 8) + str(i),
+            is_public=True,
+            created_at=datetime(2025, 1, 1, 12, 0, 0),
+            updated_at=None,
+        )
+        prompt.author = author
+        rows.append((prompt, i % 3 == 0))
+    return rows
+
+
+def old_with_like_status(rows):
+    response_prompts = []
+    for db_prompt_orm, is_liked_by_user in rows:
+        prompt_with_status = PromptWithLikeStatus.from_orm(db_prompt_orm)
+        prompt_with_status.is_liked_by_user = is_liked_by_user
+        prompt_with_status.author_username = db_prompt_orm.author.username if db_prompt_orm.author else None
+        response_prompts.append(prompt_with_status)
+    return response_prompts
+
+
+async def time_old(field, make_content):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        content = await serialize_response(field=field, response_content=make_content())
+        body = JSONResponse(content).body
+    return (time.perf_counter() - start) / ROUNDS, body
+
+
+def time_new(make_response):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        body = make_response().body
+    return (time.perf_counter() - start) / ROUNDS, body
+
+
+def report(name, old, new):
+    old_time, old_body = old
+    new_time, new_body = new
+    print(f"{name:<32} before: {old_time * 1000:7.3f} ms   after: {new_time * 1000:7.3f} ms   "
+          f"speedup: x{old_time / new_time:4.1f}   same body: {old_body == new_body}")
+
+
+if __name__ == "__main__":
+    rows = build_rows()
+    prompts = [prompt for prompt, _ in rows]
+    for prompt in prompts:
+        prompt.author_username = prompt.author.username
+
+    print(f"Serialization time per {ITEMS} items (average of {ROUNDS} rounds)")
+    report(
+        "List[PromptPublic]",
+        asyncio.run(time_old(create_response_field(name="r", type_=List[PromptPublic]), lambda: prompts)),
+        time_new(lambda: list_response(PROMPT_PUBLIC_LIST, prompts)),
+    )
+    report(
+        "List[PromptWithLikeStatus]",
+        asyncio.run(time_old(create_response_field(name="r", type_=List[PromptWithLikeStatus]),
+                             lambda: old_with_like_status(rows))),
+        time_new(lambda: list_response(PROMPT_WITH_LIKE_STATUS_LIST, prompts_with_like_status(rows, True))),
+    )
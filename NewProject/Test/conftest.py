@@ -0,0 +1,122 @@
+"""
+Shared fixtures for the behaviour tests (run from the NewProject directory):
+
+    python -m pytest
+
+The app runs in-process through TestClient on a throwaway SQLite database whose tables are
+recreated for every test. The working directory is moved to a temporary directory first,
+because logs/ and the audit archive are created relative to it.
+"""
+import os
+import sys
+import tempfile
+from collections import namedtuple
+from contextlib import contextmanager
+
+import pytest
+
+_PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_WORK_DIR = tempfile.mkdtemp(prefix="promptnous-tests-")
+
+sys.path.insert(0, _PROJECT_DIR)
+os.chdir(_WORK_DIR)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_WORK_DIR, 'test.db')}"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["JOB_WORKERS"] = "0"
+
+# Scripts that talk to a running server, not tests
+collect_ignore = ["gpt_test.py", "gpt_test_admin.py", "bench_auth.py", "bench_serialization.py"]
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import main  # noqa: E402
+from app.core import rate_limit, totp  # noqa: E402
+from app.core.permissions import admin_cache  # noqa: E402
+from app.core.revocation import revocation_list  # noqa: E402
+from app.core.security import claims_cache, create_access_token  # noqa: E402
+from app.database import crud  # noqa: E402
+from app.database.database import Base, SessionLocal, engine, sticky_writers  # noqa: E402
+from app.schemas.user import UserCreate  # noqa: E402
+
+TestUser = namedtuple("TestUser", "id username headers")
+PASSWORD = "secret-pw"
+
+
+def _reset_process_state():
+    # Module singletons keep per-process state between requests; start every test from scratch
+    admin_cache.invalidate()
+    claims_cache.clear()
+    revocation_list.__init__(revocation_list.refresh_seconds)
+    sticky_writers.__init__(sticky_writers.seconds)
+    if isinstance(rate_limit.backend, rate_limit.MemoryBackend):
+        rate_limit.backend.__init__()
+    if isinstance(totp.used_steps, totp.MemoryUsedSteps):
+        totp.used_steps.__init__()
+
+
+def _create_user(username: str, password: str = PASSWORD) -> TestUser:
+    session = SessionLocal()
+    try:
+        user = crud.create_user(session, UserCreate(
+            username=username, first_name="Test", last_name="User",
+            email=f"{username}@example.com", password=password,
+        ))
+        user_id = user.id
+    finally:
+        session.close()
+    return TestUser(user_id, username, {"Authorization": "Bearer " + create_access_token({"sub": username})})
+
+
+@pytest.fixture(autouse=True)
+def database():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    _reset_process_state()
+    # User id 1 is the superadmin; create it first so that test users are ordinary users
+    _create_user("root")
+    yield
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def make_user():
+    """Creates an ordinary user; returns (id, username, bearer headers)."""
+    return _create_user
+
+
+@pytest.fixture
+def superadmin():
+    return TestUser(1, "root", {"Authorization": "Bearer " + create_access_token({"sub": "root"})})
+
+
+@pytest.fixture
+def count_queries():
+    """Context manager collecting the SQL statements executed inside it."""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+    return counter
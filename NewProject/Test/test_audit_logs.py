@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core import logging_handler
+from app.database import crud
+from app.database.models import AuditLog, Prompt
+
+
+def test_audit_rows_are_stored_in_utc(client, db, superadmin, make_user):
+    alice = make_user("alice")
+    response = client.post("/prompts/", json={"content": "Summarize this text", "is_public": True},
+                           headers=alice.headers)
+    assert response.status_code == 201
+
+    row = db.query(AuditLog).filter(AuditLog.endpoint == "/prompts/").one()
+    assert abs(row.timestamp - datetime.utcnow()) < timedelta(minutes=1)
+    assert row.username == "alice"
+
+
+def test_audit_log_time_filter_accepts_an_offset(client, superadmin, make_user):
+    alice = make_user("alice")
+    client.post("/prompts/", json={"content": "Summarize this text", "is_public": True}, headers=alice.headers)
+
+    # The same instant, written in UTC+03:00
+    local = datetime.now(timezone(timedelta(hours=3)))
+    since = (local - timedelta(minutes=5)).isoformat()
+    until = (local + timedelta(minutes=5)).isoformat()
+    page = client.get("/admin/audit-logs/", params={"start": since, "endpoint": "/prompts/"},
+                      headers=superadmin.headers).json()
+    assert [log["username"] for log in page["items"]] == ["alice"]
+
+    page = client.get("/admin/audit-logs/", params={"end": since, "endpoint": "/prompts/"},
+                      headers=superadmin.headers).json()
+    assert page["items"] == []
+    page = client.get("/admin/audit-logs/", params={"start": until, "endpoint": "/prompts/"},
+                      headers=superadmin.headers).json()
+    assert page["items"] == []
+
+
+def test_rejected_requests_are_audited_too(client, db, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    prompt_id = client.post("/prompts/", json={"content": "Mine", "is_public": True},
+                            headers=alice.headers).json()["id"]
+
+    assert client.delete(f"/prompts/{prompt_id}", headers=bob.headers).status_code == 403
+
+    row = db.query(AuditLog).filter(AuditLog.endpoint == f"/prompts/{prompt_id}").one()
+    assert row.username == "bob"
+
+
+def test_a_failing_audit_write_does_not_affect_the_request(client, db, make_user, monkeypatch):
+    def broken_audit_log(**fields):
+        raise RuntimeError("audit table unavailable")
+
+    monkeypatch.setattr(logging_handler, "AuditLog", broken_audit_log)
+    alice = make_user("alice")
+
+    response = client.post("/prompts/", json={"content": "Still saved", "is_public": True}, headers=alice.headers)
+
+    assert response.status_code == 201
+    assert db.query(Prompt).filter(Prompt.content == "Still saved").count() == 1
+    assert db.query(AuditLog).count() == 0
+
+
+@pytest.fixture
+def export_logs(db):
+    """Audit rows from a fixed day, inserted out of time order; returns their timestamps by label."""
+    day = datetime(2024, 5, 1)
+    rows = {
+        "late": AuditLog(timestamp=day + timedelta(hours=3), endpoint="/prompts/", ip_address="10.0.0.1",
+                         user_id=2, username="alice"),
+        "early": AuditLog(timestamp=day + timedelta(hours=1), endpoint="/prompts/", ip_address="10.0.0.2",
+                          user_id=3, username="bob"),
+        "middle": AuditLog(timestamp=day + timedelta(hours=2), endpoint="/comments/1", ip_address="10.0.0.1",
+                           user_id=2, username="alice"),
+        "anonymous": AuditLog(timestamp=day + timedelta(hours=4), endpoint="/auth/token1", ip_address="10.0.0.3"),
+    }
+    db.add_all(rows.values())
+    db.commit()
+    return {label: row.timestamp for label, row in rows.items()}
+
+
+def _export(client, headers, export_format, **params):
+    response = client.get("/admin/audit-logs/export",
+                          params={"format": export_format, "start": "2024-05-01T00:00:00",
+                                  "end": "2024-05-02T00:00:00", **params},
+                          headers=headers)
+    assert response.status_code == 200, response.text
+    if export_format == "csv":
+        reader = csv.DictReader(io.StringIO(response.text))
+        assert reader.fieldnames == crud.AUDIT_EXPORT_COLUMNS
+        return list(reader)
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert all(list(row) == crud.AUDIT_EXPORT_COLUMNS for row in rows)
+    return rows
+
+
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+def test_audit_log_export_is_filtered_and_oldest_first(client, superadmin, export_logs, export_format):
+    def timestamps(**params):
+        rows = _export(client, superadmin.headers, export_format, **params)
+        return [datetime.fromisoformat(row["timestamp"]) for row in rows]
+
+    logs = export_logs
+    assert timestamps() == [logs["early"], logs["middle"], logs["late"], logs["anonymous"]]
+    assert timestamps(user_id=2) == [logs["middle"], logs["late"]]
+    assert timestamps(endpoint="/prompts/") == [logs["early"], logs["late"]]
+    assert timestamps(ip_address="10.0.0.1") == [logs["middle"], logs["late"]]
+    assert timestamps(user_id=2, endpoint="/prompts/") == [logs["late"]]
+    # start is inclusive, end exclusive; an offset is converted to UTC
+    assert timestamps(start=logs["middle"].isoformat(), end=logs["anonymous"].isoformat()) == [
+        logs["middle"], logs["late"]]
+    assert timestamps(start="2024-05-01T05:00:00+03:00") == [logs["middle"], logs["late"], logs["anonymous"]]
+    assert timestamps(endpoint="/nowhere") == []
+
+
+def test_audit_log_export_as_csv_keeps_empty_user_fields(client, superadmin, export_logs):
+    rows = _export(client, superadmin.headers, "csv", endpoint="/auth/token1")
+
+    assert [(row["ip_address"], row["user_id"], row["username"]) for row in rows] == [("10.0.0.3", "", "")]
@@ -0,0 +1,68 @@
+import glob
+import gzip
+import json
+from datetime import date, datetime
+
+import pytest
+
+from app.database import audit_maintenance
+from app.database.database import engine
+from app.database.models import AuditLog
+
+
+def _add_audit_rows(db, timestamps):
+    db.add_all(AuditLog(timestamp=ts, endpoint="/prompts/", ip_address="127.0.0.1", username="alice")
+               for ts in timestamps)
+    db.commit()
+
+
+def _archived_ids(archive_dir):
+    ids = []
+    for path in glob.glob(str(archive_dir / "*.jsonl.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            ids.extend(json.loads(line)["id"] for line in archive)
+    return ids
+
+
+def test_partition_definitions_cover_every_month_from_the_oldest_row():
+    names, definitions = audit_maintenance._partition_definitions(date(2025, 11, 17), date(2026, 2, 1))
+
+    assert names == ["p202511", "p202512", "p202601", "p202602"]
+    assert definitions[0] == "PARTITION p202511 VALUES LESS THAN (TO_DAYS('2025-12-01'))"
+    assert definitions[-1] == "PARTITION pmax VALUES LESS THAN MAXVALUE"
+
+
+def test_purge_archives_and_deletes_old_rows(db, tmp_path):
+    _add_audit_rows(db, [datetime(2026, 1, 5), datetime(2026, 2, 5), datetime(2026, 9, 1)])
+
+    summary = audit_maintenance.purge_audit_logs(
+        engine, retention_days=30, archive_dir=str(tmp_path), batch_size=10, today=date(2026, 9, 15))
+
+    assert summary["rows_deleted"] == 2
+    assert sorted(_archived_ids(tmp_path)) == [1, 2]
+    assert db.query(AuditLog).count() == 1
+
+
+def test_purge_retry_after_a_failed_delete_does_not_archive_rows_twice(db, tmp_path, monkeypatch):
+    _add_audit_rows(db, [datetime(2026, 1, day) for day in range(1, 11)])
+    real_delete = audit_maintenance.delete
+    calls = []
+
+    def failing_delete(table):
+        calls.append(table)
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        return real_delete(table)
+
+    monkeypatch.setattr(audit_maintenance, "delete", failing_delete)
+    with pytest.raises(RuntimeError):
+        audit_maintenance.purge_audit_logs(
+            engine, retention_days=30, archive_dir=str(tmp_path), batch_size=4, today=date(2026, 9, 15))
+
+    # The second batch was archived but not deleted; the rerun must rewrite, not append
+    monkeypatch.setattr(audit_maintenance, "delete", real_delete)
+    audit_maintenance.purge_audit_logs(
+        engine, retention_days=30, archive_dir=str(tmp_path), batch_size=4, today=date(2026, 9, 15))
+
+    assert sorted(_archived_ids(tmp_path)) == list(range(1, 11))
+    assert db.query(AuditLog).count() == 0
@@ -0,0 +1,150 @@
+import pytest
+
+from app.core.config import settings
+from app.database import models
+from app.database.comment_paths import backfill_comment_paths
+
+
+@pytest.fixture
+def alice(make_user):
+    return make_user("alice")
+
+
+@pytest.fixture
+def prompt_id(client, alice):
+    return client.post("/prompts/", json={"content": "Discuss", "is_public": True}, headers=alice.headers).json()["id"]
+
+
+def _comment(client, user, prompt_id, content, parent_id=None):
+    response = client.post(f"/prompts/{prompt_id}/comments", json={"content": content, "parent_id": parent_id},
+                           headers=user.headers)
+    assert response.status_code == 201, response.text
+    return response.json()["comment_id"]
+
+
+@pytest.fixture
+def thread(client, alice, prompt_id):
+    """
+    a
+    ├── a1
+    │   └── a1x
+    └── a2
+    b
+    """
+    ids = {"a": _comment(client, alice, prompt_id, "a")}
+    ids["b"] = _comment(client, alice, prompt_id, "b")
+    ids["a1"] = _comment(client, alice, prompt_id, "a1", ids["a"])
+    ids["a2"] = _comment(client, alice, prompt_id, "a2", ids["a"])
+    ids["a1x"] = _comment(client, alice, prompt_id, "a1x", ids["a1"])
+    return ids
+
+
+def _contents(response):
+    assert response.status_code == 200, response.text
+    return [comment["content"] for comment in response.json()]
+
+
+def test_thread_is_returned_in_rendering_order(client, prompt_id, thread):
+    comments = client.get(f"/prompts/{prompt_id}/comments/thread").json()
+
+    assert [(c["content"], c["depth"], c["reply_count"]) for c in comments] == [
+        ("a", 0, 3), ("a1", 1, 1), ("a1x", 2, 0), ("a2", 1, 0), ("b", 0, 0)]
+    assert all(c["author_username"] == "alice" for c in comments)
+
+
+def test_subtree_and_depth_limits(client, prompt_id, thread):
+    assert _contents(client.get(f"/comments/{thread['a']}/thread")) == ["a", "a1", "a1x", "a2"]
+    assert _contents(client.get(f"/comments/{thread['a']}/thread", params={"max_depth": 1})) == ["a", "a1", "a2"]
+    assert _contents(client.get(f"/prompts/{prompt_id}/comments/thread", params={"max_depth": 0})) == ["a", "b"]
+
+
+def test_deleting_a_comment_removes_its_subtree(client, alice, prompt_id, thread):
+    assert client.delete(f"/comments/{thread['a1']}", headers=alice.headers).status_code == 204
+
+    comments = client.get(f"/prompts/{prompt_id}/comments/thread").json()
+    assert [(c["content"], c["reply_count"]) for c in comments] == [("a", 1), ("a2", 0), ("b", 0)]
+
+
+def test_replies_must_stay_on_the_same_prompt_and_within_the_depth_limit(client, alice, prompt_id, monkeypatch):
+    other_prompt = client.post("/prompts/", json={"content": "Other", "is_public": True},
+                               headers=alice.headers).json()["id"]
+    foreign = _comment(client, alice, other_prompt, "elsewhere")
+    response = client.post(f"/prompts/{prompt_id}/comments", json={"content": "x", "parent_id": foreign},
+                           headers=alice.headers)
+    assert response.status_code == 404
+
+    monkeypatch.setattr(settings, "COMMENT_MAX_DEPTH", 1)
+    top = _comment(client, alice, prompt_id, "top")
+    reply = _comment(client, alice, prompt_id, "reply", top)
+    response = client.post(f"/prompts/{prompt_id}/comments", json={"content": "too deep", "parent_id": reply},
+                           headers=alice.headers)
+    assert response.status_code == 400
+
+
+def test_prompt_comment_count_follows_creates_and_deletes(client, alice, prompt_id, thread):
+    def comment_count():
+        return client.get(f"/prompts/{prompt_id}", headers=alice.headers).json()["comment_count"]
+
+    assert comment_count() == 5
+    client.delete(f"/comments/{thread['a']}", headers=alice.headers)
+    assert comment_count() == 1
+
+
+def test_previews_return_the_latest_comments_of_each_prompt(client, alice, prompt_id, thread, count_queries):
+    empty_prompt = client.post("/prompts/", json={"content": "Quiet", "is_public": True},
+                               headers=alice.headers).json()["id"]
+
+    with count_queries() as statements:
+        previews = client.get("/comments/preview", params={"prompt_id": [prompt_id, empty_prompt],
+                                                           "per_prompt": 2}).json()
+
+    assert [c["content"] for c in previews[str(prompt_id)]] == ["a1x", "a2"]
+    assert previews[str(empty_prompt)] == []
+    assert len(statements) == 1
+
+
+def test_comments_of_a_soft_deleted_prompt_are_hidden(client, alice, prompt_id, thread):
+    assert client.delete(f"/prompts/{prompt_id}", headers=alice.headers).status_code == 204
+
+    assert client.get("/comments/preview", params={"prompt_id": prompt_id}).json() == {str(prompt_id): []}
+    assert client.get(f"/comments/{thread['a']}/thread").status_code == 404
+    assert client.get(f"/comments/{thread['a1']}").status_code == 404
+    assert client.get(f"/prompts/{prompt_id}/comments").status_code == 404
+
+
+def _legacy_comment(db, user, prompt_id, content, parent_id=None):
+    """A comment as written before paths existed: no path, depth 0, not counted on its ancestors."""
+    comment = models.PromptComment(prompt_id=prompt_id, user_id=user.id, content=content, parent_id=parent_id)
+    db.add(comment)
+    db.query(models.Prompt).filter(models.Prompt.id == prompt_id)\
+        .update({models.Prompt.comment_count: models.Prompt.comment_count + 1})
+    db.commit()
+    return comment.comment_id
+
+
+def test_replying_to_a_comment_without_a_path(client, db, alice, prompt_id):
+    legacy = _legacy_comment(db, alice, prompt_id, "old")
+    reply = _comment(client, alice, prompt_id, "reply", legacy)
+
+    assert [(c["content"], c["reply_count"]) for c in client.get(f"/comments/{legacy}/thread").json()] == [
+        ("old", 1), ("reply", 0)]
+    assert _contents(client.get(f"/comments/{reply}/thread")) == ["reply"]
+
+    assert client.delete(f"/comments/{legacy}", headers=alice.headers).status_code == 204
+    assert client.get(f"/prompts/{prompt_id}/comments/thread").json() == []
+    assert client.get(f"/prompts/{prompt_id}", headers=alice.headers).json()["comment_count"] == 0
+
+
+def test_backfill_sets_paths_depths_and_reply_counts(client, db, alice, prompt_id):
+    root = _legacy_comment(db, alice, prompt_id, "root")
+    child = _legacy_comment(db, alice, prompt_id, "child", root)
+    _legacy_comment(db, alice, prompt_id, "grandchild", child)
+    _legacy_comment(db, alice, prompt_id, "other")
+
+    summary = backfill_comment_paths(db, batch_size=1)
+
+    assert (summary["comments"], summary["prompts"]) == (4, 1)
+    assert [(c["content"], c["depth"], c["reply_count"]) for c in
+            client.get(f"/prompts/{prompt_id}/comments/thread").json()] == [
+        ("root", 0, 2), ("child", 1, 1), ("grandchild", 2, 0), ("other", 0, 0)]
+    assert backfill_comment_paths(db)["comments"] == 0
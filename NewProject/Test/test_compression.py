@@ -0,0 +1,38 @@
+from app.api.compression import choose_encoding
+from app.database import models
+
+
+def _seed_feed(db, user_id: int, count: int = 30):
+    db.add_all(models.Prompt(content=f"Prompt {i}: " + "write a friendly reply " * 20, is_public=True, user_id=user_id)
+               for i in range(count))
+    db.commit()
+
+
+def test_large_json_is_gzipped(client, db, make_user):
+    _seed_feed(db, make_user("alice").id)
+
+    response = client.get("/prompts/", params={"limit": 30}, headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert int(response.headers["Content-Length"]) < len(response.content)
+    assert len(response.json()) == 30
+
+
+def test_small_or_unaccepted_responses_are_sent_as_is(client, db, make_user):
+    _seed_feed(db, make_user("alice").id)
+
+    small = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+
+    identity = client.get("/prompts/", params={"limit": 30}, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in identity.headers
+    assert len(identity.json()) == 30
+
+
+def test_choose_encoding_honours_q_values():
+    supported = ("br", "gzip")
+    assert choose_encoding("gzip, br", supported) == "br"
+    assert choose_encoding("br;q=0.1, gzip;q=0.9", supported) == "gzip"
+    assert choose_encoding("*;q=0", supported) is None
+    assert choose_encoding("deflate", supported) is None
@@ -0,0 +1,60 @@
+import pytest
+
+from app.database import crud
+from app.schemas.user import UserUpdate
+
+
+@pytest.fixture
+def prompt_id(client, make_user):
+    alice = make_user("alice")
+    return client.post("/prompts/", json={"content": "Explain ETags", "is_public": True},
+                       headers=alice.headers).json()["id"]
+
+
+def _revalidate(client, path, etag, headers=None):
+    return client.get(path, headers={**(headers or {}), "If-None-Match": etag})
+
+
+def test_prompt_etag_answers_304_until_the_prompt_changes(client, make_user, prompt_id):
+    bob = make_user("bob")
+    first = client.get(f"/prompts/{prompt_id}", headers=bob.headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    not_modified = _revalidate(client, f"/prompts/{prompt_id}", etag, bob.headers)
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    client.post(f"/prompts/{prompt_id}/like", headers=bob.headers)
+    changed = _revalidate(client, f"/prompts/{prompt_id}", etag, bob.headers)
+    assert changed.status_code == 200
+    assert changed.json()["no_of_likes"] == 1
+    assert changed.headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("path", ["/prompts/{id}/comments", "/prompts/{id}/comments/thread"])
+def test_comment_etag_changes_on_new_comments_and_edits(client, make_user, prompt_id, path):
+    path = path.format(id=prompt_id)
+    bob = make_user("bob")
+    comment_id = client.post(f"/prompts/{prompt_id}/comments", json={"content": "First"},
+                             headers=bob.headers).json()["comment_id"]
+    etag = client.get(path).headers["ETag"]
+    assert _revalidate(client, path, etag).status_code == 304
+
+    client.put(f"/comments/{comment_id}", json={"content": "First, edited"}, headers=bob.headers)
+    edited = _revalidate(client, path, etag)
+    assert edited.status_code == 200
+    assert edited.json()[0]["content"] == "First, edited"
+
+
+def test_comment_etag_changes_when_an_author_is_renamed(client, db, make_user, prompt_id):
+    bob = make_user("bob")
+    client.post(f"/prompts/{prompt_id}/comments", json={"content": "Nice"}, headers=bob.headers)
+    path = f"/prompts/{prompt_id}/comments"
+    etag = client.get(path).headers["ETag"]
+
+    crud.update_user_profile(db, bob.id, UserUpdate(username="robert"))
+
+    renamed = _revalidate(client, path, etag)
+    assert renamed.status_code == 200
+    assert renamed.json()[0]["author_username"] == "robert"
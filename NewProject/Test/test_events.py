@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from app.core import events
+
+
+class _BlockingRedis:
+    """Client double whose publish() waits until 'released' is set, like an unreachable Redis."""
+
+    def __init__(self):
+        self.released = threading.Event()
+        self.published = []
+
+    def publish(self, channel, payload):
+        self.released.wait()
+        self.published.append((channel, payload))
+
+    def pubsub(self, **kwargs):
+        # No messages ever arrive: listen() blocks forever
+        return SimpleNamespace(psubscribe=lambda pattern: None, listen=lambda: iter(threading.Event().wait, True))
+
+
+def _redis_broker(monkeypatch, client, queue_size=None):
+    monkeypatch.setattr(events, "redis", SimpleNamespace(Redis=SimpleNamespace(from_url=lambda url: client)))
+    if queue_size is not None:
+        monkeypatch.setattr(events.RedisBroker, "PUBLISH_QUEUE_SIZE", queue_size)
+    broker = events.RedisBroker("redis://localhost:6379/0")
+    broker.start(events.EventHub(broker))
+    return broker
+
+
+def test_local_hub_delivers_events_published_from_another_thread():
+    hub = events.EventHub(events.LocalBroker())
+
+    async def listen():
+        with hub.subscribe(events.prompt_channel(7)) as subscription:
+            threading.Thread(target=hub.publish,
+                             args=(events.prompt_channel(7), {"type": "like_count", "data": 3})).start()
+            return await asyncio.wait_for(subscription.get(), timeout=5)
+
+    assert asyncio.run(listen()) == {"type": "like_count", "data": 3}
+    assert hub.subscriber_count() == 0
+
+
+def test_redis_publish_does_not_wait_for_redis(monkeypatch):
+    client = _BlockingRedis()
+    broker = _redis_broker(monkeypatch, client)
+
+    started = time.monotonic()
+    broker.publish("prompt_events:1", {"type": "like_count"})
+    assert time.monotonic() - started < 0.5
+
+    client.released.set()
+    deadline = time.monotonic() + 5
+    while not client.published and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert client.published == [("prompt_events:1", '{"type": "like_count"}')]
+
+
+def test_redis_publish_drops_events_when_the_queue_is_full(monkeypatch):
+    client = _BlockingRedis()
+    broker = _redis_broker(monkeypatch, client, queue_size=2)
+
+    for i in range(10):
+        broker.publish("prompt_events:1", {"n": i})  # must neither block nor raise
+
+    client.released.set()
+    deadline = time.monotonic() + 5
+    while len(client.published) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert 2 <= len(client.published) <= 3
@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+from functools import partial
+
+import pytest
+
+from app.database import crud
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    """Makes the exports read in partitions of 2 rows so joins across partitions are exercised."""
+    for name in ("iter_prompts_export", "iter_likes_export", "iter_comments_export"):
+        monkeypatch.setattr(crud, name, partial(getattr(crud, name), batch_size=2))
+
+
+@pytest.fixture
+def corpus(client, make_user, superadmin):
+    """Five live prompts and one soft-deleted one, with labels, likes and comments spread over them."""
+    alice, bob = make_user("alice"), make_user("bob")
+    for name in ("red", "blue"):
+        assert client.post("/labels/", json={"name": name}, headers=superadmin.headers).status_code == 201
+
+    def prompt(user, content, labels=(), liked_by=(), comments=0, is_public=True):
+        prompt_id = client.post("/prompts/", json={"content": content, "is_public": is_public},
+                                headers=user.headers).json()["id"]
+        for label in labels:
+            assert client.post(f"/labels/{prompt_id}/labels/{label}", headers=user.headers).status_code == 201
+        for liker in liked_by:
+            client.post(f"/prompts/{prompt_id}/like", headers=liker.headers)
+        for number in range(comments):
+            client.post(f"/prompts/{prompt_id}/comments", json={"content": f"comment {number}"},
+                        headers=bob.headers)
+        return prompt_id
+
+    ids = {
+        "p1": prompt(alice, "one", labels=["red", "blue"]),
+        "p2": prompt(alice, "two", liked_by=[alice, bob]),
+        "gone": prompt(alice, "deleted", labels=["red"], liked_by=[bob], comments=1),
+        "p3": prompt(bob, "three", comments=2, is_public=False),
+        "p4": prompt(bob, "four", labels=["blue"]),
+        "p5": prompt(alice, "five", labels=["red"], liked_by=[bob], comments=1),
+    }
+    assert client.delete(f"/prompts/{ids['gone']}", headers=alice.headers).status_code == 204
+    return ids
+
+
+def _ndjson(response):
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def _csv(response):
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    reader = csv.DictReader(io.StringIO(response.text))
+    return reader.fieldnames, list(reader)
+
+
+def test_prompt_export_joins_labels_and_counts_across_partitions(client, superadmin, corpus, small_batches):
+    rows = _ndjson(client.get("/admin/export/prompts", headers=superadmin.headers))
+
+    assert all(list(row) == crud.PROMPT_EXPORT_COLUMNS for row in rows)
+    summary = {row["id"]: (sorted(row["labels"]), row["like_count"], row["comment_count"]) for row in rows}
+    assert list(summary) == [corpus[name] for name in ("p1", "p2", "p3", "p4", "p5")]
+    assert summary == {
+        corpus["p1"]: (["blue", "red"], 0, 0),
+        corpus["p2"]: ([], 2, 0),
+        corpus["p3"]: ([], 0, 2),
+        corpus["p4"]: (["blue"], 0, 0),
+        corpus["p5"]: (["red"], 1, 1),
+    }
+    assert rows[0]["author_username"] == "alice"
+
+    public = _ndjson(client.get("/admin/export/prompts", params={"public_only": True}, headers=superadmin.headers))
+    assert corpus["p3"] not in [row["id"] for row in public] and len(public) == 4
+
+
+def test_prompt_export_as_csv(client, superadmin, corpus, small_batches):
+    fieldnames, rows = _csv(client.get("/admin/export/prompts", params={"format": "csv"},
+                                       headers=superadmin.headers))
+
+    assert fieldnames == crud.PROMPT_EXPORT_COLUMNS
+    by_id = {int(row["id"]): row for row in rows}
+    assert list(by_id) == [corpus[name] for name in ("p1", "p2", "p3", "p4", "p5")]
+    assert sorted(by_id[corpus["p1"]]["labels"].split("|")) == ["blue", "red"]
+    assert by_id[corpus["p2"]]["labels"] == ""
+    assert (by_id[corpus["p2"]]["like_count"], by_id[corpus["p3"]]["comment_count"]) == ("2", "2")
+
+
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+def test_comment_export_leaves_out_deleted_prompts(client, superadmin, corpus, small_batches, export_format):
+    response = client.get("/admin/export/comments", params={"format": export_format}, headers=superadmin.headers)
+    if export_format == "csv":
+        fieldnames, rows = _csv(response)
+        assert fieldnames == crud.COMMENT_EXPORT_COLUMNS
+    else:
+        rows = _ndjson(response)
+        assert all(list(row) == crud.COMMENT_EXPORT_COLUMNS for row in rows)
+
+    assert [int(row["prompt_id"]) for row in rows] == [corpus["p3"], corpus["p3"], corpus["p5"]]
+    assert {row["author_username"] for row in rows} == {"bob"}
+
+
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+def test_like_export(client, superadmin, corpus, small_batches, export_format):
+    response = client.get("/admin/export/likes", params={"format": export_format}, headers=superadmin.headers)
+    if export_format == "csv":
+        fieldnames, rows = _csv(response)
+        assert fieldnames == crud.LIKE_EXPORT_COLUMNS
+    else:
+        rows = _ndjson(response)
+        assert all(list(row) == crud.LIKE_EXPORT_COLUMNS for row in rows)
+
+    assert [int(row["prompt_id"]) for row in rows] == [corpus["p2"], corpus["p2"], corpus["p5"]]
+
+
+def test_exports_are_for_admins_only(client, make_user):
+    headers = make_user("carol").headers
+    for table in ("prompts", "likes", "comments"):
+        assert client.get(f"/admin/export/{table}", headers=headers).status_code == 403
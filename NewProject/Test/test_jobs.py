@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core import jobs
+from app.core.config import settings
+from app.database import models
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    """Registers a 'test' job kind failing its first 'failures' runs (set on the returned object)."""
+    class Handler:
+        def __init__(self):
+            self.failures = 0
+            self.sessions = []  # info of the session each run received
+
+        def __call__(self, db, value):
+            self.sessions.append(dict(db.info))
+            if self.failures:
+                self.failures -= 1
+                raise ValueError("temporarily broken")
+            return {"doubled": value * 2}
+
+    instance = Handler()
+    jobs._load_handlers()
+    monkeypatch.setitem(jobs._handlers, "test", instance)
+    return instance
+
+
+def _job(db, job_id):
+    db.expire_all()
+    return db.get(models.Job, job_id)
+
+
+def _make_due(db, job_id):
+    db.query(models.Job).filter(models.Job.id == job_id).update({models.Job.run_after: datetime.utcnow()})
+    db.commit()
+
+
+def test_a_job_runs_on_a_primary_session_and_stores_its_result(db, handler):
+    job_id = jobs.enqueue(db, "test", {"value": 21}).id
+
+    assert jobs.run_pending() == 1
+
+    job = _job(db, job_id)
+    assert (job.status, job.attempts, job.locked_by) == (jobs.SUCCEEDED, 1, None)
+    assert job.result == '{"doubled": 42}'
+    assert handler.sessions == [{"use_primary": True}]
+
+
+def test_a_failed_attempt_is_retried_after_a_backoff(db, handler):
+    handler.failures = 1
+    job_id = jobs.enqueue(db, "test", {"value": 1}).id
+
+    jobs.run_pending()
+    job = _job(db, job_id)
+    assert (job.status, job.attempts) == (jobs.QUEUED, 1)
+    assert "temporarily broken" in job.last_error
+    assert job.run_after >= datetime.utcnow() + timedelta(seconds=settings.JOB_BACKOFF_SECONDS * 0.5 - 1)
+    assert jobs.run_pending() == 0  # not due yet
+
+    _make_due(db, job_id)
+    jobs.run_pending()
+    assert (_job(db, job_id).status, _job(db, job_id).attempts) == (jobs.SUCCEEDED, 2)
+
+
+def test_a_job_fails_for_good_after_max_attempts_and_can_be_retried(client, db, handler, superadmin):
+    handler.failures = 2
+    job_id = jobs.enqueue(db, "test", {"value": 1}, max_attempts=2).id
+    jobs.run_pending()
+    _make_due(db, job_id)
+    jobs.run_pending()
+    assert (_job(db, job_id).status, _job(db, job_id).attempts) == (jobs.FAILED, 2)
+
+    response = client.post(f"/admin/jobs/{job_id}/retry", headers=superadmin.headers)
+    assert response.status_code == 200, response.text
+    assert (response.json()["status"], response.json()["attempts"]) == (jobs.QUEUED, 0)
+    assert client.post(f"/admin/jobs/{job_id}/retry", headers=superadmin.headers).status_code == 409
+    assert client.post("/admin/jobs/9999/retry", headers=superadmin.headers).status_code == 404
+
+    jobs.run_pending()
+    assert _job(db, job_id).status == jobs.SUCCEEDED
+
+
+def test_purging_a_user_that_is_not_marked_yet_is_retried(db, make_user):
+    alice = make_user("alice")
+    job_id = jobs.enqueue(db, "purge_user", {"user_id": alice.id}).id
+
+    jobs.run_pending()
+
+    job = _job(db, job_id)
+    assert (job.status, job.attempts) == (jobs.QUEUED, 1)
+    assert "not marked for deletion" in job.last_error
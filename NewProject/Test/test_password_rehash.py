@@ -0,0 +1,56 @@
+import pytest
+from passlib.hash import argon2
+
+from app.core import security
+from app.core.security import build_pwd_context
+from app.database import models
+
+from conftest import PASSWORD
+
+
+def _login(client):
+    response = client.post("/auth/token1", json={"username": "alice", "password": PASSWORD})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _stored_hash(db, user_id):
+    db.expire_all()
+    return db.get(models.User, user_id).hashed_password
+
+
+def test_login_rehashes_a_password_after_the_cost_changes(client, db, make_user, monkeypatch):
+    alice = make_user("alice")
+    assert _stored_hash(db, alice.id).startswith("$2b$04$")
+    _login(client)
+
+    monkeypatch.setattr(security, "pwd_context", build_pwd_context(bcrypt_rounds=5))
+    _login(client)
+
+    new_hash = _stored_hash(db, alice.id)
+    assert new_hash.startswith("$2b$05$")
+    # Up to date now: the next login leaves it alone
+    _login(client)
+    assert _stored_hash(db, alice.id) == new_hash
+
+
+def test_a_rehash_signs_nobody_out(client, db, make_user, monkeypatch):
+    make_user("alice")
+    tokens = _login(client)
+
+    monkeypatch.setattr(security, "pwd_context", build_pwd_context(bcrypt_rounds=5))
+    _login(client)
+
+    # Unlike a password change, tokens issued before the rehash keep working
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"})
+    assert me.status_code == 200, me.text
+    assert client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 200
+    assert db.query(models.RevokedToken).count() == 0
+
+
+def test_argon2_without_its_backend_fails_at_startup(monkeypatch):
+    monkeypatch.setattr(argon2, "has_backend", lambda name="any": False)
+
+    with pytest.raises(RuntimeError, match="argon2-cffi"):
+        build_pwd_context(scheme="argon2")
+    build_pwd_context(scheme="bcrypt")  # argon2 hashes are only verified then, not required
@@ -0,0 +1,63 @@
+import pytest
+
+from app.database import models
+
+
+@pytest.fixture
+def alice(make_user):
+    return make_user("alice")
+
+
+@pytest.fixture
+def admin(db, make_user):
+    admin = make_user("moderator")
+    db.add(models.AdminUser(user_id=admin.id))
+    db.commit()
+    return admin
+
+
+@pytest.fixture
+def private_prompt(client, alice):
+    return client.post("/prompts/", json={"content": "Secret", "is_public": False}, headers=alice.headers).json()["id"]
+
+
+def test_private_prompts_are_visible_to_their_author_and_admins(client, make_user, alice, admin, superadmin,
+                                                                private_prompt):
+    bob = make_user("bob")
+    for path in (f"/prompts/{private_prompt}", f"/prompts/{private_prompt}/status"):
+        assert client.get(path, headers=alice.headers).status_code == 200
+        assert client.get(path, headers=admin.headers).status_code == 200
+        assert client.get(path, headers=superadmin.headers).status_code == 200
+        assert client.get(path, headers=bob.headers).status_code == 403
+
+    def listed(headers=None):
+        return [p["id"] for p in client.get(f"/prompts/user/{alice.id}/status", headers=headers).json()]
+    assert listed(admin.headers) == [private_prompt]
+    assert listed(bob.headers) == []
+    assert listed() == []
+
+
+def test_admins_can_delete_prompts_and_comments_of_others(client, make_user, alice, admin):
+    bob = make_user("bob")
+    prompt_id = client.post("/prompts/", json={"content": "Hi", "is_public": True}, headers=alice.headers).json()["id"]
+    comment_id = client.post(f"/prompts/{prompt_id}/comments", json={"content": "Hello"},
+                             headers=alice.headers).json()["comment_id"]
+
+    assert client.delete(f"/comments/{comment_id}", headers=bob.headers).status_code == 403
+    assert client.delete(f"/comments/{comment_id}", headers=admin.headers).status_code == 204
+    assert client.delete(f"/prompts/{prompt_id}", headers=bob.headers).status_code == 403
+    assert client.delete(f"/prompts/{prompt_id}", headers=admin.headers).status_code == 204
+
+
+def test_label_counts_include_private_prompts_for_admins(client, db, alice, admin, private_prompt):
+    label = models.Label(name="secret")
+    db.add(label)
+    db.flush()
+    db.add(models.PromptLabel(prompt_id=private_prompt, label_id=label.id))
+    db.commit()
+
+    def count(headers=None):
+        return client.get("/prompts/getcountslabel/", params={"label_name": "secret"}, headers=headers).json()
+    assert count(alice.headers) == 1
+    assert count(admin.headers) == 1
+    assert count() == 0
@@ -0,0 +1,62 @@
+import pytest
+
+from app.core.config import settings
+
+
+@pytest.fixture
+def alice(make_user):
+    return make_user("alice")
+
+
+def _create(client, user, content, is_public=True):
+    return client.post("/prompts/", json={"content": content, "is_public": is_public}, headers=user.headers)
+
+
+def _duplicates(client, content, headers=None):
+    response = client.post("/prompts/duplicates", json={"content": content}, headers=headers)
+    assert response.status_code == 200, response.text
+    return [prompt["id"] for prompt in response.json()]
+
+
+def test_duplicate_check_sees_the_callers_private_prompts(client, alice):
+    private_id = _create(client, alice, "My secret prompt", is_public=False).json()["id"]
+
+    assert _duplicates(client, "my  SECRET prompt", alice.headers) == [private_id]
+
+
+def test_anonymous_and_other_callers_only_see_public_duplicates(client, make_user, alice):
+    public_id = _create(client, alice, "Shared prompt").json()["id"]
+    _create(client, alice, "Shared   prompt", is_public=False)
+
+    assert _duplicates(client, "shared prompt") == [public_id]
+    assert _duplicates(client, "shared prompt", make_user("bob").headers) == [public_id]
+    assert len(_duplicates(client, "shared prompt", alice.headers)) == 2
+
+
+def test_reposts_are_flagged_by_default(client, alice):
+    first_id = _create(client, alice, "Write a haiku").json()["id"]
+
+    repost = _create(client, alice, "write a  haiku")
+    assert repost.status_code == 201
+    assert repost.headers["X-Duplicate-Of"] == str(first_id)
+
+
+def test_reposting_own_content_is_refused_when_configured(client, make_user, alice, monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_REJECT_OWN_DUPLICATES", True)
+    first_id = _create(client, alice, "Write a haiku").json()["id"]
+
+    rejected = _create(client, alice, "WRITE a haiku")
+    assert rejected.status_code == 409
+    assert rejected.headers["X-Duplicate-Of"] == str(first_id)
+
+    # Editing into a copy of another own prompt is refused too; editing a prompt in place is not
+    other_id = _create(client, alice, "Write a limerick").json()["id"]
+    edit = client.put(f"/prompts/{other_id}", json={"content": "write a haiku", "is_public": True},
+                      headers=alice.headers)
+    assert edit.status_code == 409
+    same = client.put(f"/prompts/{first_id}", json={"content": "Write a  haiku", "is_public": False},
+                      headers=alice.headers)
+    assert same.status_code == 200
+
+    # Someone else's prompt with the same content is not a reason to refuse
+    assert _create(client, make_user("bob"), "Write a haiku").status_code == 201
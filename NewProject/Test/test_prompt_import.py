@@ -0,0 +1,49 @@
+import json
+
+from app.database import models
+
+
+def _jsonl(*rows) -> bytes:
+    return b"".join(json.dumps(row).encode("utf-8") + b"\n" for row in rows)
+
+
+def test_import_writes_each_batch_with_one_insert(client, db, superadmin, count_queries):
+    body = _jsonl(*({"content": f"Prompt {i}", "labels": ["bulk", f"tag{i % 2}"]} for i in range(10)))
+
+    with count_queries() as statements:
+        response = client.post("/admin/import/prompts", params={"batch_size": 5},
+                               files={"file": ("prompts.jsonl", body)}, headers=superadmin.headers)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["imported"], report["failed"], report["labels_created"]) == (10, 0, 3)
+    prompt_inserts = [sql for sql in statements if sql.startswith("INSERT INTO prompts ")]
+    assert len(prompt_inserts) == 2
+    prompts = db.query(models.Prompt).order_by(models.Prompt.id).all()
+    assert [p.content for p in prompts] == [f"Prompt {i}" for i in range(10)]
+    assert sorted(link.label.name for link in prompts[3].labels) == ["bulk", "tag1"]
+
+
+def test_invalid_utf8_line_is_reported_and_the_rest_imported(client, db, superadmin):
+    body = _jsonl({"content": "first"}) + b'{"content": "caf\xe9"}\n' + _jsonl({"content": "third"}, {"labels": []})
+
+    response = client.post("/admin/import/prompts", files={"file": ("prompts.jsonl", body)},
+                           headers=superadmin.headers)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["total_rows"], report["imported"], report["failed"]) == (4, 2, 2)
+    assert [(error["line"], error["error"]) for error in report["errors"]][0] == (2, "not valid UTF-8")
+    assert report["errors"][1]["line"] == 4
+    assert [p.content for p in db.query(models.Prompt).order_by(models.Prompt.id)] == ["first", "third"]
+
+
+def test_csv_import(client, db, superadmin):
+    body = "content,is_public,labels\n\"Line one\nline two\",false,a|b\nSecond,,\n".encode("utf-8")
+
+    response = client.post("/admin/import/prompts", files={"file": ("prompts.csv", body)},
+                           headers=superadmin.headers)
+
+    assert response.json()["imported"] == 2
+    first, second = db.query(models.Prompt).order_by(models.Prompt.id).all()
+    assert (first.content, first.is_public, second.is_public) == ("Line one\nline two", False, True)
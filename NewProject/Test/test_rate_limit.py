@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+from conftest import PASSWORD
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import MemoryBackend, Rate
+
+
+def _login(client, username, password="wrong"):
+    return client.post("/auth/token1", json={"username": username, "password": password})
+
+
+def test_login_attempts_are_limited_per_username(client, make_user):
+    make_user("alice")
+    for _ in range(rate_limit.LOGIN_USERNAME_RATE.limit):
+        assert _login(client, "alice").status_code == 401
+
+    rejected = _login(client, "Alice")
+    assert rejected.status_code == 429
+    assert int(rejected.headers["Retry-After"]) >= 1
+
+
+def test_successful_login_clears_the_username_bucket(client, make_user):
+    make_user("alice")
+    for _ in range(rate_limit.LOGIN_USERNAME_RATE.limit - 1):
+        _login(client, "alice")
+    assert _login(client, "alice", PASSWORD).status_code == 200
+
+    assert _login(client, "alice").status_code == 401
+
+
+def test_memory_backend_evicts_the_least_recently_used_bucket(monkeypatch):
+    monkeypatch.setattr(MemoryBackend, "MAX_KEYS", 3)
+    backend = MemoryBackend()
+    once_a_minute = Rate(1, 60)
+
+    for key in ("a", "b", "c"):
+        backend.hit(key, once_a_minute)
+    assert backend.hit("a", once_a_minute)[0] is False  # "a" is now the most recently used
+    backend.hit("d", once_a_minute)  # evicts "b"
+
+    assert backend.hit("a", once_a_minute)[0] is False
+    assert backend.hit("c", once_a_minute)[0] is False
+    assert backend.hit("b", once_a_minute)[0] is True
+
+
+def test_blocking_backends_are_called_off_the_event_loop(monkeypatch):
+    calls = []
+
+    class SlowBackend(MemoryBackend):
+        blocking = True
+
+        def hit(self, key, rate):
+            calls.append(threading.current_thread())
+            return super().hit(key, rate)
+
+    monkeypatch.setattr(rate_limit, "backend", SlowBackend())
+
+    async def check():
+        await rate_limit.hit_async("k", Rate(5, 60))
+        await rate_limit.check_login_attempt_async("127.0.0.1", "alice")
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(check())
+    assert len(calls) == 3
+    assert all(thread is not loop_thread for thread in calls)
+
+
+def _register(client, username):
+    return client.post("/auth/register", json={
+        "username": username, "first_name": "New", "last_name": "User",
+        "email": f"{username}@example.com", "password": "secret-pw"})
+
+
+def test_route_policies_answer_429_with_retry_after(client):
+    limit = rate_limit.Rate.parse(settings.RATE_LIMIT_POLICIES["POST /auth/register"]).limit
+    for i in range(limit):
+        assert _register(client, f"user{i}").status_code == 201
+
+    rejected = _register(client, "one_too_many")
+    assert rejected.status_code == 429
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert client.get("/").status_code == 200  # only the route's own bucket is empty
+
+
+def test_middleware_calls_a_blocking_backend_off_the_event_loop(client, monkeypatch):
+    running_loops = []
+
+    class SlowBackend(MemoryBackend):
+        blocking = True
+
+        def hit(self, key, rate):
+            try:
+                running_loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                pass  # no running loop: called from a worker thread
+            return super().hit(key, rate)
+
+    monkeypatch.setattr(rate_limit, "backend", SlowBackend())
+
+    assert client.get("/").status_code == 200
+    assert running_loops == []
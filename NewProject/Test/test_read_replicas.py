@@ -0,0 +1,67 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.database import database, models
+from app.database.database import Base, PrimarySessionLocal, SessionLocal
+
+
+@pytest.fixture
+def replica(monkeypatch, tmp_path):
+    """A second SQLite file standing in for a replica that has not caught up with anything."""
+    replica_engine = create_engine(f"sqlite:///{os.path.join(tmp_path, 'replica.db')}")
+    Base.metadata.create_all(bind=replica_engine)
+    monkeypatch.setattr(database, "replica_engines", [replica_engine])
+    yield replica_engine
+    replica_engine.dispose()
+
+
+def _add_public_prompt(session: Session, user_id: int, content: str) -> int:
+    prompt = models.Prompt(content=content, is_public=True, user_id=user_id)
+    session.add(prompt)
+    session.commit()
+    return prompt.id
+
+
+def test_get_requests_read_from_the_replica(client, db, make_user, replica):
+    alice = make_user("alice")
+    _add_public_prompt(db, alice.id, "On the primary")
+
+    # The replica has not seen the prompt yet
+    assert client.get("/prompts/").json() == []
+    # The user lookup of an authenticated request is pinned to the primary
+    assert client.get("/auth/me", headers=alice.headers).json()["username"] == "alice"
+
+
+def test_writing_requests_use_the_primary_from_their_first_query(client, db, make_user, replica):
+    alice = make_user("alice")
+    prompt_id = _add_public_prompt(db, alice.id, "On the primary")
+
+    # The route checks that the prompt exists before liking it; the replica would answer 404
+    response = client.post(f"/prompts/{prompt_id}/like", headers=alice.headers)
+    assert response.status_code == 200, response.text
+
+
+def test_a_session_reads_from_one_replica(monkeypatch):
+    replicas = [create_engine("sqlite://") for _ in range(8)]
+    monkeypatch.setattr(database, "replica_engines", replicas)
+    query = select(models.Prompt.id)
+
+    session = SessionLocal()
+    try:
+        chosen = {session.get_bind(clause=query) for _ in range(20)}
+        assert len(chosen) == 1 and chosen <= set(replicas)
+        assert session.get_bind(clause=query.execution_options(use_primary=True)) is database.engine
+        assert session.get_bind(clause=query.with_for_update()) is database.engine
+    finally:
+        session.close()
+
+    primary_session = PrimarySessionLocal()
+    try:
+        assert primary_session.get_bind(clause=query) is database.engine
+    finally:
+        primary_session.close()
+    # Pinning one session does not pin the next
+    assert "use_primary" not in SessionLocal().info
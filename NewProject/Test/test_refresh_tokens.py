@@ -0,0 +1,67 @@
+import pytest
+
+from conftest import PASSWORD
+
+
+@pytest.fixture
+def login(client, make_user):
+    make_user("alice")
+
+    def login():
+        response = client.post("/auth/token1", json={"username": "alice", "password": PASSWORD})
+        assert response.status_code == 200, response.text
+        return response.json()
+    return login
+
+
+def _refresh(client, refresh_token):
+    return client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def _bearer(tokens):
+    return {"Authorization": "Bearer " + tokens["access_token"]}
+
+
+def test_refresh_rotates_the_pair(client, login):
+    first = login()
+
+    second = _refresh(client, first["refresh_token"])
+    assert second.status_code == 200
+    second = second.json()
+    assert second["refresh_token"] != first["refresh_token"]
+    assert client.get("/auth/me", headers=_bearer(second)).json()["username"] == "alice"
+
+    assert _refresh(client, second["refresh_token"]).status_code == 200
+
+
+def test_reusing_a_refresh_token_revokes_its_family_only(client, login):
+    stolen = login()
+    other_login = login()
+    rotated = _refresh(client, stolen["refresh_token"]).json()
+
+    assert _refresh(client, stolen["refresh_token"]).status_code == 401
+    # The legitimate holder of the family is signed out too...
+    assert _refresh(client, rotated["refresh_token"]).status_code == 401
+    # ...but other logins of the same user are not
+    assert _refresh(client, other_login["refresh_token"]).status_code == 200
+
+
+def test_logout_with_the_refresh_token_ends_the_login(client, login):
+    tokens = login()
+
+    response = client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=_bearer(tokens))
+    assert response.status_code == 204
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_password_change_revokes_refresh_tokens(client, login):
+    tokens = login()
+
+    response = client.put("/users/me/password", json={"current_password": PASSWORD, "new_password": "changed-pw"},
+                          headers=_bearer(tokens))
+    assert response.status_code == 200, response.text
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_unknown_refresh_token_is_rejected(client):
+    assert _refresh(client, "not-a-token").status_code == 401
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.revocation import revocation_list
+from app.core.security import create_access_token, decode_token
+from app.database import models
+
+
+@pytest.fixture
+def always_refresh(monkeypatch):
+    # Pick up other workers' revocations on every request
+    monkeypatch.setattr(revocation_list, "refresh_seconds", 0)
+
+
+def _bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_logout_revokes_the_access_token(client, make_user):
+    alice = make_user("alice")
+    assert client.get("/auth/me", headers=alice.headers).status_code == 200
+
+    assert client.post("/auth/logout", headers=alice.headers).status_code == 204
+
+    assert client.get("/auth/me", headers=alice.headers).status_code == 401
+    fresh = _bearer(create_access_token({"sub": "alice"}))
+    assert client.get("/auth/me", headers=fresh).status_code == 200
+
+
+def test_revocations_committed_out_of_id_order_are_picked_up(client, db, make_user, always_refresh):
+    make_user("alice")
+    first, second = create_access_token({"sub": "alice"}), create_access_token({"sub": "alice"})
+    expires_at = datetime.utcnow() + timedelta(minutes=15)
+
+    # Another worker commits id 10 first...
+    db.add(models.RevokedToken(id=10, jti=decode_token(first)["jti"], subject="alice", expires_at=expires_at))
+    db.commit()
+    assert client.get("/auth/me", headers=_bearer(first)).status_code == 401
+
+    # ...and id 5, inserted earlier but committed later, only now
+    db.add(models.RevokedToken(id=5, jti=decode_token(second)["jti"], subject="alice", expires_at=expires_at,
+                               revoked_at=datetime.utcnow() - timedelta(seconds=2)))
+    db.commit()
+    assert client.get("/auth/me", headers=_bearer(second)).status_code == 401
+
+
+def test_revoking_a_subject_rejects_older_tokens_only(client, db, make_user, always_refresh):
+    alice = make_user("alice")
+    revocation_list.revoke_subject(db, "alice")
+
+    assert client.get("/auth/me", headers=alice.headers).status_code == 401
+
+
+def test_refresh_reads_a_time_window_and_never_purges_inline(client, make_user, always_refresh, count_queries):
+    alice = make_user("alice")
+    client.get("/auth/me", headers=alice.headers)
+    with count_queries() as statements:
+        client.get("/auth/me", headers=alice.headers)
+    assert any("FROM revoked_tokens" in sql and "revoked_at >=" in sql for sql in statements)
+    assert not any(sql.startswith("DELETE FROM revoked_tokens") for sql in statements)
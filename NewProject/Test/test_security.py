@@ -0,0 +1,106 @@
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+import jwt as pyjwt
+import pytest
+from jose import jwt as jose_jwt
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import _ClaimsCache, claims_cache, create_access_token, decode_token
+
+
+@pytest.fixture
+def verifications(monkeypatch):
+    """Counts how often decode_token really parses and verifies a token."""
+    calls = []
+    verify = security._decode_and_verify
+
+    def counting(token):
+        calls.append(token)
+        return verify(token)
+
+    monkeypatch.setattr(security, "_decode_and_verify", counting)
+    return calls
+
+
+def test_a_verified_token_is_served_from_the_cache(verifications):
+    token = create_access_token({"sub": "alice"})
+
+    assert decode_token(token)["sub"] == "alice"
+    assert decode_token(token)["sub"] == "alice"
+    assert len(verifications) == 1
+
+
+def test_an_expired_cache_entry_is_evicted_and_verified_again(monkeypatch, verifications):
+    token = create_access_token({"sub": "alice"}, expires_delta=timedelta(seconds=30))
+    decode_token(token)
+
+    # The cache's clock moves past 'exp'
+    later = time.time() + 60
+    monkeypatch.setattr(security, "time", SimpleNamespace(time=lambda: later))
+
+    assert claims_cache.get(token) is None
+    assert token not in claims_cache._entries
+    decode_token(token)
+    assert len(verifications) == 2
+
+
+def test_an_expired_token_is_rejected_and_not_cached():
+    token = create_access_token({"sub": "alice"}, expires_delta=timedelta(seconds=-10))
+
+    assert decode_token(token) is None
+    assert token not in claims_cache._entries
+    assert decode_token(token[:-2] + "xx") is None
+
+
+def test_the_cache_keeps_only_the_most_recently_used_tokens():
+    cache = _ClaimsCache(max_size=2)
+    exp = time.time() + 60
+    cache.put("a", {"sub": "a", "exp": exp})
+    cache.put("b", {"sub": "b", "exp": exp})
+    assert cache.get("a")["sub"] == "a"  # 'b' is now the least recently used
+
+    cache.put("c", {"sub": "c", "exp": exp})
+
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.get("b") is None
+    _ClaimsCache(max_size=0).put("a", {"sub": "a"})  # a disabled cache stores nothing
+
+
+def test_changing_the_returned_claims_does_not_change_the_cache(verifications):
+    token = create_access_token({"sub": "alice"})
+
+    claims = decode_token(token)
+    claims["sub"] = "root"
+    claims["extra"] = True
+
+    again = decode_token(token)
+    assert (again["sub"], "extra" in again) == ("alice", False)
+    assert len(verifications) == 1
+
+
+def test_pyjwt_and_jose_tokens_decode_the_same(monkeypatch):
+    pyjwt_token = create_access_token({"sub": "alice"})
+    monkeypatch.setattr(security, "pyjwt", None)
+    jose_token = create_access_token({"sub": "alice"})
+
+    # Each backend reads the other's tokens
+    key, algorithms = settings.SECRET_KEY, [settings.ALGORITHM]
+    assert jose_jwt.decode(pyjwt_token, key, algorithms=algorithms) == \
+        pyjwt.decode(pyjwt_token, key, algorithms=algorithms)
+    assert pyjwt.decode(jose_token, key, algorithms=algorithms) == \
+        jose_jwt.decode(jose_token, key, algorithms=algorithms)
+
+    # decode_token gives the same claims whichever backend verifies
+    decoded_by_jose = [decode_token(token) for token in (pyjwt_token, jose_token)]
+    claims_cache.clear()
+    monkeypatch.setattr(security, "pyjwt", pyjwt)
+    decoded_by_pyjwt = [decode_token(token) for token in (pyjwt_token, jose_token)]
+
+    assert decoded_by_jose == decoded_by_pyjwt
+    for claims in decoded_by_pyjwt:
+        assert claims["sub"] == "alice"
+        assert set(claims) == {"sub", "exp", "iat", "jti"}
+        assert isinstance(claims["exp"], int)
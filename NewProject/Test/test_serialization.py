@@ -0,0 +1,50 @@
+import pytest
+
+from app.database import models
+
+
+def _seed(db, make_user, prefix: str, authors: int):
+    """One public prompt per new author; the i-th prompt gets i likes."""
+    users = [make_user(f"{prefix}{i}") for i in range(authors)]
+    prompts = [models.Prompt(content=f"Prompt by {user.username}", is_public=True, user_id=user.id) for user in users]
+    db.add_all(prompts)
+    db.commit()
+    for i, prompt in enumerate(prompts):
+        db.add_all(models.PromptLike(prompt_id=prompt.id, user_id=user.id) for user in users[:i])
+    db.commit()
+
+
+def _selects(statements) -> int:
+    return sum(1 for sql in statements if sql.lstrip().upper().startswith("SELECT"))
+
+
+@pytest.mark.parametrize("path, authenticated", [
+    ("/prompts/", False),
+    ("/prompts/most-liked/", False),
+    ("/prompts/mosst-liked/", True),
+    ("/prompts/public_likestatus_most_recent/", True),
+    ("/prompts/public_likestatus_most_recent/", False),
+])
+def test_feed_query_count_does_not_grow_with_the_page(client, db, make_user, count_queries, path, authenticated):
+    viewer = make_user("viewer")
+    headers = viewer.headers if authenticated else {}
+
+    _seed(db, make_user, "small", 2)
+    client.get(path, headers=headers)  # warm up the per-process caches (revocations, admins)
+    with count_queries() as small:
+        assert client.get(path, params={"limit": 20}, headers=headers).status_code == 200
+    _seed(db, make_user, "large", 8)
+    with count_queries() as large:
+        response = client.get(path, params={"limit": 20}, headers=headers)
+
+    assert len(response.json()) == 10
+    assert _selects(large) == _selects(small)
+
+
+def test_feed_items_carry_author_and_like_count(client, db, make_user):
+    _seed(db, make_user, "author", 3)
+
+    items = client.get("/prompts/most-liked/").json()
+
+    assert [(item["author_username"], item["no_of_likes"]) for item in items] == \
+        [("author2", 2), ("author1", 1), ("author0", 0)]
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.database import models
+from app.database.prompt_purge import purge_deleted_prompts
+
+
+@pytest.fixture
+def alice(make_user):
+    return make_user("alice")
+
+
+@pytest.fixture
+def deleted_prompt(client, alice):
+    prompt_id = client.post("/prompts/", json={"content": "Soon gone", "is_public": True},
+                            headers=alice.headers).json()["id"]
+    client.post(f"/prompts/{prompt_id}/like", headers=alice.headers)
+    client.post(f"/prompts/{prompt_id}/comments", json={"content": "Nice"}, headers=alice.headers)
+    assert client.delete(f"/prompts/{prompt_id}", headers=alice.headers).status_code == 204
+    return prompt_id
+
+
+def test_soft_deleted_prompts_disappear_from_every_read(client, alice, deleted_prompt):
+    kept = client.post("/prompts/", json={"content": "Still here", "is_public": True},
+                       headers=alice.headers).json()["id"]
+
+    assert [p["id"] for p in client.get("/prompts/").json()] == [kept]
+    assert [p["id"] for p in client.get(f"/prompts/user/{alice.id}/status", headers=alice.headers).json()] == [kept]
+    assert client.get(f"/prompts/{deleted_prompt}", headers=alice.headers).status_code == 404
+    assert client.get("/prompts/favorites/", headers=alice.headers).json() == []
+    assert client.get("/prompts/getcounts/").json() == 1
+    assert client.delete(f"/prompts/{deleted_prompt}", headers=alice.headers).status_code == 404
+
+
+def test_purge_removes_old_soft_deleted_prompts_with_their_rows(db, deleted_prompt):
+    assert purge_deleted_prompts(db, older_than_days=7)["prompts"] == 0  # deleted just now
+
+    db.query(models.Prompt).filter(models.Prompt.id == deleted_prompt)\
+        .update({models.Prompt.deleted_at: datetime.utcnow() - timedelta(days=8)})
+    db.commit()
+    summary = purge_deleted_prompts(db, older_than_days=7, batch_size=1)
+
+    assert (summary["prompts"], summary["likes"], summary["comments"]) == (1, 1, 1)
+    assert db.query(models.Prompt).execution_options(include_deleted=True).count() == 0
+    assert db.query(models.PromptLike).count() == 0
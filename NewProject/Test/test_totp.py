@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+import pyotp
+import pytest
+from conftest import PASSWORD
+
+from app.core import totp
+from app.database import models
+
+
+@pytest.fixture
+def secret(db, make_user):
+    secret = pyotp.random_base32()
+    alice = make_user("alice")
+    db.query(models.User).filter(models.User.id == alice.id).update(
+        {models.User.totp_enabled: True, models.User.totp_secret: secret})
+    db.commit()
+    return secret
+
+
+def _login(client, code=None):
+    return client.post("/auth/token1", json={"username": "alice", "password": PASSWORD, "totp_code": code})
+
+
+def test_login_requires_a_valid_totp_code(client, secret):
+    assert _login(client).status_code == 418
+    assert _login(client, "abcdef").status_code == 418
+    assert _login(client, pyotp.TOTP(secret).now()).status_code == 200
+
+
+def test_a_totp_code_is_accepted_once(client, secret):
+    code = pyotp.TOTP(secret).now()
+    assert _login(client, code).status_code == 200
+    assert _login(client, code).status_code == 418
+
+
+def test_blocking_stores_are_called_off_the_event_loop(monkeypatch):
+    calls = []
+
+    class SlowUsedSteps(totp.MemoryUsedSteps):
+        blocking = True
+
+        def add_once(self, user_id, step, ttl):
+            calls.append(threading.current_thread())
+            return super().add_once(user_id, step, ttl)
+
+    monkeypatch.setattr(totp, "used_steps", SlowUsedSteps())
+    secret = pyotp.random_base32()
+
+    async def verify():
+        return await totp.verify_totp_async(1, secret, pyotp.TOTP(secret).now()), threading.current_thread()
+
+    accepted, loop_thread = asyncio.run(verify())
+    assert accepted
+    assert calls and calls[0] is not loop_thread
@@ -0,0 +1,70 @@
+import pytest
+
+from app.database import crud, models
+from app.database.user_purge import purge_user
+
+
+def _comment(client, user, prompt_id, content):
+    response = client.post(f"/prompts/{prompt_id}/comments", json={"content": content}, headers=user.headers)
+    assert response.status_code == 201, response.text
+    return response.json()["comment_id"]
+
+
+def test_purge_removes_everything_the_user_owns(client, db, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    own_prompt = client.post("/prompts/", json={"content": "Alice's", "is_public": True},
+                             headers=alice.headers).json()["id"]
+    bobs_prompt = client.post("/prompts/", json={"content": "Bob's", "is_public": True},
+                              headers=bob.headers).json()["id"]
+    client.post(f"/prompts/{bobs_prompt}/like", headers=alice.headers)
+    _comment(client, alice, bobs_prompt, "on a live prompt")
+    deleted_prompt = client.post("/prompts/", json={"content": "Bob's, deleted", "is_public": True},
+                                 headers=bob.headers).json()["id"]
+    _comment(client, alice, deleted_prompt, "on a soft-deleted prompt")
+    client.delete(f"/prompts/{deleted_prompt}", headers=bob.headers)
+
+    crud.delete_user(db, alice.id)
+    summary = purge_user(db, alice.id, batch_size=1, progress=None)
+
+    assert summary["done"]
+    assert (summary["likes"], summary["comments"], summary["prompts"]) == (1, 2, 1)
+    assert db.get(models.User, alice.id) is None
+    assert db.query(models.PromptComment).execution_options(include_deleted=True).count() == 0
+    assert db.query(models.Prompt).filter(models.Prompt.id == own_prompt)\
+        .execution_options(include_deleted=True).count() == 0
+    assert db.get(models.User, bob.id) is not None
+
+    # A repeated job finds nothing left to do
+    assert purge_user(db, alice.id, progress=None)["done"]
+
+
+def test_purging_a_user_that_is_not_marked_fails_without_deleting(client, db, make_user):
+    alice = make_user("alice")
+    client.post("/prompts/", json={"content": "Keep me", "is_public": True}, headers=alice.headers)
+
+    with pytest.raises(RuntimeError):
+        purge_user(db, alice.id, progress=None)
+
+    assert db.get(models.User, alice.id) is not None
+    assert db.query(models.Prompt).filter(models.Prompt.user_id == alice.id).count() == 1
+
+
+def test_purge_deletes_comments_without_a_path(client, db, make_user):
+    alice, bob = make_user("alice"), make_user("bob")
+    bobs_prompt = client.post("/prompts/", json={"content": "Bob's", "is_public": True},
+                              headers=bob.headers).json()["id"]
+    # A comment written before comment paths existed
+    db.add(models.PromptComment(prompt_id=bobs_prompt, user_id=alice.id, content="legacy", path=None))
+    db.query(models.Prompt).filter(models.Prompt.id == bobs_prompt).update({models.Prompt.comment_count: 1})
+    db.commit()
+
+    crud.delete_user(db, alice.id)
+    def progress(summary):
+        assert summary["comments"] <= 1, "the same comment was deleted again"
+
+    summary = purge_user(db, alice.id, batch_size=10, progress=progress)
+
+    assert summary["comments"] == 1
+    db.expire_all()
+    assert db.query(models.PromptComment).count() == 0
+    assert db.get(models.Prompt, bobs_prompt).comment_count == 0
@@ -1,6 +1,8 @@
-from typing import List
+import base64
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status , Query
+from fastapi import APIRouter, Depends, HTTPException, status , Query, UploadFile, File
 from sqlalchemy.orm import Session
 from sqlalchemy.sql.functions import current_user
 
@@ -9,11 +11,20 @@ from app.core.security import get_password_hash
 from app.database import crud
 from app.database.crud import get_user_count
 from app.schemas import user as user_schemas
-from app.database.database import get_db
+from app.database.database import get_db, SessionLocal
 from app.schemas.user import UserPublic, UserInDB
 from app.database.models import AdminUser, User as UserModel
+from app.core.permissions import SUPERADMIN_ID, admin_cache, is_admin
 from app.schemas import prompt as prompt_schemas
 from app.api.audit_deps import audit_request
+from app.api.streaming import export_response
+from app.api.serialization import FastJSONResponse, list_response, USER_PUBLIC_LIST, USER_RESPONSE_LIST, \
+    PROMPT_DUPLICATE_GROUP_LIST, JOB_LIST
+from app.schemas import audit as audit_schemas
+from app.schemas import job as job_schemas
+from app.database import prompt_import
+from app.database import prompt_dedup
+from app.core import jobs
 
 router = APIRouter(prefix="/admin", tags=["admin-management"])
 
@@ -21,9 +32,9 @@ def is_user_admin_check(db: Session, user_id: int) -> bool:
     """
     Checks if a given user ID corresponds to an administrator.
     This function can be called from any other function that has access to a DB session.
+    Uses the cached admin id list; for the current user prefer permissions.is_admin(current_user).
     """
-    admin_entry = db.query(AdminUser).filter(AdminUser.user_id == user_id).first()
-    return bool(admin_entry) # Returns True if found, False otherwise
+    return admin_cache.is_admin(db, user_id)
 
 @router.post("/add_admin/{user_id}", response_model=UserPublic, status_code=status.HTTP_201_CREATED,dependencies=[Depends(audit_request)])
 async def add_user_to_admins(
@@ -42,7 +53,7 @@ async def add_user_to_admins(
 
     # 2. Check if they are already an admin
     existing_admin_entry = db.query(AdminUser).filter(AdminUser.user_id == user_id).first()
-    if existing_admin_entry or user_id == 1:
+    if existing_admin_entry or user_id == SUPERADMIN_ID:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Kullanıcı zaten yönetici")
 
     # 3. Create a new AdminUser entry
@@ -50,6 +61,7 @@ async def add_user_to_admins(
     db.add(new_admin)
     db.commit()
     db.refresh(new_admin) # Refresh to get any default values/relationship updates
+    admin_cache.invalidate()
 
     return UserPublic.model_validate(user_to_make_admin) # Return public data of the now-admin user
 
@@ -76,10 +88,11 @@ async def remove_user_from_admins(
 
     db.delete(admin_entry)
     db.commit()
+    admin_cache.invalidate()
     return {"message": "Kullanıcı yönetici listesinden başarıyla çıkartıldı"}
 
 # You might want to list all admins (optional)
-@router.get("/list_admins", response_model=list[UserPublic])
+@router.get("/list_admins", response_model=list[UserPublic], response_class=FastJSONResponse)
 async def list_admins(
     current_admin: UserInDB = Depends(get_current_admin_user), # Requires admin
     db: Session = Depends(get_db)
@@ -92,9 +105,9 @@ async def list_admins(
     # You might consider joining with User model here if you frequently need user details for admins
     admin_user_ids = [admin_entry.user_id for admin_entry in admin_users]
     users_with_admin_priv = db.query(UserModel).filter(UserModel.id.in_(admin_user_ids)).all()
-    return [UserPublic.model_validate(user) for user in users_with_admin_priv]
+    return list_response(USER_PUBLIC_LIST, users_with_admin_priv)
 
-@router.get("/", response_model=List[user_schemas.UserResponse])
+@router.get("/", response_model=List[user_schemas.UserResponse], response_class=FastJSONResponse)
 async def read_users(
     db: Session = Depends(get_db),
     current_admin: UserInDB = Depends(get_current_admin_user),  # Requires admin,
@@ -106,7 +119,7 @@ async def read_users(
     Note: In a real application, this would typically be restricted to administrators.
     """
     users = crud.get_users(db, skip=skip, limit=limit)
-    return users
+    return list_response(USER_RESPONSE_LIST, users)
 
 
 
@@ -117,7 +130,7 @@ async def deleted_byadmin_prompt_endpoint( # Changed to async def
     db: Session = Depends(get_db) # Using get_db directly
 ):
     """
-    Admin-level endpoint to soft-delete a prompt by marking its content.
+    Admin-level endpoint to soft-delete a prompt (deleted_at; purged later in the background).
     Only accessible by administrators.
     Admins CANNOT delete posts authored by other administrators.
     """
@@ -126,15 +139,14 @@ async def deleted_byadmin_prompt_endpoint( # Changed to async def
     if not db_prompt:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
 
-    if  db_prompt.user_id == 1 : #is_user_admin_check(db,db_prompt.user_id) or
+    if db_prompt.user_id == SUPERADMIN_ID: #is_user_admin_check(db,db_prompt.user_id) or
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to soft delete this prompt")
 
-    update_string = "Bu prompt admin tarafından silindi admin_id: " + str(current_admin.id)
-    prompt_update = prompt_schemas.PromptCreate(content=update_string)
-    updated_prompt = crud.update_prompt(db=db, prompt_id=prompt_id, prompt_update=prompt_update)
-    if updated_prompt.author:
-        updated_prompt.author_username = updated_prompt.author.username
-    return updated_prompt
+    if db_prompt.author:
+        db_prompt.author_username = db_prompt.author.username
+    response = prompt_schemas.PromptPublic.model_validate(db_prompt)
+    crud.soft_delete_prompt(db, prompt_id=prompt_id)
+    return response
 
 
 
@@ -153,7 +165,7 @@ async def admin_delete_user_endpoint(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Kullanıcı bulunamadı")
 
     # Authorization check: User can only delete their own account for now
-    if is_user_admin_check(db,user_id) or user_id == 1 : #is_user_admin_check(db,user_id) or
+    if is_user_admin_check(db, user_id): # includes the superadmin
         # If you had an admin role, you'd check:
         # if not current_user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu kullanıcıyı silmek için gerekli yetkilere sahip değilsiniz")
@@ -161,6 +173,8 @@ async def admin_delete_user_endpoint(
     success = crud.delete_user(db, user_id=user_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Kullanıcı silindi")
+    # The account is disabled now; its prompts, likes and comments are removed by a background job
+    jobs.enqueue(db, "purge_user", {"user_id": user_id})
     return {"mesaj": "Kullanıcı başarılı bir şekilde silindi"}
 
 """"
@@ -195,17 +209,258 @@ async def if_admin( # Changed to async def
     current_user: user_schemas.UserInDB = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    if is_user_admin_check(db,current_user.id) or current_user.id == 1:
-        return True
-    else:
-        return False
+    return is_admin(current_user)
 
 @router.get("/usercount/", response_model=int)
 async def get_count_user(
     current_user: user_schemas.UserInDB = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    if is_user_admin_check(db, current_user.id) or current_user.id == 1:
+    if is_admin(current_user):
         return get_user_count(db)
     else:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to get user count")
+
+
+# --- Audit log access ---
+
+def _encode_audit_cursor(timestamp: datetime, log_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{log_id}".encode()).decode()
+
+def _decode_audit_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        timestamp, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Audit timestamps are stored as naive UTC; an explicit offset is converted to it
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+def audit_log_filters(
+    user_id: Optional[int] = Query(None, description="Only requests made by this user ID."),
+    endpoint: Optional[str] = Query(None, description="Exact request path, e.g. /prompts/."),
+    ip_address: Optional[str] = Query(None, max_length=45),
+    start: Optional[datetime] = Query(None, description="Inclusive lower bound of the time range (UTC unless an offset is given)."),
+    end: Optional[datetime] = Query(None, description="Exclusive upper bound of the time range (UTC unless an offset is given)."),
+) -> dict:
+    """Shared query parameters of the audit log endpoints."""
+    return {"user_id": user_id, "endpoint": endpoint, "ip_address": ip_address,
+            "start": _as_naive_utc(start), "end": _as_naive_utc(end)}
+
+@router.get("/audit-logs/", response_model=audit_schemas.AuditLogPage)
+async def read_audit_logs(
+    filters: dict = Depends(audit_log_filters),
+    cursor: Optional[str] = Query(None, description="'next_cursor' from the previous page."),
+    limit: int = Query(100, ge=1, le=500),
+    current_admin: UserInDB = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Lists audit logs, newest first, filtered by user, endpoint, IP and time range.
+    Uses keyset pagination: follow 'next_cursor' until it is null.
+    """
+    before = _decode_audit_cursor(cursor) if cursor else None
+    logs = crud.get_audit_logs(db, before=before, limit=limit + 1, **filters)
+
+    next_cursor = None
+    if len(logs) > limit:
+        logs = logs[:limit]
+        next_cursor = _encode_audit_cursor(logs[-1].timestamp, logs[-1].id)
+    return audit_schemas.AuditLogPage(items=logs, next_cursor=next_cursor)
+
+@router.get("/audit-logs/export", dependencies=[Depends(audit_request)])
+async def export_audit_logs(
+    filters: dict = Depends(audit_log_filters),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_admin: UserInDB = Depends(get_current_admin_user),
+):
+    """
+    Streams every matching audit log, oldest first, as NDJSON or CSV.
+    Rows are read from a server-side cursor and sent in chunks, so memory use does not
+    depend on the size of the result set.
+    """
+    def rows():
+        # The request's get_db session is already closed while the body streams.
+        db = SessionLocal()
+        try:
+            yield from crud.iter_audit_logs(db, **filters)
+        finally:
+            db.close()
+
+    return export_response(rows(), crud.AUDIT_EXPORT_COLUMNS, export_format, "audit_logs")
+
+
+# --- Bulk exports ---
+# Full-corpus dumps for backups and analytics. Each export streams from server-side cursors in
+# its own sessions, so memory stays constant regardless of table size; ?gzip=true compresses on the fly.
+
+@router.get("/export/prompts", dependencies=[Depends(audit_request)])
+async def export_prompts(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    compress: bool = Query(False, alias="gzip"),
+    public_only: bool = Query(False),
+    current_admin: UserInDB = Depends(get_current_admin_user),
+):
+    """
+    Streams all prompts with author username, labels, like count and comment count.
+    """
+    def rows():
+        db = SessionLocal()
+        label_db = SessionLocal()
+        try:
+            yield from crud.iter_prompts_export(db, label_db, public_only=public_only)
+        finally:
+            label_db.close()
+            db.close()
+
+    return export_response(rows(), crud.PROMPT_EXPORT_COLUMNS, export_format, "prompts", compress=compress)
+
+@router.get("/export/likes", dependencies=[Depends(audit_request)])
+async def export_likes(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    compress: bool = Query(False, alias="gzip"),
+    current_admin: UserInDB = Depends(get_current_admin_user),
+):
+    """
+    Streams all prompt likes as (id, prompt_id, user_id) rows.
+    """
+    def rows():
+        db = SessionLocal()
+        try:
+            yield from crud.iter_likes_export(db)
+        finally:
+            db.close()
+
+    return export_response(rows(), crud.LIKE_EXPORT_COLUMNS, export_format, "prompt_likes", compress=compress)
+
+@router.get("/export/comments", dependencies=[Depends(audit_request)])
+async def export_comments(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    compress: bool = Query(False, alias="gzip"),
+    current_admin: UserInDB = Depends(get_current_admin_user),
+):
+    """
+    Streams all comments with their author usernames.
+    """
+    def rows():
+        db = SessionLocal()
+        try:
+            yield from crud.iter_comments_export(db)
+        finally:
+            db.close()
+
+    return export_response(rows(), crud.COMMENT_EXPORT_COLUMNS, export_format, "prompt_comments", compress=compress)
+
+
+# --- Bulk import ---
+
+@router.post("/import/prompts", response_model=prompt_schemas.PromptImportReport, dependencies=[Depends(audit_request)])
+def import_prompts_endpoint(
+    file: UploadFile = File(..., description="JSONL or CSV file of prompts."),
+    import_format: Optional[str] = Query(None, alias="format", pattern="^(jsonl|csv)$",
+                                         description="Defaults to the file extension."),
+    owner_id: Optional[int] = Query(None, description="Owner of the imported prompts; defaults to the calling admin."),
+    batch_size: int = Query(prompt_import.DEFAULT_BATCH_SIZE, ge=1, le=5000),
+    current_admin: UserInDB = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Imports a prompt collection in batches, creating missing labels on the way.
+    Invalid rows are reported with their line numbers and skipped; valid rows are still imported.
+    Declared as a plain 'def' so the long-running import runs in the threadpool.
+    """
+    user_id = owner_id if owner_id is not None else current_admin.id
+    if owner_id is not None and not crud.get_user(db, user_id=owner_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Kullanıcı bulunamadı.")
+
+    if import_format is None:
+        import_format = "csv" if (file.filename or "").lower().endswith(".csv") else "jsonl"
+
+    return prompt_import.import_prompts(
+        db, prompt_import.parse_import_file(file.file, import_format), user_id, batch_size=batch_size
+    )
+
+
+# --- Duplicate prompts ---
+
+@router.get("/prompts/duplicates", response_model=List[prompt_schemas.PromptDuplicateGroup], response_class=FastJSONResponse)
+async def list_duplicate_prompts_endpoint(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    current_admin: UserInDB = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Lists groups of live prompts with the same normalized content, largest first.
+    Prompts created before content hashing need the 'backfill_content_hashes' job first.
+    """
+    return list_response(PROMPT_DUPLICATE_GROUP_LIST, prompt_dedup.duplicate_groups(db, skip=skip, limit=limit))
+
+
+# --- Background jobs ---
+
+@router.get("/jobs", response_model=List[job_schemas.JobResponse], response_class=FastJSONResponse)
+async def list_jobs_endpoint(
+    job_status: Optional[str] = Query(None, alias="status", pattern="^(queued|running|succeeded|failed)$"),
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_admin: UserInDB = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Lists background jobs, newest first, optionally filtered by status and kind.
+    """
+    return list_response(JOB_LIST, jobs.list_jobs(db, status=job_status, kind=kind, limit=limit))
+
+
+@router.post("/jobs", response_model=job_schemas.JobResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(audit_request)])
+async def enqueue_job_endpoint(
+    job_in: job_schemas.JobCreate,
+    current_admin: UserInDB = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Enqueues a maintenance job (e.g. recount_comment_counts, purge_deleted_prompts, audit_maintenance).
+    """
+    try:
+        return jobs.enqueue(db, job_in.kind, job_in.payload, delay_seconds=job_in.delay_seconds)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Unknown job kind; expected one of {jobs.registered_kinds()}")
+
+
+@router.get("/jobs/{job_id}", response_model=job_schemas.JobResponse)
+async def get_job_endpoint(
+    job_id: int,
+    current_admin: UserInDB = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Shows one job: status, attempts, last error and result.
+    """
+    job = jobs.get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@router.post("/jobs/{job_id}/retry", response_model=job_schemas.JobResponse, dependencies=[Depends(audit_request)])
+async def retry_job_endpoint(
+    job_id: int,
+    current_admin: UserInDB = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Queues a failed job again with a fresh set of attempts.
+    """
+    job = jobs.retry_job(db, job_id)
+    if job is None:
+        if jobs.get_job(db, job_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Only failed jobs can be retried")
+    return job
@@ -1,16 +1,20 @@
 # my_fastapi_angular_backend_v2/app/api/routers/comments.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Request
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from app.database import crud, models  # Import models for type checking db_objects
 from app.schemas import comment as comment_schemas
 from app.schemas import user as user_schemas  # Needed for get_current_active_user's return type
 
 from app.api.deps import get_current_active_user
+from app.core.config import settings
+from app.core.permissions import can_manage
 from app.database.database import get_db
 from app.api.audit_deps import audit_request
+from app.api.conditional import make_etag, etag_matches, validator_headers, not_modified
+from app.api.serialization import FastJSONResponse, list_response, COMMENT_LIST, COMMENT_PREVIEWS
 router = APIRouter(
     tags=["Comments"],  # Tag for OpenAPI/Swagger UI
 )
@@ -27,7 +31,7 @@ async def create_comment_for_prompt(
         db: Session = Depends(get_db)
 ):
     """
-    Create a new comment for a specific prompt.
+    Create a new comment for a specific prompt, or a reply when 'parent_id' is given.
     Requires authentication.
     """
     # First, check if the prompt exists
@@ -35,7 +39,15 @@ async def create_comment_for_prompt(
     if not db_prompt:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
 
-    db_comment = crud.create_comment(db, comment=comment, user_id=current_user.id, prompt_id=prompt_id)
+    parent = None
+    if comment.parent_id is not None:
+        parent = crud.get_comment(db, comment_id=comment.parent_id)
+        if not parent or parent.prompt_id != prompt_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Yanıtlanan yorum bulunamadı")
+        if parent.depth + 1 > settings.COMMENT_MAX_DEPTH:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Maximum reply depth reached")
+
+    db_comment = crud.create_comment(db, comment=comment, user_id=current_user.id, prompt_id=prompt_id, parent=parent)
 
     # Populate author_username for the response (N+1 query here if not eager loaded)
     db_comment.author_username = current_user.username
@@ -45,23 +57,36 @@ async def create_comment_for_prompt(
 
 # --- Endpoint 2: Get All Comments for a Specific Prompt ---
 # Path: /prompts/{prompt_id}/comments (list all comments for a prompt)
-@router.get("/prompts/{prompt_id}/comments", response_model=List[comment_schemas.CommentResponse])
+@router.get("/prompts/{prompt_id}/comments", response_model=List[comment_schemas.CommentResponse],
+            response_class=FastJSONResponse)
 async def get_comments_for_prompt_endpoint(
         prompt_id: int,
+        request: Request,
         db: Session = Depends(get_db),  # Public endpoint, no authentication needed
         skip: int = Query(0, ge=0),
-        limit: int = Query(100, ge=1, le=100)
+        limit: int = Query(100, ge=1, le=100),
+        top_level_only: bool = Query(False, description="Skip replies; load threads with /comments/{id}/thread")
 ):
     """
     Retrieve all comments for a specific prompt. Publicly accessible.
     Author usernames are included for display.
+    Supports conditional requests: a matching If-None-Match returns 304 Not Modified
+    after two small aggregate queries, without loading the comments.
     """
     # Optional: Check if the prompt exists (if you want 404 for non-existent prompt IDs)
-    db_prompt = crud.get_prompt(db, prompt_id=prompt_id)
-    if not db_prompt:
+    if not crud.prompt_exists(db, prompt_id=prompt_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
 
-    comments = crud.get_comments_for_prompt(db, prompt_id=prompt_id, skip=skip, limit=limit)
+    comments_version, last_change = crud.get_comments_version(db, prompt_id=prompt_id)
+    headers = validator_headers(
+        make_etag("comments", prompt_id, skip, limit, top_level_only, comments_version),
+        last_modified=last_change,
+    )
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+
+    comments = crud.get_comments_for_prompt(db, prompt_id=prompt_id, skip=skip, limit=limit,
+                                            top_level_only=top_level_only)
 
     # IMPORTANT: Populating author_username for each comment
     # This loop will trigger an N+1 query problem if not using joinedload.
@@ -73,7 +98,83 @@ async def get_comments_for_prompt_endpoint(
         else:
             comment.author_username = None  # Fallback if user somehow doesn't exist (e.g., deleted)
 
-    return comments
+    return list_response(COMMENT_LIST, comments, headers=headers)
+
+
+def _thread_response(db: Session, request: Request, prompt_id: int, root: Optional[models.PromptComment],
+                     max_depth: Optional[int], limit: int):
+    comments_version, last_change = crud.get_comments_version(db, prompt_id=prompt_id)
+    headers = validator_headers(
+        make_etag("thread", prompt_id, root.comment_id if root else None, max_depth, limit, comments_version),
+        last_modified=last_change,
+    )
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+
+    comments = crud.get_comment_thread(db, prompt_id=prompt_id, root=root, max_depth=max_depth, limit=limit)
+    for comment in comments:
+        comment.author_username = comment.user.username if comment.user else None  # joined-loaded
+    return list_response(COMMENT_LIST, comments, headers=headers)
+
+
+# --- Endpoint 2b: Get the Comment Tree of a Prompt ---
+# Path: /prompts/{prompt_id}/comments/thread
+@router.get("/prompts/{prompt_id}/comments/thread", response_model=List[comment_schemas.CommentResponse],
+            response_class=FastJSONResponse)
+async def get_prompt_comment_tree_endpoint(
+        prompt_id: int,
+        request: Request,
+        db: Session = Depends(get_db),  # Public endpoint, no authentication needed
+        max_depth: Optional[int] = Query(None, ge=0, description="Reply levels to include; 0 = top-level only"),
+        limit: int = Query(500, ge=1, le=1000)
+):
+    """
+    Retrieve all comments of a prompt as threads, in rendering order: every comment is
+    followed by its replies (oldest first), with 'depth' for indentation. One range query.
+    """
+    if not crud.prompt_exists(db, prompt_id=prompt_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
+    return _thread_response(db, request, prompt_id, None, max_depth, limit)
+
+
+# --- Endpoint 2c: Get a Comment with its Replies ---
+# Path: /comments/{comment_id}/thread
+@router.get("/comments/{comment_id}/thread", response_model=List[comment_schemas.CommentResponse],
+            response_class=FastJSONResponse)
+async def get_comment_thread_endpoint(
+        comment_id: int,
+        request: Request,
+        db: Session = Depends(get_db),  # Public endpoint, no authentication needed
+        max_depth: Optional[int] = Query(None, ge=0, description="Reply levels below the comment to include"),
+        limit: int = Query(500, ge=1, le=1000)
+):
+    """
+    Retrieve a comment followed by its replies (the subtree) in rendering order,
+    optionally only 'max_depth' levels deep. One range query.
+    """
+    db_comment = crud.get_comment(db, comment_id=comment_id)
+    if not db_comment:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Comment not found")
+    return _thread_response(db, request, db_comment.prompt_id, db_comment, max_depth, limit)
+
+
+# --- Endpoint 2d: Latest Comments for a Page of Prompts ---
+# Path: /comments/preview?prompt_id=1&prompt_id=2... (declared before /comments/{comment_id})
+@router.get("/comments/preview", response_model=Dict[int, List[comment_schemas.CommentResponse]],
+            response_class=FastJSONResponse)
+async def get_comment_previews_endpoint(
+        prompt_id: List[int] = Query(..., max_length=100, description="Prompt IDs of the page (repeat the parameter)"),
+        per_prompt: int = Query(2, ge=1, le=10),
+        db: Session = Depends(get_db)  # Public endpoint, no authentication needed
+):
+    """
+    Retrieve the latest 'per_prompt' comments (newest first) for each of up to 100 prompts,
+    keyed by prompt ID, in a single query. Lets a feed page show comment previews under
+    every card without one /prompts/{id}/comments call per prompt.
+    """
+    prompt_ids = list(dict.fromkeys(prompt_id))
+    previews = crud.get_latest_comments_for_prompts(db, prompt_ids=prompt_ids, per_prompt=per_prompt)
+    return list_response(COMMENT_PREVIEWS, previews)
 
 
 # --- Endpoint 3: Get a Single Comment by ID ---
@@ -140,16 +241,15 @@ async def delete_comment_endpoint(
         db: Session = Depends(get_db)
 ):
     """
-    Delete a comment.
-    Only the author of the comment can delete it. (Admin check logic is at admin page).
+    Delete a comment together with all replies below it.
+    Only the author of the comment or an admin can delete it.
     """
     db_comment = crud.get_comment(db, comment_id=comment_id)
     if not db_comment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Yorum bulunamadı")
 
-    # Authorization check: Only the comment's author can delete it
-    # Future: if db_comment.user_id != current_user.id and not current_user.is_admin:
-    if db_comment.user_id != current_user.id and current_user.id != 1:
+    # Authorization check: the comment's author or an admin
+    if not can_manage(current_user, db_comment.user_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu yorumu silmek için yetkili değilsiniz")
 
     success = crud.delete_comment(db, comment_id=comment_id)
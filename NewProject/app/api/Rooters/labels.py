@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from app.api.Rooters.admin import is_user_admin_check
+from app.core.permissions import can_manage, is_admin
 from app.api.deps import get_current_admin_user, get_current_active_userv1, get_current_active_user
 from app.database import crud  # Your CRUD functions
 from app.database.database import get_db  # Your database session dependency
@@ -11,6 +11,9 @@ from app.database.models import User, Prompt
 from app.schemas import label as label_schemas
 from app.schemas.prompt import PromptWithLikeStatus
 from app.schemas.user import UserInDB
+from app.api.conditional import make_etag, etag_matches, validator_headers, not_modified
+from app.api.serialization import FastJSONResponse, list_response, prompts_with_like_status, \
+    PROMPT_WITH_LIKE_STATUS_LIST, LABEL_LIST
 
 # Assuming you have an authentication dependency, e.g., for admin users
 # from app.dependencies import get_current_active_admin_user # Or similar
@@ -52,7 +55,7 @@ async def delete_label_endpoint(
     Requires admin privileges.
     """
     # Check for admin permissions
-    if not (is_user_admin_check(db,current_user.id) or current_user.id==1): # Replace with your admin check
+    if not is_admin(current_user):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only administrators can delete labels")
 
     if not crud.delete_label_by_name(db, label_name):
@@ -72,7 +75,7 @@ async def update_label_endpoint(
     Update a label's name. Requires admin privileges.
     """
     # Check for admin permissions
-    if not (is_user_admin_check(db,current_user.id)or current_user.id==1): # Replace with your admin check function
+    if not is_admin(current_user):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only administrators can update labels")
 
     updated_label = crud.update_label(db, label_id, label_update)
@@ -100,13 +103,17 @@ async def read_label(label_name: str, db: Session = Depends(get_db)):
     return db_label
 
 
-@router.get("/", response_model=List[label_schemas.LabelResponse])
-async def read_labels(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=List[label_schemas.LabelResponse], response_class=FastJSONResponse)
+async def read_labels(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """
     Retrieve a list of labels.
+    Supports conditional requests (ETag / If-None-Match -> 304 Not Modified).
     """
     labels = crud.get_labels(db, skip=skip, limit=limit)
-    return labels
+    headers = validator_headers(make_etag("labels", skip, limit, [(label.id, label.name) for label in labels]))
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    return list_response(LABEL_LIST, labels, headers=headers)
 
 
 
@@ -126,7 +133,7 @@ async def add_label_to_prompt_endpoint(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
 
     # Check for writer or admin permissions
-    if db_prompt.user_id != current_user.id and not (is_user_admin_check(db,current_user.id) or current_user.id == 1):
+    if not can_manage(current_user, db_prompt.user_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to modify this prompt")
 
     db_association = crud.add_label_to_prompt(db, prompt_id, label_name)
@@ -152,7 +159,7 @@ async def remove_label_from_prompt_endpoint(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
 
     # Check for writer or admin permissions
-    if db_prompt.user_id != current_user.id and not (is_user_admin_check(db,current_user.id) or current_user.id == 1):
+    if not can_manage(current_user, db_prompt.user_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to modify this prompt")
 
     if not crud.remove_label_from_prompt(db, prompt_id, label_name):
@@ -166,7 +173,7 @@ async def remove_label_from_prompt_endpoint(
 
 # --- New Endpoints for Filtered Prompts ---
 
-@router.get("/most-liked-by-label/{label_name}", response_model=List[PromptWithLikeStatus])
+@router.get("/most-liked-by-label/{label_name}", response_model=List[PromptWithLikeStatus], response_class=FastJSONResponse)
 async def get_most_liked_prompts_by_label_endpoint(
     label_name: str ,
     db: Session = Depends(get_db),
@@ -186,25 +193,13 @@ async def get_most_liked_prompts_by_label_endpoint(
         limit=limit
     )
 
-    response_prompts = []
     if results is None:
-        return []
-    for item in results:
-        if current_user:
-            db_prompt_orm, is_liked_by_user = item
-        else:
-            db_prompt_orm = item
-            is_liked_by_user = False
-
-        prompt_with_status = PromptWithLikeStatus.from_orm(db_prompt_orm)
-        prompt_with_status.is_liked_by_user = is_liked_by_user
-        prompt_with_status.author_username = db_prompt_orm.author.username if db_prompt_orm.author else None
-        response_prompts.append(prompt_with_status)
-
-    return response_prompts
+        return list_response(PROMPT_WITH_LIKE_STATUS_LIST, [])
+    prompts = prompts_with_like_status(db, results, with_like_status=current_user is not None)
+    return list_response(PROMPT_WITH_LIKE_STATUS_LIST, prompts)
 
 
-@router.get("/most-recent-by-label/{label_name}", response_model=List[PromptWithLikeStatus])
+@router.get("/most-recent-by-label/{label_name}", response_model=List[PromptWithLikeStatus], response_class=FastJSONResponse)
 async def get_most_recent_prompts_by_label_endpoint(
     label_name: str ,
     db: Session = Depends(get_db),
@@ -224,25 +219,13 @@ async def get_most_recent_prompts_by_label_endpoint(
         limit=limit
     )
 
-    response_prompts = []
     if results is None:
-        return []
-    for item in results:
-        if current_user:
-            db_prompt_orm, is_liked_by_user = item
-        else:
-            db_prompt_orm = item
-            is_liked_by_user = False
-
-        prompt_with_status = PromptWithLikeStatus.from_orm(db_prompt_orm)
-        prompt_with_status.is_liked_by_user = is_liked_by_user
-        prompt_with_status.author_username = db_prompt_orm.author.username if db_prompt_orm.author else None
-        response_prompts.append(prompt_with_status)
-
-    return response_prompts
+        return list_response(PROMPT_WITH_LIKE_STATUS_LIST, [])
+    prompts = prompts_with_like_status(db, results, with_like_status=current_user is not None)
+    return list_response(PROMPT_WITH_LIKE_STATUS_LIST, prompts)
 
 
-@router.get("/{prompt_id}/labels", response_model=List[label_schemas.LabelResponse])
+@router.get("/{prompt_id}/labels", response_model=List[label_schemas.LabelResponse], response_class=FastJSONResponse)
 async def get_labels_for_prompt_endpoint(
         prompt_id: int,
         db: Session = Depends(get_db),
@@ -269,4 +252,4 @@ async def get_labels_for_prompt_endpoint(
         # If the list is empty for other reasons (e.g., prompt has no labels),
         # it will just return an empty list, which is the correct behavior.
 
-    return labels
\ No newline at end of file
+    return list_response(LABEL_LIST, labels)
\ No newline at end of file
@@ -1,6 +1,7 @@
 # my_fastapi_angular_backend_v2/app/api/routers/prompts.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
 from sqlalchemy import Boolean, and_, desc
 from sqlalchemy.orm import Session, joinedload
@@ -21,7 +22,15 @@ from app.api.deps import get_current_active_user, OptionalAuthUser, get_current_
 from app.database.database import get_db # For DB session (the original generator)
 from app.api.deps import get_current_admin_user
 from app.api.audit_deps import audit_request
+from app.api.conditional import make_etag, etag_matches, validator_headers, not_modified
+from app.api.sse import sse_response
+from app.core.permissions import can_manage
+from app.core.events import prompt_channel
+from app.api.serialization import FastJSONResponse, list_response, prompts_with_like_status, public_prompts, \
+    PROMPT_PUBLIC_LIST, PROMPT_WITH_LIKE_STATUS_LIST
 from app.database.models import Prompt as PromptModel
+from app.database import prompt_dedup
+from app.core.config import settings
 router = APIRouter(
     prefix="/prompts",
     tags=["Prompts"],
@@ -35,6 +44,7 @@ router = APIRouter(
 @router.post("/", response_model=prompt_schemas.PromptPublic, status_code=status.HTTP_201_CREATED,dependencies=[Depends(audit_request)])
 async def create_prompt_endpoint( # Changed to async def
     prompt: prompt_schemas.PromptCreate,
+    response: Response,
     current_user: user_schemas.UserInDB = Depends(get_current_active_user),
     db: Session = Depends(get_db) # Using get_db directly
 ):
@@ -42,26 +52,78 @@ async def create_prompt_endpoint( # Changed to async def
     Logs are stored via dependencies = Depends(audit_request) parameter.
     Create a new prompt for the authenticated user.
     The user can specify if it's public or private.
+    Prompts the user can see with the same (normalized) content are listed in the X-Duplicate-Of
+    header; with PROMPT_REJECT_OWN_DUPLICATES a repost of the user's own prompt is refused (409).
     """
+    _reject_own_duplicate(db, prompt.content, current_user.id)
+    duplicates = prompt_dedup.find_duplicates(db, prompt.content, viewer_id=current_user.id)
     db_prompt = crud.create_prompt(db=db, prompt=prompt, user_id=current_user.id)
+    if duplicates:
+        response.headers["X-Duplicate-Of"] = ",".join(str(duplicate.id) for duplicate in duplicates)
     db_prompt.author_username = current_user.username
     return db_prompt
 
 
+def _reject_own_duplicate(db: Session, content: str, user_id: int, exclude_id: Optional[int] = None):
+    if not settings.PROMPT_REJECT_OWN_DUPLICATES:
+        return
+    duplicate_id = prompt_dedup.find_own_duplicate(db, content, user_id, exclude_id=exclude_id)
+    if duplicate_id is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail=f"Aynı içerikte bir promptunuz zaten var (id {duplicate_id})",
+                            headers={"X-Duplicate-Of": str(duplicate_id)})
+
+
+# --- Endpoint 1b: Check for duplicates before creating ---
+@router.post("/duplicates", response_model=List[prompt_schemas.PromptPublic], response_class=FastJSONResponse)
+async def find_duplicate_prompts_endpoint(
+    prompt: prompt_schemas.PromptPure,
+    current_user: Optional[user_schemas.UserInDB] = Depends(OptionalAuthUser),
+    db: Session = Depends(get_db)
+):
+    """
+    Returns existing prompts (public ones and the caller's own) whose content matches the given
+    content after normalization (case, spacing and line breaks are ignored). One index lookup.
+    """
+    duplicates = prompt_dedup.find_duplicates(
+        db, prompt.content, viewer_id=current_user.id if current_user else None)
+    return list_response(PROMPT_PUBLIC_LIST, public_prompts(db, duplicates))
+
+
 # --- Endpoint 2: Get a specific Prompt by ID ---
 @router.get("/{prompt_id}", response_model=prompt_schemas.PromptPublic)
-
 async def get_prompt_by_id_endpoint(
-prompt_id: int,
-db: Session = Depends(get_db), # Using get_db directly
-current_user: Optional[user_schemas.UserInDB] = Depends(get_current_active_user)):
- db_prompt = crud.get_prompt(db, prompt_id=prompt_id)
- if not db_prompt:
-  raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
- if not db_prompt.is_public and (not current_user or db_prompt.user_id != current_user.id)and (current_user.id !=1):
-  raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu promptu görmek için yetkili değilsiniz")
- db_prompt.author_username = db_prompt.author.username if db_prompt.author else None
- return db_prompt
+    prompt_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db), # Using get_db directly
+    current_user: Optional[user_schemas.UserInDB] = Depends(get_current_active_user)
+):
+    """
+    Retrieve a prompt by its ID.
+    Supports conditional requests: send the last ETag back in If-None-Match to get
+    304 Not Modified without the prompt being loaded or serialized again.
+    """
+    version = crud.get_prompt_version(db, prompt_id=prompt_id)
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt not found")
+    if not version.is_public and not can_manage(current_user, version.user_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu promptu görmek için yetkili değilsiniz")
+
+    headers = validator_headers(
+        make_etag("prompt", version.id, version.is_public, version.created_at, version.updated_at,
+                  version.like_count, version.comment_count, version.author_username),
+        last_modified=version.updated_at or version.created_at,
+        private=not version.is_public,
+    )
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
+
+    db_prompt = crud.get_prompt(db, prompt_id=prompt_id)
+    db_prompt.author_username = version.author_username
+    db_prompt.no_of_likes = version.like_count
+    return db_prompt
 
 @router.get("/{prompt_id/pure}", response_model=prompt_schemas.PromptPure)
 async def get_prompt_by_id_pure_prompt( # Changed to async def
@@ -71,22 +133,21 @@ async def get_prompt_by_id_pure_prompt( # Changed to async def
 ):
     """
     Retrieve a prompt by its ID.
-    If the prompt is private, only the author can view it.
-    Only accessible by the super administrator id = 1.
+    If the prompt is private, only the author or an admin can view it.
     """
     db_prompt = crud.get_prompt(db, prompt_id=prompt_id)
     if not db_prompt:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt bulunamadı")
 
     # Check if prompt is private and user is not the author
-    if not db_prompt.is_public and (not current_user or db_prompt.user_id != current_user.id) and (current_user.id !=1) :
+    if not db_prompt.is_public and not can_manage(current_user, db_prompt.user_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu yorumu görmek için yetkili değilsiniz")
     db_return = crud.get_prompt_pure(db, prompt_id=prompt_id)
 
     return db_return
 
 # --- Endpoint 3: Get prompts created by the current user ---
-@router.get("/me/", response_model=List[prompt_schemas.PromptPublic])
+@router.get("/me/", response_model=List[prompt_schemas.PromptPublic], response_class=FastJSONResponse)
 async def get_my_prompts_endpoint( # Changed to async def
     current_user: user_schemas.UserInDB = Depends(get_current_active_user),
     db: Session = Depends(get_db), # Using get_db directly
@@ -97,10 +158,8 @@ async def get_my_prompts_endpoint( # Changed to async def
     Retrieve all prompts created by the authenticated user.
     """
     prompts = crud.get_own_prompts(db, user_id=current_user.id, skip=skip, limit=limit)
-    for prompt in prompts:
-        prompt.author_username = current_user.username
-    return prompts
-@router.get("/user/{user_id}", response_model=List[prompt_schemas.PromptPublic]) # <-- CRUCIAL CHANGE HERE: added "/user"
+    return list_response(PROMPT_PUBLIC_LIST, public_prompts(db, prompts))
+@router.get("/user/{user_id}", response_model=List[prompt_schemas.PromptPublic], response_class=FastJSONResponse) # <-- CRUCIAL CHANGE HERE: added "/user"
 async def get_user_prompts_endpoint(
     user_id: int,
     db: Session = Depends(get_db), # No current_user dependency here, making it truly public
@@ -112,17 +171,11 @@ async def get_user_prompts_endpoint(
     This endpoint does NOT require authentication.
     """
     prompts = crud.get_prompts_by_user(db, user_id=user_id, skip=skip, limit=limit)
-
-    for prompt in prompts:
-        if prompt.author:
-            prompt.author_username = prompt.author.username
-        else:
-            prompt.author_username = None
-    return prompts
+    return list_response(PROMPT_PUBLIC_LIST, public_prompts(db, prompts))
 
 
 # --- Endpoint 4: Get all public prompts (most recent) ---
-@router.get("/", response_model=List[prompt_schemas.PromptPublic])
+@router.get("/", response_model=List[prompt_schemas.PromptPublic], response_class=FastJSONResponse)
 async def get_all_public_prompts_endpoint( # Changed to async def
     db: Session = Depends(get_db), # Using get_db directly
     skip: int = Query(0, ge=0),
@@ -132,13 +185,10 @@ async def get_all_public_prompts_endpoint( # Changed to async def
     Retrieve the most recent public prompts with pagination.
     """
     prompts = crud.get_recent_public_prompts(db, skip=skip, limit=limit)
-    for prompt in prompts:
-        if prompt.author:
-            prompt.author_username = prompt.author.username
-    return prompts
+    return list_response(PROMPT_PUBLIC_LIST, public_prompts(db, prompts))
 
 # --- Endpoint 5: Get most liked public prompts ---
-@router.get("/most-liked/", response_model=List[prompt_schemas.PromptPublic])
+@router.get("/most-liked/", response_model=List[prompt_schemas.PromptPublic], response_class=FastJSONResponse)
 async def get_most_liked_public_prompts_endpoint( # Changed to async def
     db: Session = Depends(get_db), # Using get_db directly
     skip: int = 0,
@@ -148,14 +198,11 @@ async def get_most_liked_public_prompts_endpoint( # Changed to async def
     Retrieve the most liked public prompts with pagination.
     """
     prompts = crud.get_most_liked_public_prompts(db, skip=skip, limit=limit)
-    for prompt in prompts:
-        if prompt.author:
-            prompt.author_username = prompt.author.username
-    return prompts
+    return list_response(PROMPT_PUBLIC_LIST, public_prompts(db, prompts))
 
 
 # --- Endpoint 6: Get prompts liked by the current user (Favorites) ---
-@router.get("/favorites/", response_model=List[prompt_schemas.PromptPublic])
+@router.get("/favorites/", response_model=List[prompt_schemas.PromptPublic], response_class=FastJSONResponse)
 async def get_my_liked_prompts_endpoint( # Changed to async def
     current_user: user_schemas.UserInDB = Depends(get_current_active_user),
     db: Session = Depends(get_db), # Using get_db directly
@@ -166,10 +213,7 @@ async def get_my_liked_prompts_endpoint( # Changed to async def
     Retrieve all prompts liked by the authenticated user.
     """
     prompts = crud.get_user_liked_prompts(db, user_id=current_user.id, skip=skip, limit=limit)
-    for prompt in prompts:
-        if prompt.author:
-            prompt.author_username = prompt.author.username
-    return prompts
+    return list_response(PROMPT_PUBLIC_LIST, public_prompts(db, prompts))
 
 
 # --- Endpoint 7: Update a Prompt ---
@@ -190,6 +234,7 @@ async def update_prompt_endpoint( # Changed to async def
     if db_prompt.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu yorumu görmek için yetkili değilsiniz")
 
+    _reject_own_duplicate(db, prompt_update.content, current_user.id, exclude_id=prompt_id)
     updated_prompt = crud.update_prompt(db=db, prompt_id=prompt_id, prompt_update=prompt_update)
     if updated_prompt.author:
         updated_prompt.author_username = updated_prompt.author.username
@@ -204,16 +249,16 @@ async def delete_prompt_endpoint( # Changed to async def
     db: Session = Depends(get_db) # Using get_db directly
 ):
     """
-    Delete a prompt. Only the author or super_admin can delete their prompt.
+    Delete a prompt. Only the author or an admin can delete it.
     """
     db_prompt = crud.get_prompt(db, prompt_id=prompt_id)
     if not db_prompt:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt bulunamadı")
 
-    if db_prompt.user_id != current_user.id and current_user.id != 1:
+    if not can_manage(current_user, db_prompt.user_id):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu promptu silmek için yetkili değilsiniz")
 
-    crud.delete_prompt(db, prompt_id=prompt_id)
+    crud.soft_delete_prompt(db, prompt_id=prompt_id)
     return {"message": "Prompt başarılı bir şekilde silindi"}
 
 
@@ -291,9 +336,34 @@ async def unlike_prompt_endpoint( # Changed to async def
     return {"mesaj": "Prompt beğenilenlerden kaldırıldı"}
 
 
+# --- Live updates for a Prompt (Server-Sent Events) ---
+@router.get("/{prompt_id}/events", response_class=StreamingResponse)
+async def prompt_events_endpoint(
+    prompt_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Optional[user_schemas.UserInDB] = Depends(get_current_active_userv1)
+):
+    """
+    Streams live updates for a prompt as Server-Sent Events, so clients no longer poll:
+    - event 'like_count': {"like_count": n} after every like/unlike
+    - event 'comment': the new comment (CommentResponse) after it is created
+    Private prompts can only be followed by their author (or an admin).
+    """
+    version = crud.get_prompt_version(db, prompt_id=prompt_id)
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt bulunamadı")
+    if not version.is_public and not can_manage(current_user, version.user_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu promptu görmek için yetkili değilsiniz")
+
+    return sse_response(request, prompt_channel(prompt_id))
+
+
 @router.get("/{prompt_id}/status", response_model=prompt_schemas.PromptWithLikeStatus)
 async def get_prompt_with_like_status_by_id(
         prompt_id: int,
+        request: Request,
+        response: Response,
         db: Session = Depends(get_db),
         # Use get_current_user, and its return type should be Optional[UserInDB]
         current_user: Optional[user_schemas.UserInDB] = Depends(get_current_active_userv1)
@@ -301,47 +371,42 @@ async def get_prompt_with_like_status_by_id(
     """
     Retrieve a prompt by its ID, including whether the current user has liked it.
     Accessible by authenticated and unauthenticated users (for public prompts).
+    Supports conditional requests (ETag / If-None-Match); the ETag is per user because
+    the like status is.
     """
-    base_query = db.query(Prompt).filter(Prompt.id == prompt_id)
-
-    # Initialize is_liked_by_user to False
-    is_liked_by_user = False
-
-    if current_user:  # This check is still necessary because current_user can be None
-        query = base_query.outerjoin(
-            PromptLike,
-            and_(PromptLike.prompt_id == Prompt.id, PromptLike.user_id == current_user.id)
-        ).add_columns(PromptLike.id.isnot(None).label("user_liked"))
-        result = query.first()
-
-        if result:  # Check if prompt was found with like status
-            db_prompt_orm, is_liked_by_user = result
-        else:
-            db_prompt_orm = None  # Prompt not found
-    else:
-        db_prompt_orm = base_query.first()  # No join if not authenticated
-        # is_liked_by_user remains False
-
-    if not db_prompt_orm:
+    version = crud.get_prompt_version(db, prompt_id=prompt_id, user_id=current_user.id if current_user else None)
+    if not version:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prompt bulunamadı")
 
     # Privacy Check Logic
-    if not db_prompt_orm.is_public:
+    if not version.is_public:
         if not current_user:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="Gizli promptlara erişim için kullanıcı doğrulama gerekiyor")
-        if current_user.id != db_prompt_orm.user_id and current_user.id != 1:  # Assuming user.id 1 is superadmin
+        if not can_manage(current_user, version.user_id):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="Bu gizli promptu görmek için yetkili değilsiniz")
 
-    prompt_with_status = prompt_schemas.PromptWithLikeStatus.from_orm(db_prompt_orm)
-    prompt_with_status.is_liked_by_user = is_liked_by_user
-    prompt_with_status.author_username = db_prompt_orm.author.username if db_prompt_orm.author else None
-
-    return prompt_with_status
-
-
-@router.get("/user/{user_id}/status", response_model=List[prompt_schemas.PromptWithLikeStatus])
+    is_liked_by_user = bool(version.liked) if current_user else False
+    headers = validator_headers(
+        make_etag("prompt-status", version.id, version.is_public, version.created_at, version.updated_at,
+                  version.like_count, version.comment_count, version.author_username,
+                  current_user.id if current_user else None, is_liked_by_user),
+        last_modified=version.updated_at or version.created_at,
+        private=current_user is not None or not version.is_public,
+    )
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
+
+    db_prompt_orm = crud.get_prompt(db, prompt_id=prompt_id)
+    db_prompt_orm.is_liked_by_user = is_liked_by_user
+    db_prompt_orm.author_username = version.author_username
+    db_prompt_orm.no_of_likes = version.like_count
+    return db_prompt_orm
+
+
+@router.get("/user/{user_id}/status", response_model=List[prompt_schemas.PromptWithLikeStatus], response_class=FastJSONResponse)
 async def get_user_prompts_by_id_with_like_status(
         user_id: int,
         db: Session = Depends(get_db),
@@ -352,14 +417,12 @@ async def get_user_prompts_by_id_with_like_status(
     """
     Retrieve public prompts created by a specific user ID,
     including whether the current authenticated user has liked them.
-    If the current user is the author or super admin, their private prompts are also included.
+    If the current user is the author or an admin, their private prompts are also included.
     """
     # ADDED .options(joinedload(Prompt.author)) here
     base_query = db.query(Prompt).filter(Prompt.user_id == user_id).options(joinedload(Prompt.author))
 
-    if current_user and (current_user.id == user_id or current_user.id == 1):
-        pass
-    else:
+    if not can_manage(current_user, user_id):
         base_query = base_query.filter(Prompt.is_public == True)
 
     if current_user:
@@ -372,22 +435,10 @@ async def get_user_prompts_by_id_with_like_status(
 
     results = query.offset(skip).limit(limit).all()
 
-    response_prompts = []
-    for item in results:
-        if current_user:
-            db_prompt_orm, is_liked_by_user = item
-        else:
-            db_prompt_orm = item
-            is_liked_by_user = False
+    prompts = prompts_with_like_status(db, results, with_like_status=current_user is not None)
+    return list_response(PROMPT_WITH_LIKE_STATUS_LIST, prompts)
 
-        prompt_with_status = prompt_schemas.PromptWithLikeStatus.from_orm(db_prompt_orm)
-        prompt_with_status.is_liked_by_user = is_liked_by_user
-        prompt_with_status.author_username = db_prompt_orm.author.username if db_prompt_orm.author else None
-        response_prompts.append(prompt_with_status)
-
-    return response_prompts
-
-@router.get("/tired/", response_model=List[prompt_schemas.PromptWithLikeStatus])
+@router.get("/tired/", response_model=List[prompt_schemas.PromptWithLikeStatus], response_class=FastJSONResponse)
 async def get_own_prompts_by_id_with_like_status(
         current_user: user_schemas.UserInDB = Depends(get_current_active_user),
         db: Session = Depends(get_db),  # Using get_db directly
@@ -397,7 +448,7 @@ async def get_own_prompts_by_id_with_like_status(
     """
     Retrieve public prompts created by a specific user ID,
     including whether the current authenticated user has liked them.
-    If the current user is the author or super admin, their private prompts are also included.
+    If the current user is the author or an admin, their private prompts are also included.
     """
     # ADDED .options(joinedload(Prompt.author)) here
     if not current_user:
@@ -405,9 +456,7 @@ async def get_own_prompts_by_id_with_like_status(
     user_id = current_user.id
     base_query = db.query(Prompt).filter(Prompt.user_id == user_id).options(joinedload(Prompt.author))
 
-    if current_user and (current_user.id == user_id or current_user.id == 1):
-        pass
-    else:
+    if not can_manage(current_user, user_id):
         base_query = base_query.filter(Prompt.is_public == True)
 
     if current_user:
@@ -420,25 +469,13 @@ async def get_own_prompts_by_id_with_like_status(
 
     results = query.offset(skip).limit(limit).all()
 
-    response_prompts = []
-    for item in results:
-        if current_user:
-            db_prompt_orm, is_liked_by_user = item
-        else:
-            db_prompt_orm = item
-            is_liked_by_user = False
+    prompts = prompts_with_like_status(db, results, with_like_status=current_user is not None)
+    return list_response(PROMPT_WITH_LIKE_STATUS_LIST, prompts)
 
-        prompt_with_status = prompt_schemas.PromptWithLikeStatus.from_orm(db_prompt_orm)
-        prompt_with_status.is_liked_by_user = is_liked_by_user
-        prompt_with_status.author_username = db_prompt_orm.author.username if db_prompt_orm.author else None
-        response_prompts.append(prompt_with_status)
 
-    return response_prompts
 
 
-
-
-@router.get("/mosst-liked/", response_model=List[prompt_schemas.PromptWithLikeStatus])
+@router.get("/mosst-liked/", response_model=List[prompt_schemas.PromptWithLikeStatus], response_class=FastJSONResponse)
 async def get_most_liked_public_prompts_with_like_status(
         current_user: Optional[user_schemas.UserInDB] = Depends(get_current_active_userv1),
         db: Session = Depends(get_db),
@@ -450,7 +487,8 @@ async def get_most_liked_public_prompts_with_like_status(
     Retrieve the most liked public prompts with pagination,
     including whether the current authenticated user has liked each.
     """
-    base_query = db.query(Prompt).filter(Prompt.is_public == True).order_by(desc(Prompt.no_of_likes))
+    base_query = db.query(Prompt).options(joinedload(Prompt.author))\
+        .filter(Prompt.is_public == True).order_by(desc(Prompt.no_of_likes))
 
     # Conditionally add the join for like status if current_user is authenticated
     if current_user:
@@ -463,23 +501,11 @@ async def get_most_liked_public_prompts_with_like_status(
 
     results = query.offset(skip).limit(limit).all()
 
-    response_prompts = []
-    for item in results:
-        if current_user:
-            db_prompt_orm, is_liked_by_user = item
-        else:
-            db_prompt_orm = item
-            is_liked_by_user = False
-
-        prompt_with_status = prompt_schemas.PromptWithLikeStatus.from_orm(db_prompt_orm)
-        prompt_with_status.is_liked_by_user = is_liked_by_user
-        prompt_with_status.author_username = db_prompt_orm.author.username if db_prompt_orm.author else None
-        response_prompts.append(prompt_with_status)
+    prompts = prompts_with_like_status(db, results, with_like_status=current_user is not None)
+    return list_response(PROMPT_WITH_LIKE_STATUS_LIST, prompts)
 
-    return response_prompts
 
-
-@router.get("/public_likestatus_most_recent/", response_model=List[prompt_schemas.PromptWithLikeStatus])
+@router.get("/public_likestatus_most_recent/", response_model=List[prompt_schemas.PromptWithLikeStatus], response_class=FastJSONResponse)
 async def get_all_public_prompts_with_like_status_recent(  # Renamed for clarity, original was /public/with-status
         current_user: Optional[user_schemas.UserInDB] = Depends(get_current_active_userv1),
         db: Session = Depends(get_db),
@@ -491,7 +517,8 @@ async def get_all_public_prompts_with_like_status_recent(  # Renamed for clarity
     Retrieve the most recent public prompts with pagination,
     including whether the current authenticated user has liked each.
     """
-    base_query = db.query(Prompt).filter(Prompt.is_public == True).order_by(desc(Prompt.created_at))
+    base_query = db.query(Prompt).options(joinedload(Prompt.author))\
+        .filter(Prompt.is_public == True).order_by(desc(Prompt.created_at))
 
     # Conditionally add the join for like status if current_user is authenticated
     if current_user:
@@ -504,20 +531,8 @@ async def get_all_public_prompts_with_like_status_recent(  # Renamed for clarity
 
     results = query.offset(skip).limit(limit).all()
 
-    response_prompts = []
-    for item in results:
-        if current_user:
-            db_prompt_orm, is_liked_by_user = item
-        else:
-            db_prompt_orm = item
-            is_liked_by_user = False
-
-        prompt_with_status = prompt_schemas.PromptWithLikeStatus.from_orm(db_prompt_orm)
-        prompt_with_status.is_liked_by_user = is_liked_by_user
-        prompt_with_status.author_username = db_prompt_orm.author.username if db_prompt_orm.author else None
-        response_prompts.append(prompt_with_status)
-
-    return response_prompts
+    prompts = prompts_with_like_status(db, results, with_like_status=current_user is not None)
+    return list_response(PROMPT_WITH_LIKE_STATUS_LIST, prompts)
 
 
 
@@ -559,7 +574,7 @@ def get_prompts_count_label(
 ):
     if not current_user:
         return get_prompts_count_by_label_name(db,label_name)
-    return get_prompts_count_by_label_name_auth(db,label_name,current_user.id)
+    return get_prompts_count_by_label_name_auth(db,label_name,current_user)
 
 
 @router.get("/getcountsliked/", response_model=int)
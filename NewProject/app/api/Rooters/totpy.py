@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from app.api.deps import get_current_active_user, get_current_user
 from app.database.database import get_db
 from app.database.models import User
+from app.core.totp import verify_totp
 from pydantic import BaseModel
 
 
@@ -50,16 +51,11 @@ def verify_totp_setup(payload: TOTPVerify,
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="TOTP çoktan aktive edildi")
 
-    totp = pyotp.TOTP(payload.totp_secret)
-    db_user = db.query(User).filter(User.id == current_user.id).first()
-    if totp.verify(payload.code):
-        # Code is valid; update the SQLAlchemy model instance
-        db_user.totp_enabled = True
-        db_user.totp_secret = payload.totp_secret
-
-        # Now commit the changes to the database
+    if verify_totp(current_user.id, payload.totp_secret, payload.code):
+        # Code is valid; current_user is already loaded, so update the row directly
+        db.query(User).filter(User.id == current_user.id).update(
+            {User.totp_enabled: True, User.totp_secret: payload.totp_secret})
         db.commit()
-        db.refresh(db_user)
 
         return {"message": "TOTP has been successfully enabled."}
 
@@ -79,13 +75,10 @@ def deactivate_totp(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Aktive edilmiş bir TOTP bulunmuyor")
 
-    db_user = db.query(User).filter(User.id == current_user.id).first()
-    # Set totp_enabled to False and clear the secret
-    db_user.totp_enabled = False
-    db_user.totp_secret = None
-
+    # Set totp_enabled to False and clear the secret (current_user is already loaded)
+    db.query(User).filter(User.id == current_user.id).update(
+        {User.totp_enabled: False, User.totp_secret: None})
     db.commit()
-    db.refresh(db_user)
 
     return {"message": "TOTP has been successfully deactivated.","status": 200}
 
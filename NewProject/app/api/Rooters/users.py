@@ -6,6 +6,8 @@ from typing import List
 
 from app.api.Rooters.admin import is_user_admin_check
 from app.database import crud
+from app.core import jobs
+from app.core.permissions import SUPERADMIN_ID
 from app.database.models import PromptLike
 from app.schemas import user as user_schemas
 from app.core.security import verify_password, get_password_hash # For password verification/hashing
@@ -32,7 +34,7 @@ async def delete_user_endpoint(
     Delete a user account.
     A user can delete their own account. An administrator could delete any account.
     """
-    if not(current_user.id == 1):
+    if current_user.id != SUPERADMIN_ID:
         if not(delete_user.current_password or verify_password(delete_user.current_password, current_user.hashed_password)):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -44,7 +46,7 @@ async def delete_user_endpoint(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Kullanıcı bulunamadı")
 
     # Authorization check: User can only delete their own account for now
-    if db_user.id != current_user.id or delete_user.user_id == 1 :
+    if db_user.id != current_user.id or delete_user.user_id == SUPERADMIN_ID:
         # If you had an admin role, you'd check:
         # if not current_user.is_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Bu kullanıcı hesabını silmek için yetkili değilsiniz")
@@ -52,6 +54,8 @@ async def delete_user_endpoint(
     success = crud.delete_user(db, user_id=delete_user.user_id)
     if not success:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Kullanıcı silindi")
+    # The account is disabled now; its prompts, likes and comments are removed by a background job
+    jobs.enqueue(db, "purge_user", {"user_id": delete_user.user_id})
     return {"mesaj": "Kullanıcı hesabı silindi"}
 
 # --- Endpoint 3: Change User Password (Authenticated user) ---
@@ -0,0 +1,177 @@
+# my_fastapi_angular_backend/app/api/compression.py
+"""
+Response compression middleware.
+
+Compresses complete (non-streaming) text/JSON responses of at least COMPRESSION_MIN_SIZE bytes
+with the best encoding the client accepts: brotli or zstd when the optional 'brotli' /
+'zstandard' packages are installed, gzip otherwise. Streaming responses (exports) are passed
+through untouched; they offer their own ?gzip=true.
+
+Compressed bodies are kept in a small LRU keyed by (encoding, SHA-1 of the body). The same hot
+page served over and over (e.g. the anonymous feed) is therefore compressed once; later hits
+only pay for hashing, which is much cheaper than compressing.
+"""
+import gzip
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    """Encodings this process can produce, in order of preference."""
+    encodings = []
+    if brotli is not None:
+        encodings.append("br")
+    if zstandard is not None:
+        encodings.append("zstd")
+    encodings.append("gzip")
+    return tuple(encodings)
+
+
+def choose_encoding(accept_encoding: str, supported: Tuple[str, ...]) -> Optional[str]:
+    """
+    Picks the encoding with the highest q-value from an Accept-Encoding header,
+    breaking ties by our own preference order. Returns None if none is acceptable.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";")[0].strip().lower()
+    return content_type.startswith("text/") or content_type.endswith("+json") or content_type in COMPRESSIBLE_TYPES
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+        cache_entries: int = 256,
+        cache_max_body: int = 1024 * 1024,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.zstd_level = zstd_level
+        self.cache_entries = cache_entries
+        self.cache_max_body = cache_max_body
+        self.supported = supported_encodings()
+        # Only touched from the event loop thread, so no lock is needed.
+        self._cache: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.supported)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+
+        async def send_compressed(message: Message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message  # held back until we know whether to compress
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            compressible = (
+                start["status"] not in (204, 304)
+                and "content-encoding" not in headers
+                and is_compressible(headers.get("content-type", ""))
+            )
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            # Streaming bodies (more_body) and small bodies go out as they are.
+            if not compressible or message.get("more_body", False) or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+
+            compressed = self._compress(encoding, body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # The encoded bytes differ from the identity representation
+                headers["ETag"] = "W/" + etag
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        if len(body) > self.cache_max_body or self.cache_entries <= 0:
+            return self._encode(encoding, body)
+
+        key = (encoding, hashlib.sha1(body).digest())
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        compressed = self._encode(encoding, body)
+        self._cache[key] = compressed
+        if len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+        return compressed
+
+    def _encode(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        if encoding == "zstd":
+            return zstandard.ZstdCompressor(level=self.zstd_level).compress(body)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
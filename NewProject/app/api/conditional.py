@@ -0,0 +1,56 @@
+# my_fastapi_angular_backend/app/api/conditional.py
+"""
+HTTP conditional request helpers (ETag / Last-Modified).
+
+Endpoints compute an ETag from a few cheap "version" columns (timestamps, counts) instead of
+hashing the rendered body, so a matching If-None-Match is answered with 304 before the full
+objects are loaded or serialized. Responses carry 'Cache-Control: no-cache', which lets browsers
+keep the body but makes them revalidate on every use, so polling stays correct.
+
+Last-Modified is sent for information only. Likes and deleted comments leave no timestamp
+behind, so If-Modified-Since alone cannot prove freshness; only If-None-Match yields a 304.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Builds a strong ETag from the values that determine a response body."""
+    return '"' + hashlib.sha1(repr(parts).encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header matches 'etag' (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return etag in candidates
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None, private: bool = False) -> Dict[str, str]:
+    """
+    Headers to attach to both 200 and 304 responses.
+    'private' marks per-user responses so shared caches neither store nor mix them.
+    """
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache" if private else "no-cache",
+    }
+    if private:
+        headers["Vary"] = "Authorization"
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -4,15 +4,17 @@ from typing import Generator, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from jose import JWTError # For handling JWT decoding errors
 
 from app.database.database import get_db # Import get_db from your database file
-from app.database.models import User, AdminUser  # Your SQLAlchemy User model
+from app.database.models import User  # Your SQLAlchemy User model
 from app.schemas.user import UserInDB # Your Pydantic UserInDB schema
 from app.schemas.token import TokenPayload # Our token payload schema
 from app.core.config import settings # Your settings for SECRET_KEY, ALGORITHM
 from app.core.security import decode_token # The decode_token function from security.py
+from app.core.revocation import revocation_list
+from app.core.permissions import is_admin
 
 # This defines the OAuth2 scheme for extracting tokens from requests.
 # 'tokenUrl' is the path where clients will send their username/password to get a token.
@@ -79,13 +81,23 @@ async def get_current_user(
         if payload is None:
             raise credentials_exception
 
+        # Revoked tokens (logout, password change, deleted user): in-memory check, no query
+        revocation_list.refresh_if_stale()
+        if revocation_list.is_revoked(payload):
+            raise credentials_exception
+
         # Validate the token payload based on your TokenPayload schema
         token_data = TokenPayload(**payload)
         if token_data.sub is None: # 'sub' field should contain the username (string)
             raise credentials_exception
 
-        # Look up user by username (token_data.sub) in the database
-        user = db.query(User).filter(User.username == token_data.sub).first()
+        # Reads of a user who just wrote stay on the primary (see RoutingSession)
+        db.info["subject"] = token_data.sub
+
+        # Look up user by username (token_data.sub), with its admin entry in the same query.
+        # On the primary: a lagging replica could still show a deleted user or a removed admin
+        user = db.query(User).options(joinedload(User.admin_entry))\
+            .filter(User.username == token_data.sub).execution_options(use_primary=True).first()
         if user is None: # User not found in database
             raise credentials_exception
 
@@ -128,7 +140,6 @@ async def get_current_active_userv1(current_user: Optional[UserInDB] = Depends(g
 
 async def get_current_admin_user(
     current_user: UserInDB = Depends(get_current_user), # First, ensure the user is authenticated
-    db: Session = Depends(get_db)
 ) -> UserInDB:
     if current_user is None:
         raise HTTPException(
@@ -139,10 +150,8 @@ async def get_current_admin_user(
     """
     Dependency that checks if the current authenticated user is an admin.
     """
-    # Check if the current user's ID exists in the 'admins' table
-    is_admin = db.query(AdminUser).filter(AdminUser.user_id == current_user.id).first()
-
-    if (not is_admin) and current_user.id != 1:
+    # Admin status was loaded with the user (no extra query)
+    if not is_admin(current_user):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Operation forbidden: Admin privileges required."
@@ -159,7 +168,8 @@ async def OptionalAuthUser(token: str = Depends(oauth2_scheme), db: Session = De
     try:
         # Attempt to get the user using the standard get_current_user logic
         # If get_current_user is async, you MUST await it here!
-        return await get_current_user(token, db) # <--- ADD 'await' HERE!
+        # By keyword: get_current_user takes (db, token), in that order
+        return await get_current_user(db=db, token=token)
     except HTTPException as e:
         if e.status_code == status.HTTP_401_UNAUTHORIZED:
             return None
@@ -1,21 +1,24 @@
 # my_fastapi_angular_backend/app/api/endpoints.py
+import math
 from typing import Optional
 
-import pyotp
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 # Import necessary modules from your app
 from app.database.database import get_db
 from app.database import crud # Your CRUD operations
 from app.schemas.user import UserCreate, UserPublic, UserInDB # User schemas for input/output
-from app.schemas.token import Token # Token schema for response (includes AccessToken)
-from app.core.security import verify_password, create_access_token # Security functions
+from app.schemas.token import Token, TokenPair, RefreshRequest # Token schema for response (includes AccessToken)
+from app.core.security import verify_password, verify_password_and_update, create_access_token, decode_token # Security functions
+from app.core.revocation import revocation_list
+from app.core import rate_limit
+from app.core.totp import verify_totp_async
 from app.core.config import settings # Your app settings
-from app.api.deps import get_current_active_user # For protecting API routes
+from app.api.deps import get_current_active_user, oauth2_scheme # For protecting API routes
 from app.api.audit_deps import audit_request
 router = APIRouter()
 
@@ -39,20 +42,47 @@ async def register_user(user_in: UserCreate, db: Session = Depends(get_db)):
     return UserPublic.model_validate(new_user)
 
 
+def _issue_tokens(db: Session, user, family_id: Optional[str] = None) -> dict:
+    """A short-lived access token plus a refresh token (a new family on login, or the rotated one)."""
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.username}, expires_delta=access_token_expires
+    )
+    refresh_token = crud.create_refresh_token(db, user_id=user.id, family_id=family_id)
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "N/A"
+
+
+async def _check_login_rate(ip_address: str, username: str):
+    """Rejects login bursts per IP and per username before the user query and bcrypt."""
+    wait = await rate_limit.check_login_attempt_async(ip_address, username)
+    if wait is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Çok fazla giriş denemesi, lütfen daha sonra tekrar deneyin",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
+
+
 class LoginRequest(BaseModel):
     username: str
     password: str
     totp_code: Optional[str] = None
 
 '''
-@router.post("/token", response_model=Token,dependencies=[Depends(audit_request)])
+@router.post("/token", response_model=TokenPair,dependencies=[Depends(audit_request)])
 async def login_for_access_token(
+        request: Request,
         form_data: OAuth2PasswordRequestForm = Depends(), # Expects 'username' and 'password' as form data
         db: Session = Depends(get_db)
 ):
     
     #Authenticates a user and provides a JWT token upon successful login.
     
+    await _check_login_rate(_client_ip(request), form_data.username)
     user = crud.get_user_by_username(db, username=form_data.username)
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
@@ -61,23 +91,22 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Calculate token expiration time
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    # Create the JWT token, using username as the 'sub' (subject)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
-    # Return the token and its type
-    return {"access_token": access_token, "token_type": "bearer"}
+    # Access token plus a refresh token (see /refresh)
+    return _issue_tokens(db, user)
 
 '''
 @router.post("/token1", response_model=dict)
 async def login_for_access_token1(
         form_data: LoginRequest,
+        request: Request,
         db: Session = Depends(get_db)
 ):
+    ip_address = _client_ip(request)
+    await _check_login_rate(ip_address, form_data.username)
     user = crud.get_user_by_username(db, username=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    password_valid, new_hash = verify_password_and_update(form_data.password, user.hashed_password) \
+        if user and user.deleted_at is None else (False, None)  # deleted accounts cannot log in
+    if not password_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Yanlış kullanıcı adı veya parola",
@@ -93,8 +122,8 @@ async def login_for_access_token1(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        totp = pyotp.TOTP(user.totp_secret)
-        if not totp.verify(form_data.totp_code):
+        # Each code is accepted once (replay protection); the secret comes from the loaded user
+        if not await verify_totp_async(user.id, user.totp_secret, form_data.totp_code):
             raise HTTPException(
                 status_code=status.HTTP_418_IM_A_TEAPOT,
                 detail="Geçersiz TOTP kodu",
@@ -103,11 +132,60 @@ async def login_for_access_token1(
 
     # End of conditional logic
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+    if new_hash is not None:
+        # Stored with an old scheme or cost: upgrade it now that we have the plain password
+        crud.rehash_user_password(db, user.id, new_hash)
+    await rate_limit.login_succeeded_async(ip_address, form_data.username)
+    return _issue_tokens(db, user)
+
+# --- Refresh: trade a refresh token for a new access + refresh token pair ---
+@router.post("/refresh", response_model=TokenPair)
+async def refresh_access_token(body: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Issues a new access token and a new refresh token, without a password check.
+    The presented refresh token is used up (rotation). Presenting an already used token
+    again means it leaked, so every token of that login (family) is revoked.
+    """
+    invalid_refresh = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Geçersiz veya süresi dolmuş yenileme anahtarı",
+        headers={"WWW-Authenticate": "Bearer"},
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    stored = crud.get_refresh_token(db, body.refresh_token)
+    if stored is None or stored.revoked_at is not None or stored.expires_at < datetime.utcnow():
+        raise invalid_refresh
+    if not crud.mark_refresh_token_used(db, stored.id):
+        # Reuse (or a lost race with the same token): treat the family as compromised
+        crud.revoke_refresh_token_family(db, stored.family_id)
+        raise invalid_refresh
+
+    user = crud.get_user(db, user_id=stored.user_id)
+    if user is None or not user.is_active:
+        raise invalid_refresh
+    crud.delete_expired_refresh_tokens(db, user_id=user.id)
+    return _issue_tokens(db, user, family_id=stored.family_id)
+
+
+# --- Logout: revoke the current access token ---
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+        body: Optional[RefreshRequest] = None,
+        token: str = Depends(oauth2_scheme),
+        current_user: UserInDB = Depends(get_current_active_user),
+        db: Session = Depends(get_db)
+):
+    """
+    Revokes the access token sent with this request; it is rejected from now on,
+    even before it expires. Send the refresh token in the body to end that login completely.
+    Other sessions of the user stay signed in.
+    """
+    revocation_list.revoke_token(db, decode_token(token))
+    if body is not None:
+        stored = crud.get_refresh_token(db, body.refresh_token)
+        if stored is not None and stored.user_id == current_user.id:
+            crud.revoke_refresh_token_family(db, stored.family_id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
 
 # --- Protected API endpoint to get current user info ---
 # This endpoint requires a valid JWT token to access.
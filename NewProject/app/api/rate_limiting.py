@@ -0,0 +1,89 @@
+# my_fastapi_angular_backend/app/api/rate_limiting.py
+"""
+Per-client API rate limiting middleware.
+
+Every request takes a token from the client's RATE_LIMIT_DEFAULT bucket; requests matching an
+entry of RATE_LIMIT_POLICIES ("METHOD /path/{param}" -> "count/period") also take one from that
+route's bucket, so expensive writes (likes, comments, new prompts) get tighter limits. A client is
+the user named in a valid bearer token, otherwise the IP address. Rejected requests get
+429 Too Many Requests with Retry-After, before any route code or database work runs.
+
+Buckets live in app/core/rate_limit.py (in-process, or Redis for multi-worker deployments).
+A Redis backend is called from the thread pool, never on the event loop.
+"""
+import json
+import math
+import re
+from typing import List, Optional, Pattern, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core import rate_limit
+from app.core.rate_limit import Rate
+from app.core.security import decode_token
+
+
+def compile_policies(policies: dict) -> List[Tuple[str, str, Pattern, Rate]]:
+    """Turns {"POST /prompts/{prompt_id}/like": "60/minute"} into (name, method, regex, rate) rules."""
+    compiled = []
+    for name, rate in policies.items():
+        method, _, template = name.strip().partition(" ")
+        pattern = re.sub(r"\\\{[^}]+\\\}", "[^/]+", re.escape(template.strip()))
+        compiled.append((name, method.upper(), re.compile(pattern + r"\Z"), Rate.parse(rate)))
+    return compiled
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp, default_rate: str, policies: dict):
+        self.app = app
+        self.default_rate = Rate.parse(default_rate)
+        self.policies = compile_policies(policies)
+
+    def _client_key(self, scope: Scope) -> str:
+        authorization = Headers(scope=scope).get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            claims = decode_token(token)  # cached after the first request with this token
+            if claims and claims.get("sub"):
+                return "user:" + claims["sub"]
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    def _route_policy(self, scope: Scope) -> Optional[Tuple[str, Rate]]:
+        for name, method, pattern, rate in self.policies:
+            if scope["method"] == method and pattern.match(scope["path"]):
+                return name, rate
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":  # leave CORS preflights alone
+            await self.app(scope, receive, send)
+            return
+
+        client = self._client_key(scope)
+        checks = [("default", self.default_rate)]
+        policy = self._route_policy(scope)
+        if policy is not None:
+            checks.append(policy)
+
+        for name, rate in checks:
+            allowed, wait = await rate_limit.hit_async(f"api:{name}:{client}", rate)
+            if not allowed:
+                await self._reject(send, wait)
+                return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(send: Send, wait: float):
+        body = json.dumps({"detail": "Çok fazla istek, lütfen daha sonra tekrar deneyin"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(wait))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
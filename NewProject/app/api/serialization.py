@@ -0,0 +1,96 @@
+# my_fastapi_angular_backend/app/api/serialization.py
+"""
+Fast JSON path for list endpoints.
+
+By default FastAPI validates a route's return value against response_model, turns the result
+into plain Python dicts/lists and then runs json.dumps over them. For list endpoints returning
+up to 100 prompts that is three passes over every item. Here each list schema gets a TypeAdapter
+compiled once at import time, which validates the ORM objects straight from their attributes and
+dumps JSON bytes in a single pass (pydantic-core, in Rust). Routes opt in by returning
+list_response(...) and declaring response_class=FastJSONResponse; response_model stays for the docs.
+FastJSONResponse is also the app's default_response_class, so every other JSON response is
+encoded with orjson when it is installed.
+
+Prompt lists go through public_prompts / prompts_with_like_status first: the queries eager-load
+the author, and the like counts of the whole page come from one GROUP BY.
+
+Test/bench_serialization.py measures both paths.
+"""
+from typing import Any, Dict, Iterable, List, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from sqlalchemy.orm import Session
+
+from app.database.crud import attach_like_counts
+from app.schemas.comment import CommentResponse
+from app.schemas.job import JobResponse
+from app.schemas.label import LabelResponse
+from app.schemas.prompt import PromptDuplicateGroup, PromptPublic, PromptWithLikeStatus
+from app.schemas.user import UserPublic, UserResponse
+
+try:
+    import orjson
+except ImportError:  # optional: fall back to the standard library encoder
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse that passes pre-serialized bytes through untouched and encodes anything
+    else with orjson when it is installed.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+
+PROMPT_PUBLIC_LIST = TypeAdapter(List[PromptPublic])
+PROMPT_WITH_LIKE_STATUS_LIST = TypeAdapter(List[PromptWithLikeStatus])
+COMMENT_LIST = TypeAdapter(List[CommentResponse])
+COMMENT_PREVIEWS = TypeAdapter(Dict[int, List[CommentResponse]])
+LABEL_LIST = TypeAdapter(List[LabelResponse])
+USER_PUBLIC_LIST = TypeAdapter(List[UserPublic])
+USER_RESPONSE_LIST = TypeAdapter(List[UserResponse])
+PROMPT_DUPLICATE_GROUP_LIST = TypeAdapter(List[PromptDuplicateGroup])
+JOB_LIST = TypeAdapter(List[JobResponse])
+
+
+def list_response(adapter: TypeAdapter, items: Iterable[Any], headers: Optional[Dict[str, str]] = None) -> FastJSONResponse:
+    """Validates ORM objects by attribute and serializes them to JSON in one pass."""
+    return FastJSONResponse(adapter.dump_json(adapter.validate_python(items, from_attributes=True)), headers=headers)
+
+
+def public_prompts(db: Session, prompts: Iterable[Any]) -> list:
+    """
+    Sets 'author_username' (the query must eager-load Prompt.author) and the like counts on a
+    page of Prompt ORM objects, ready for PROMPT_PUBLIC_LIST.
+    """
+    prompts = list(prompts)
+    for prompt in prompts:
+        prompt.author_username = prompt.author.username if prompt.author else None
+    return attach_like_counts(db, prompts)
+
+
+def prompts_with_like_status(db: Session, results: Iterable[Any], with_like_status: bool) -> list:
+    """
+    Flattens rows of the "prompt [+ user_liked]" queries into Prompt ORM objects carrying
+    'is_liked_by_user', 'author_username' and the like count, ready for
+    PROMPT_WITH_LIKE_STATUS_LIST. 'with_like_status' tells whether rows are (Prompt, bool)
+    tuples (authenticated queries) or bare Prompt objects. The query must eager-load Prompt.author.
+    """
+    prompts = []
+    for item in results:
+        if with_like_status:
+            db_prompt_orm, is_liked_by_user = item
+        else:
+            db_prompt_orm, is_liked_by_user = item, False
+        db_prompt_orm.is_liked_by_user = bool(is_liked_by_user)
+        db_prompt_orm.author_username = db_prompt_orm.author.username if db_prompt_orm.author else None
+        prompts.append(db_prompt_orm)
+    return attach_like_counts(db, prompts)
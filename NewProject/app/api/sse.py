@@ -0,0 +1,50 @@
+# my_fastapi_angular_backend/app/api/sse.py
+"""
+Server-sent events (text/event-stream) on top of the event hub in app/core/events.py.
+
+Each event is written as
+    event: like_count
+    data: {"type": "like_count", "prompt_id": 5, "data": {"like_count": 12}}
+and a comment line is sent every SSE_KEEPALIVE_SECONDS so proxies keep the connection open
+and a closed client is noticed. Browsers reconnect on their own (EventSource), after 'retry' ms.
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.events import hub
+
+RETRY_MS = 3000
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def _event_stream(request: Request, channel: str) -> AsyncIterator[str]:
+    with hub.subscribe(channel) as subscription:
+        yield f"retry: {RETRY_MS}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=settings.SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+
+
+def sse_response(request: Request, channel: str) -> StreamingResponse:
+    return StreamingResponse(
+        _event_stream(request, channel),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # nginx: do not buffer the stream
+        },
+    )
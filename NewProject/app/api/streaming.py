@@ -0,0 +1,109 @@
+# my_fastapi_angular_backend/app/api/streaming.py
+"""
+Helpers for streaming large exports as NDJSON or CSV.
+
+Rows are consumed lazily from an iterator (typically a server-side cursor) and written out in
+chunks of a few hundred rows, so memory stays flat no matter how many rows are exported.
+
+Note: dependencies with 'yield' (like get_db) are closed before a StreamingResponse body is sent,
+so row generators must open and close their own SessionLocal().
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, List
+
+from fastapi.responses import StreamingResponse
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+ROWS_PER_CHUNK = 500
+GZIP_LEVEL = 6
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value: Any) -> Any:
+    # CSV cells are flat: multi-valued fields (e.g. label names) become "a|b|c".
+    if isinstance(value, (list, tuple)):
+        return "|".join(str(item) for item in value)
+    return _export_value(value)
+
+
+def ndjson_chunks(rows: Iterable[dict], rows_per_chunk: int = ROWS_PER_CHUNK) -> Iterator[str]:
+    """Yields newline-delimited JSON, 'rows_per_chunk' rows at a time."""
+    buffer: List[str] = []
+    for row in rows:
+        buffer.append(json.dumps({key: _export_value(value) for key, value in row.items()}, ensure_ascii=False))
+        if len(buffer) >= rows_per_chunk:
+            yield "\n".join(buffer) + "\n"
+            buffer.clear()
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def csv_chunks(rows: Iterable[dict], fieldnames: List[str], rows_per_chunk: int = ROWS_PER_CHUNK) -> Iterator[str]:
+    """Yields CSV text (header first), 'rows_per_chunk' rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    pending = 0
+    for row in rows:
+        writer.writerow({key: _csv_value(value) for key, value in row.items()})
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks: Iterable[str], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """Compresses a text chunk stream into a single gzip stream, chunk by chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # 16+ -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_response(
+    rows: Iterable[dict],
+    fieldnames: List[str],
+    export_format: str,
+    filename: str,
+    compress: bool = False,
+) -> StreamingResponse:
+    """
+    Wraps a row iterator in a chunked StreamingResponse in the requested format.
+    With 'compress' the body is streamed as a .gz file download.
+    """
+    if export_format == "csv":
+        body = csv_chunks(rows, fieldnames)
+    else:
+        body = ndjson_chunks(rows)
+
+    filename = f"{filename}.{export_format}"
+    media_type = EXPORT_MEDIA_TYPES[export_format]
+    if compress:
+        body = gzip_chunks(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,11 +1,111 @@
 # my_fastapi_angular_backend/app/core/config.py
+from typing import Dict, List
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     SECRET_KEY: str = "YOURMYSQLPASSWORD" # IMPORTANT: Change this for production!
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Short-lived: clients renew access tokens with their refresh token (POST /auth/refresh)
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    # Verified tokens remembered (until they expire) to skip re-verifying them on every request
+    JWT_CLAIMS_CACHE_SIZE: int = 10000
+    # How often each worker picks up token revocations made by other workers
+    REVOCATION_REFRESH_SECONDS: float = 5
+    # Each refresh re-reads revocations this far back before the previous one, to catch rows
+    # committed late (after a refresh that had already started) and clock skew between workers
+    REVOCATION_REFRESH_MARGIN_SECONDS: float = 60
+
+    # How long each worker trusts its cached list of admin ids (admin checks on other users)
+    ADMIN_CACHE_SECONDS: float = 30
+
+    # --- Password hashing ---
+    # "bcrypt" or "argon2" (needs 'argon2-cffi'). Changing the scheme or a cost rehashes each
+    # password at its next login. Pick costs with: python -m app.core.password_calibration
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+
+    # --- TOTP ---
+    # Where used (user, time step) pairs are kept to block code replays; "redis://..." shares them.
+    TOTP_REPLAY_STORAGE_URL: str = ""
+
+    # --- Rate limiting ---
+    # Empty: counters live in each worker. "redis://host:6379/1": shared by all workers (needs 'redis').
+    RATE_LIMIT_STORAGE_URL: str = ""
+    # Login attempts, checked before the user lookup and bcrypt ("<count>/<second|minute|hour|day>")
+    LOGIN_RATE_LIMIT_PER_IP: str = "20/minute"
+    LOGIN_RATE_LIMIT_PER_USERNAME: str = "5/minute"
+    # Every API request, per user (or per IP when anonymous)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEFAULT: str = "300/minute"
+    # Extra, tighter buckets for expensive routes: "METHOD /path/{param}" -> rate
+    RATE_LIMIT_POLICIES: Dict[str, str] = {
+        "POST /prompts/": "30/minute",
+        "POST /prompts/{prompt_id}/like": "60/minute",
+        "DELETE /prompts/{prompt_id}/unlike": "60/minute",
+        "POST /prompts/{prompt_id}/comments": "20/minute",
+        "PUT /comments/{comment_id}": "30/minute",
+        "POST /auth/register": "5/minute",
+        "POST /auth/refresh": "30/minute",
+        "POST /admin/import/prompts": "5/minute",
+    }
     DATABASE_URL: str = "DATABASEURL"
+    # Read replicas: plain SELECTs go to one of these, writes to DATABASE_URL. Empty: primary only.
+    DATABASE_REPLICA_URLS: List[str] = []
+    # After a user writes, their reads stay on the primary this long (replication lag, read-your-writes)
+    REPLICA_STICKY_SECONDS: float = 5
+
+    # Soft-deleted prompts are hard-deleted (with their likes, comments and labels) after this
+    PROMPT_PURGE_AFTER_DAYS: int = 7
+    PROMPT_PURGE_BATCH_SIZE: int = 500
+    # Rows per batch (one commit each) when a deleted account's data is removed in the background
+    USER_PURGE_BATCH_SIZE: int = 500
+    # Refuse (409) a prompt whose normalized content matches one of the author's own live prompts.
+    # Otherwise duplicates are only reported (X-Duplicate-Of header, /admin/prompts/duplicates)
+    PROMPT_REJECT_OWN_DUPLICATES: bool = False
+
+    # --- Background jobs (app/core/jobs.py) ---
+    # Worker threads started with the app; 0 when jobs run in a separate 'python -m app.core.jobs'
+    JOB_WORKERS: int = 1
+    JOB_POLL_SECONDS: float = 2
+    JOB_MAX_ATTEMPTS: int = 5
+    # Retry delay: JOB_BACKOFF_SECONDS * 2^(attempt-1), at most JOB_BACKOFF_MAX_SECONDS
+    JOB_BACKOFF_SECONDS: float = 10
+    JOB_BACKOFF_MAX_SECONDS: float = 3600
+    # A job 'running' longer than this is assumed orphaned (worker died) and claimed again
+    JOB_LOCK_TIMEOUT_SECONDS: int = 1800
+    JOB_RETENTION_DAYS: int = 14
+
+    # --- Audit log storage ---
+    # Rows older than this are archived to gzip JSONL files and removed from the table.
+    AUDIT_RETENTION_DAYS: int = 180
+    AUDIT_ARCHIVE_DIR: str = "archive/audit_logs"
+    # How many monthly partitions to keep created ahead of the current month (MySQL only).
+    AUDIT_PARTITION_MONTHS_AHEAD: int = 3
+
+    # --- Response compression ---
+    # Bodies smaller than this (bytes) are sent uncompressed; it is not worth the CPU.
+    COMPRESSION_MIN_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4  # used only if the 'brotli' package is installed
+    ZSTD_LEVEL: int = 3  # used only if the 'zstandard' package is installed
+    # LRU of already-compressed bodies, so hot pages (e.g. the public feed) are compressed once.
+    COMPRESSION_CACHE_ENTRIES: int = 256
+    COMPRESSION_CACHE_MAX_BODY: int = 1024 * 1024
+
+    # --- Live events (GET /prompts/{id}/events) ---
+    # Empty: events stay in this process. "redis://host:6379/0": shared by all workers (needs 'redis').
+    EVENT_BROKER_URL: str = ""
+    SSE_KEEPALIVE_SECONDS: int = 15
+    SSE_QUEUE_SIZE: int = 100  # per connection; a slow client loses its oldest events first
+
+    # --- Comment threads ---
+    # Deepest allowed reply level (0 = top-level). The materialized path column fits 23 levels.
+    COMMENT_MAX_DEPTH: int = 10
 
     # This tells Pydantic Settings to load variables from a .env file
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -14,4 +114,3 @@ class Settings(BaseSettings):
 # This 'settings' object is what other modules will import.
 
 settings = Settings()
-
@@ -0,0 +1,183 @@
+# my_fastapi_angular_backend/app/core/events.py
+"""
+In-process pub/sub hub for live prompt events (like counts, new comments).
+
+crud publishes after each commit; SSE connections (GET /prompts/{id}/events) subscribe to the
+channel of one prompt and receive every event as it happens, instead of polling.
+
+Delivery goes through a broker so several uvicorn workers can share events:
+    EVENT_BROKER_URL=""            LocalBroker: events stay inside this process (default, tests)
+    EVENT_BROKER_URL="redis://..." RedisBroker: events go through Redis pub/sub and every worker
+                                   (including the publishing one) delivers them to its own clients
+Both call EventHub.deliver() in each process; subscribers only ever talk to the local hub.
+"""
+import asyncio
+import json
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Set
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # optional: only needed for EVENT_BROKER_URL=redis://...
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "prompt_events:"
+
+
+def prompt_channel(prompt_id: int) -> str:
+    return f"{CHANNEL_PREFIX}{prompt_id}"
+
+
+class Subscription:
+    """One SSE connection: a bounded queue fed from whichever thread publishes."""
+
+    def __init__(self, channel: str, queue_size: int):
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, event: Dict[str, Any]):
+        # Runs on the subscriber's event loop
+        if self.queue.full():
+            # Slow client: drop its oldest event rather than grow without bound
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Dict[str, Any]:
+        return await self.queue.get()
+
+
+class LocalBroker:
+    """Delivers events straight to this process's hub (single worker, tests)."""
+
+    def start(self, hub: "EventHub"):
+        self.hub = hub
+
+    def publish(self, channel: str, event: Dict[str, Any]):
+        self.hub.deliver(channel, event)
+
+
+class RedisBroker:
+    """
+    Fans events out to every worker through Redis pub/sub.
+
+    publish() is called from async routes too, so it never talks to Redis itself: events go into
+    a bounded queue that a publisher thread sends on. If Redis is slow or down and the queue
+    fills up, new events are dropped (live updates are best effort) instead of blocking.
+    """
+
+    PUBLISH_QUEUE_SIZE = 10_000
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("EVENT_BROKER_URL points to Redis but the 'redis' package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self._outbox: "queue.Queue[tuple]" = queue.Queue(maxsize=self.PUBLISH_QUEUE_SIZE)
+
+    def start(self, hub: "EventHub"):
+        self.hub = hub
+        threading.Thread(target=self._listen, name="event-broker", daemon=True).start()
+        threading.Thread(target=self._send, name="event-publisher", daemon=True).start()
+
+    def publish(self, channel: str, event: Dict[str, Any]):
+        try:
+            self._outbox.put_nowait((channel, json.dumps(event, default=str)))
+        except queue.Full:
+            logger.warning("Event queue is full; dropping event on %s", channel)
+
+    def _send(self):
+        while True:
+            channel, payload = self._outbox.get()
+            try:
+                self.client.publish(channel, payload)
+            except Exception:
+                logger.exception("Could not publish event on %s", channel)
+
+    def _listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(CHANNEL_PREFIX + "*")
+        for message in pubsub.listen():
+            try:
+                channel = message["channel"].decode() if isinstance(message["channel"], bytes) else message["channel"]
+                self.hub.deliver(channel, json.loads(message["data"]))
+            except (ValueError, KeyError):
+                logger.warning("Ignoring malformed event from broker: %r", message)
+
+
+def create_broker(url: str):
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBroker(url)
+    return LocalBroker()
+
+
+class EventHub:
+    def __init__(self, broker, queue_size: int = 100):
+        self.broker = broker
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._started = False
+
+    def _ensure_started(self):
+        with self._lock:
+            if not self._started:
+                self.broker.start(self)
+                self._started = True
+
+    def publish(self, channel: str, event: Dict[str, Any]):
+        """
+        Publishes an event. Safe to call from any thread (crud runs both on the event loop and
+        in the threadpool). A broker failure is logged and never fails the caller's write.
+        """
+        self._ensure_started()
+        try:
+            self.broker.publish(channel, event)
+        except Exception:
+            logger.exception("Could not publish event on %s", channel)
+
+    def deliver(self, channel: str, event: Dict[str, Any]):
+        """Hands an event to every local subscriber of 'channel' (called by the broker)."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, event)
+            except RuntimeError:
+                pass  # the subscriber's loop is closed; it is removed on unsubscribe
+
+    @contextmanager
+    def subscribe(self, channel: str) -> Iterator[Subscription]:
+        """Must be entered from a coroutine (the subscription is bound to the running loop)."""
+        self._ensure_started()
+        subscription = Subscription(channel, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                channel_subscribers = self._subscribers.get(channel)
+                if channel_subscribers is not None:
+                    channel_subscribers.discard(subscription)
+                    if not channel_subscribers:
+                        del self._subscribers[channel]
+
+    def subscriber_count(self, channel: Optional[str] = None) -> int:
+        with self._lock:
+            if channel is not None:
+                return len(self._subscribers.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+hub = EventHub(create_broker(settings.EVENT_BROKER_URL), queue_size=settings.SSE_QUEUE_SIZE)
+
+
+def publish_prompt_event(prompt_id: int, event_type: str, data: Dict[str, Any]):
+    hub.publish(prompt_channel(prompt_id), {"type": event_type, "prompt_id": prompt_id, "data": data})
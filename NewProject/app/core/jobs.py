@@ -0,0 +1,279 @@
+# my_fastapi_angular_backend/app/core/jobs.py
+"""
+Background jobs stored in the database.
+
+Work that should not run inside a request is enqueued as a job:
+
+    jobs.enqueue(db, "purge_user", {"user_id": 42})
+
+The job is a row in 'jobs', so it survives restarts. A worker runs the handler registered for
+its kind (app/database/job_tasks.py) with the payload as keyword arguments and a session of
+its own.
+
+Workers:
+    JOB_WORKERS > 0           threads started with the app (FastAPI lifespan) in every process
+    python -m app.core.jobs   a separate worker process (then set JOB_WORKERS=0 for the web app)
+Any number of workers may run at once. A job is claimed with a conditional UPDATE
+('queued' -> 'running'), so exactly one worker gets it. A job left 'running' by a worker that
+died is claimed again after JOB_LOCK_TIMEOUT_SECONDS.
+
+A failed attempt is retried after JOB_BACKOFF_SECONDS * 2^(attempt - 1), capped at
+JOB_BACKOFF_MAX_SECONDS and with jitter, until max_attempts; then the job is 'failed'.
+Admins list, inspect, enqueue and retry jobs under /admin/jobs.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import models
+
+logger = logging.getLogger("my_fastapi_app")
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+_handlers: Dict[str, Callable[..., Any]] = {}
+_wakeup = threading.Event()  # set by enqueue() so local workers do not wait for the next poll
+
+
+def register(kind: str):
+    """Decorator registering 'func(db, **payload)' as the handler of jobs of 'kind'."""
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def _load_handlers():
+    import app.database.job_tasks  # noqa: F401  (registers the built-in handlers)
+
+
+def registered_kinds() -> List[str]:
+    _load_handlers()
+    return sorted(_handlers)
+
+
+def enqueue(
+        db: Session,
+        kind: str,
+        payload: Optional[Dict[str, Any]] = None,
+        delay_seconds: float = 0,
+        max_attempts: Optional[int] = None,
+) -> models.Job:
+    """Adds a job and commits. Raises ValueError for a kind without a handler."""
+    _load_handlers()
+    if kind not in _handlers:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    job = models.Job(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        status=QUEUED,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        run_after=datetime.utcnow() + timedelta(seconds=delay_seconds),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _wakeup.set()
+    return job
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Delay before retrying after failed attempt number 'attempt' (1-based), with jitter."""
+    delay = min(settings.JOB_BACKOFF_SECONDS * 2 ** (attempt - 1), settings.JOB_BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _claim(db: Session, worker_id: str) -> Optional[models.Job]:
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+    runnable = or_(
+        and_(models.Job.status == QUEUED, models.Job.run_after <= now),
+        and_(models.Job.status == RUNNING, models.Job.locked_at < stale),  # its worker died
+    )
+    # Always on the primary: a replica may still show jobs as queued that were just claimed
+    candidate_ids = [job_id for (job_id,) in db.query(models.Job.id).filter(runnable)
+                     .order_by(models.Job.run_after, models.Job.id).limit(10)
+                     .execution_options(use_primary=True)]
+    for job_id in candidate_ids:
+        # Only one worker's UPDATE matches: the others see the new status / locked_at
+        claimed = db.query(models.Job).filter(models.Job.id == job_id, runnable).update(
+            {models.Job.status: RUNNING, models.Job.locked_by: worker_id, models.Job.locked_at: now,
+             models.Job.attempts: models.Job.attempts + 1},
+            synchronize_session=False,
+        )
+        db.commit()
+        if claimed:
+            return db.get(models.Job, job_id)
+    return None
+
+
+def run_one(db: Session, worker_id: str) -> bool:
+    """Claims and runs one due job. Returns False if there was none."""
+    from app.database.database import PrimarySessionLocal
+
+    _load_handlers()
+    job = _claim(db, worker_id)
+    if job is None:
+        return False
+
+    # Handlers act on what the request that enqueued them just wrote: never a lagging replica
+    handler_db = PrimarySessionLocal()
+    try:
+        handler = _handlers.get(job.kind)
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind '{job.kind}'")
+        result = handler(handler_db, **json.loads(job.payload or "{}"))
+    except Exception:
+        handler_db.rollback()
+        error = traceback.format_exc()[-4000:]
+        if job.attempts >= job.max_attempts:
+            job.status, job.finished_at = FAILED, datetime.utcnow()
+            logger.error("Job %s (%s) failed for good after %s attempts", job.id, job.kind, job.attempts)
+        else:
+            job.status = QUEUED
+            job.run_after = datetime.utcnow() + timedelta(seconds=backoff_seconds(job.attempts))
+            logger.warning("Job %s (%s) attempt %s failed, retrying at %s", job.id, job.kind, job.attempts, job.run_after)
+        job.last_error = error
+    else:
+        job.status, job.finished_at = SUCCEEDED, datetime.utcnow()
+        job.result = json.dumps(result, default=str) if result is not None else None
+    finally:
+        handler_db.close()
+    job.locked_by = job.locked_at = None
+    db.commit()
+    return True
+
+
+def run_pending(worker_id: Optional[str] = None) -> int:
+    """Runs due jobs until none is left (tests, cron). Returns how many ran."""
+    from app.database.database import PrimarySessionLocal
+
+    worker_id = worker_id or _worker_id(0)
+    count = 0
+    while True:
+        db = PrimarySessionLocal()  # never poll a lagging replica
+        try:
+            if not run_one(db, worker_id):
+                return count
+        finally:
+            db.close()
+        count += 1
+
+
+def _worker_id(index: int) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+class JobWorker:
+    """A pool of threads running jobs; each polls every 'poll_seconds' when idle."""
+
+    def __init__(self, threads: int, poll_seconds: float):
+        self.threads = threads
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        _load_handlers()
+        self._stop.clear()
+        for index in range(self.threads):
+            thread = threading.Thread(target=self._run, args=(_worker_id(index),), name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10):
+        """Asks the threads to stop after their current job and waits up to 'timeout' seconds."""
+        self._stop.set()
+        _wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self, worker_id: str):
+        from app.database.database import PrimarySessionLocal
+
+        while not self._stop.is_set():
+            db = PrimarySessionLocal()  # never poll a lagging replica
+            try:
+                ran = run_one(db, worker_id)
+            except Exception:
+                logger.exception("Job worker %s: could not run a job", worker_id)
+                ran = False
+            finally:
+                db.close()
+            if not ran:
+                _wakeup.wait(self.poll_seconds)
+                _wakeup.clear()
+
+
+worker = JobWorker(settings.JOB_WORKERS, settings.JOB_POLL_SECONDS)
+
+
+# --- Admin queries ---
+def list_jobs(db: Session, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50) -> List[models.Job]:
+    query = db.query(models.Job)
+    if status:
+        query = query.filter(models.Job.status == status)
+    if kind:
+        query = query.filter(models.Job.kind == kind)
+    return query.order_by(models.Job.id.desc()).limit(limit).all()
+
+
+def get_job(db: Session, job_id: int) -> Optional[models.Job]:
+    return db.query(models.Job).filter(models.Job.id == job_id).first()
+
+
+def retry_job(db: Session, job_id: int) -> Optional[models.Job]:
+    """Queues a failed job again with a fresh set of attempts. None if it is not 'failed'."""
+    updated = db.query(models.Job).filter(models.Job.id == job_id, models.Job.status == FAILED).update(
+        {models.Job.status: QUEUED, models.Job.attempts: 0, models.Job.run_after: datetime.utcnow(),
+         models.Job.finished_at: None},
+        synchronize_session=False,
+    )
+    db.commit()
+    if not updated:
+        return None
+    _wakeup.set()
+    return get_job(db, job_id)
+
+
+def purge_finished_jobs(db: Session, older_than_days: int) -> int:
+    """Deletes succeeded and failed jobs that finished more than 'older_than_days' ago."""
+    deleted = db.query(models.Job).filter(
+        models.Job.status.in_([SUCCEEDED, FAILED]),
+        models.Job.finished_at < datetime.utcnow() - timedelta(days=older_than_days),
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run background jobs.")
+    parser.add_argument("--threads", type=int, default=max(settings.JOB_WORKERS, 1))
+    parser.add_argument("--once", action="store_true", help="Run the jobs that are due, then exit.")
+    args = parser.parse_args(argv)
+
+    if args.once:
+        print(json.dumps({"jobs_run": run_pending()}))
+        return
+    pool = JobWorker(args.threads, settings.JOB_POLL_SECONDS)
+    pool.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,17 @@
 import logging
 from sqlalchemy.orm import Session
 from app.database.models import AuditLog # Import your new AuditLog model
-from app.database.database import SessionLocal # Import your production SessionLocal
+from app.database.database import PrimarySessionLocal
 
 class SQLAlchemyHandler(logging.Handler):
     """
     A custom logging handler that writes log records to a SQLAlchemy database table.
     """
     def emit(self, record: logging.LogRecord):
-        # We need to create a new session for each log record
-        # to ensure it's committed independently and doesn't interfere
-        # with ongoing request transactions.
-        # This is important for robustness if the main transaction fails.
-        db: Session = SessionLocal() # Get a new session from your production SessionLocal
+        # A new session is used for each log record to ensure it's committed independently and
+        # doesn't interfere with ongoing request transactions. It is pinned to the primary: the
+        # row is a write, and a failure here must never roll back the request's own work.
+        db: Session = PrimarySessionLocal()
         try:
             # Extract data from the log record.
             # The 'msg' attribute of the LogRecord will be a dictionary
@@ -0,0 +1,87 @@
+# my_fastapi_angular_backend/app/core/password_calibration.py
+"""
+Picks password hashing costs for this hardware.
+
+A login costs one password hash, so the hash time is a direct trade between login throughput
+(and CPU per login) and how slow offline guessing is. This measures the configured scheme at
+increasing costs and reports the highest cost whose hash still takes at most the target time:
+
+    python -m app.core.password_calibration --target-ms 250
+    python -m app.core.password_calibration --scheme argon2 --target-ms 250 --memory-cost 65536
+
+Put the printed values in the environment (BCRYPT_ROUNDS or ARGON2_TIME_COST/ARGON2_MEMORY_COST);
+existing hashes are upgraded as users log in. Run it on the production hardware.
+"""
+import argparse
+import json
+import time
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.security import build_pwd_context
+
+SAMPLE_PASSWORD = "calibration-password"
+BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS = 10, 16
+ARGON2_MAX_TIME_COST = 20
+
+
+def measure_ms(context, samples: int = 3) -> float:
+    """Best-of-'samples' time of one hash (ms); the minimum is the least noisy estimate."""
+    best = float("inf")
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash(SAMPLE_PASSWORD)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def calibrate_bcrypt(target_ms: float, samples: int = 3) -> dict:
+    # Every extra round doubles the work, so stop at the first cost over the target
+    chosen, measurements = BCRYPT_MIN_ROUNDS, {}
+    for rounds in range(BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS + 1):
+        elapsed = measure_ms(build_pwd_context("bcrypt", bcrypt_rounds=rounds), samples)
+        measurements[rounds] = round(elapsed, 1)
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return {"PASSWORD_HASH_SCHEME": "bcrypt", "BCRYPT_ROUNDS": chosen, "hash_ms_by_rounds": measurements}
+
+
+def calibrate_argon2(target_ms: float, memory_cost: int, parallelism: int, samples: int = 3) -> dict:
+    # Memory is fixed by the operator (RAM per concurrent login); time cost fills the budget
+    chosen, measurements = 1, {}
+    for time_cost in range(1, ARGON2_MAX_TIME_COST + 1):
+        context = build_pwd_context(
+            "argon2", argon2_time_cost=time_cost, argon2_memory_cost=memory_cost, argon2_parallelism=parallelism)
+        elapsed = measure_ms(context, samples)
+        measurements[time_cost] = round(elapsed, 1)
+        if elapsed > target_ms:
+            break
+        chosen = time_cost
+    return {
+        "PASSWORD_HASH_SCHEME": "argon2",
+        "ARGON2_TIME_COST": chosen,
+        "ARGON2_MEMORY_COST": memory_cost,
+        "ARGON2_PARALLELISM": parallelism,
+        "hash_ms_by_time_cost": measurements,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Pick password hash costs hitting a target latency.")
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default=settings.PASSWORD_HASH_SCHEME)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Longest acceptable time per hash.")
+    parser.add_argument("--memory-cost", type=int, default=settings.ARGON2_MEMORY_COST, help="argon2 memory (KiB).")
+    parser.add_argument("--parallelism", type=int, default=settings.ARGON2_PARALLELISM)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.scheme == "argon2":
+        result = calibrate_argon2(args.target_ms, args.memory_cost, args.parallelism, args.samples)
+    else:
+        result = calibrate_bcrypt(args.target_ms, args.samples)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# my_fastapi_angular_backend/app/core/permissions.py
+"""
+Admin status and the "owner or admin" checks built on it.
+
+The superadmin (user id 1) is an admin without a row in 'admins'. The caller's own admin status
+is loaded together with the user (get_current_user joins 'admins') and travels on
+UserInDB.is_admin, so checks on the current user never query.
+
+Checks on another user ("is the target an admin?") go through admin_cache: the set of admin ids,
+reloaded at most every ADMIN_CACHE_SECONDS and dropped in this worker whenever an admin is added
+or removed (other workers pick the change up within that delay).
+"""
+import threading
+import time
+from typing import Any, FrozenSet, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import models
+
+SUPERADMIN_ID = 1
+
+
+class AdminCache:
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._admin_ids: FrozenSet[int] = frozenset()
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def is_admin(self, db: Session, user_id: int) -> bool:
+        if user_id == SUPERADMIN_ID:
+            return True
+        return user_id in self._current(db)
+
+    def _current(self, db: Session) -> FrozenSet[int]:
+        if time.monotonic() < self._expires:
+            return self._admin_ids
+        with self._lock:
+            if time.monotonic() >= self._expires:
+                self._admin_ids = frozenset(user_id for (user_id,) in db.query(models.AdminUser.user_id))
+                self._expires = time.monotonic() + self.refresh_seconds
+            return self._admin_ids
+
+    def invalidate(self):
+        with self._lock:
+            self._expires = 0.0
+
+
+admin_cache = AdminCache(settings.ADMIN_CACHE_SECONDS)
+
+
+def is_admin(user: Optional[Any]) -> bool:
+    """True for an admin or the superadmin. 'user' is a UserInDB (or User) with is_admin loaded."""
+    return user is not None and (user.id == SUPERADMIN_ID or bool(user.is_admin))
+
+
+def can_manage(user: Optional[Any], owner_id: int) -> bool:
+    """True if 'user' owns the resource (owner_id) or is an admin."""
+    return user is not None and (user.id == owner_id or is_admin(user))
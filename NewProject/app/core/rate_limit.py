@@ -0,0 +1,189 @@
+# my_fastapi_angular_backend/app/core/rate_limit.py
+"""
+Token-bucket rate limiting.
+
+A bucket holds up to 'limit' tokens and refills at limit/period tokens per second; every hit
+takes one token and is rejected when the bucket is empty, together with how long to wait for
+the next token (Retry-After). Bursts up to 'limit' pass, sustained traffic is held to the rate.
+
+Backends:
+    RATE_LIMIT_STORAGE_URL=""            MemoryBackend: per process (default, tests)
+    RATE_LIMIT_STORAGE_URL="redis://..." RedisBackend: one bucket shared by all workers (needs 'redis')
+
+RedisBackend does network I/O: async callers (middleware, async routes) use the *_async
+functions, which run a blocking backend in the thread pool instead of on the event loop.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # optional: only needed for RATE_LIMIT_STORAGE_URL=redis://...
+    redis = None
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class Rate:
+    limit: int
+    period: int  # seconds
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """Parses "10/minute", "5/second", "1000/hour" or "100/day"."""
+        count, _, period = value.partition("/")
+        period = period.strip().lower().rstrip("s")
+        if period not in PERIODS:
+            raise ValueError(f"Unknown rate limit period in '{value}'")
+        return cls(int(count), PERIODS[period])
+
+
+class MemoryBackend:
+    """
+    Buckets in an OrderedDict guarded by a lock, least recently used first. Beyond MAX_KEYS the
+    least recently used bucket is evicted: a flood of distinct keys pushes out idle buckets
+    before the active ones, instead of wiping them all.
+    """
+
+    MAX_KEYS = 100_000
+    blocking = False  # no I/O: cheap enough to call on the event loop
+
+    def __init__(self):
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()  # key -> [tokens, last update]
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, rate: Rate) -> Tuple[bool, float]:
+        now = time.monotonic()
+        refill = rate.limit / rate.period
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                while len(self._buckets) >= self.MAX_KEYS:
+                    self._buckets.popitem(last=False)
+                bucket = self._buckets[key] = [float(rate.limit), now]
+            else:
+                self._buckets.move_to_end(key)
+            tokens = min(rate.limit, bucket[0] + (now - bucket[1]) * refill)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return True, 0.0
+            bucket[0] = tokens
+            return False, (1 - tokens) / refill
+
+    def reset(self, key: str):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+
+class RedisBackend:
+    """Same token bucket, evaluated atomically inside Redis by a small Lua script."""
+
+    SCRIPT = """
+    local limit = tonumber(ARGV[1])
+    local refill = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or limit
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(limit, tokens + math.max(0, now - ts) * refill)
+    local allowed = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(limit / refill) + 1)
+    return {allowed, tostring(tokens)}
+    """
+    blocking = True  # a network round trip per call
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_STORAGE_URL points to Redis but the 'redis' package is not installed")
+        self.client = redis.Redis.from_url(url)
+        self._script = self.client.register_script(self.SCRIPT)
+
+    def hit(self, key: str, rate: Rate) -> Tuple[bool, float]:
+        refill = rate.limit / rate.period
+        allowed, tokens = self._script(keys=["ratelimit:" + key], args=[rate.limit, refill, time.time()])
+        if int(allowed):
+            return True, 0.0
+        return False, (1 - float(tokens)) / refill
+
+    def reset(self, key: str):
+        self.client.delete("ratelimit:" + key)
+
+
+def create_backend(url: str):
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    return MemoryBackend()
+
+
+backend = create_backend(settings.RATE_LIMIT_STORAGE_URL)
+
+
+def hit(key: str, rate: Rate) -> Tuple[bool, float]:
+    """Takes one token from the bucket 'key'. Returns (allowed, seconds until the next token)."""
+    return backend.hit(key, rate)
+
+
+async def hit_async(key: str, rate: Rate) -> Tuple[bool, float]:
+    """hit() for async callers: a blocking backend runs in the thread pool."""
+    if backend.blocking:
+        return await run_in_threadpool(backend.hit, key, rate)
+    return backend.hit(key, rate)
+
+
+# --- Login attempts ---
+LOGIN_IP_RATE = Rate.parse(settings.LOGIN_RATE_LIMIT_PER_IP)
+LOGIN_USERNAME_RATE = Rate.parse(settings.LOGIN_RATE_LIMIT_PER_USERNAME)
+
+
+def _login_keys(ip_address: str, username: str) -> Tuple[str, str]:
+    return f"login:ip:{ip_address}", f"login:user:{username.strip().lower()}"
+
+
+def check_login_attempt(ip_address: str, username: str) -> Optional[float]:
+    """
+    Counts a login attempt against both the client IP and the username, before any database
+    or bcrypt work. Returns None if allowed, else the number of seconds to wait.
+    The IP bucket stops one client spraying many accounts; the username bucket stops many
+    clients (a botnet) guessing one account.
+    """
+    ip_key, username_key = _login_keys(ip_address, username)
+    ip_allowed, ip_wait = backend.hit(ip_key, LOGIN_IP_RATE)
+    if not ip_allowed:
+        return ip_wait
+    username_allowed, username_wait = backend.hit(username_key, LOGIN_USERNAME_RATE)
+    if not username_allowed:
+        return username_wait
+    return None
+
+
+def login_succeeded(ip_address: str, username: str):
+    """A successful login clears the username's failed attempts (typos should not lock it)."""
+    backend.reset(_login_keys(ip_address, username)[1])
+
+
+async def check_login_attempt_async(ip_address: str, username: str) -> Optional[float]:
+    if backend.blocking:
+        return await run_in_threadpool(check_login_attempt, ip_address, username)
+    return check_login_attempt(ip_address, username)
+
+
+async def login_succeeded_async(ip_address: str, username: str):
+    if backend.blocking:
+        await run_in_threadpool(login_succeeded, ip_address, username)
+    else:
+        login_succeeded(ip_address, username)
@@ -0,0 +1,156 @@
+# my_fastapi_angular_backend/app/core/revocation.py
+"""
+Access token revocation.
+
+Every access token carries a unique 'jti' and its issue time 'iat'. Revocations are stored in
+the revoked_tokens table, either for one token (logout: jti) or for every token of a user issued
+before a moment (password change, account deletion: subject + issued_before, in milliseconds).
+
+Each process mirrors the table in memory: a set of revoked jtis and a subject -> cutoff map.
+get_current_user checks a token against them without touching the database. The mirror catches
+up with rows written by other workers at most once every REVOCATION_REFRESH_SECONDS, so a
+revocation reaches all workers within that delay; the worker that revokes applies it immediately.
+
+Catching up reloads the rows revoked since the previous refresh minus
+REVOCATION_REFRESH_MARGIN_SECONDS, on the primary. Ids are not used for this: they are assigned
+at INSERT but become visible at COMMIT, so a lower id can appear after a higher one was seen.
+The overlap re-reads a few rows, which is harmless (remembering a revocation is idempotent).
+Rows whose tokens have all expired are purged hourly in the background, on a session of their
+own (or on demand with the 'purge_expired_revocations' job).
+"""
+import calendar
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import models
+from app.database.database import PrimarySessionLocal
+
+logger = logging.getLogger("my_fastapi_app")
+
+PURGE_INTERVAL_SECONDS = 3600
+
+def _epoch(value: datetime) -> int:
+    return calendar.timegm(value.utctimetuple())
+
+
+class RevocationList:
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._jtis: Dict[str, int] = {}  # jti -> expiry (epoch seconds)
+        self._cutoffs: Dict[str, int] = {}  # subject -> tokens issued before this (epoch ms) are revoked
+        self._loaded_at: Optional[datetime] = None  # UTC start of the last successful refresh
+        self._next_refresh = 0.0
+        self._next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+        self._lock = threading.Lock()
+
+    def is_revoked(self, claims: dict) -> bool:
+        """True if the token described by 'claims' was revoked. Never queries the database."""
+        jti = claims.get("jti")
+        if jti is not None and jti in self._jtis:
+            return True
+        cutoff = self._cutoffs.get(claims.get("sub"))
+        if cutoff is None:
+            return False
+        iat = claims.get("iat")
+        return iat is None or round(iat * 1000) < cutoff
+
+    def refresh_if_stale(self):
+        """
+        Loads revocations written since the last refresh (by any worker), if it is time to.
+        Uses a short-lived session of its own on the primary: a replica may lag behind, and the
+        request's session must not be touched by this.
+        """
+        now = time.monotonic()
+        if now < self._next_refresh:
+            return
+        with self._lock:
+            if now < self._next_refresh:
+                return
+            self._next_refresh = now + self.refresh_seconds
+            started = datetime.utcnow()
+            query = select(
+                models.RevokedToken.jti, models.RevokedToken.subject,
+                models.RevokedToken.issued_before, models.RevokedToken.expires_at,
+            ).where(models.RevokedToken.expires_at > started)
+            if self._loaded_at is not None:
+                since = self._loaded_at - timedelta(seconds=settings.REVOCATION_REFRESH_MARGIN_SECONDS)
+                query = query.where(models.RevokedToken.revoked_at >= since)
+            db = PrimarySessionLocal()
+            try:
+                rows = db.execute(query).all()
+            finally:
+                db.close()
+            for row in rows:
+                self._remember(row.jti, row.subject, row.issued_before, _epoch(row.expires_at))
+            self._loaded_at = started
+            self._forget_expired()
+            if now >= self._next_purge:
+                self._next_purge = now + PURGE_INTERVAL_SECONDS
+                threading.Thread(target=_purge_in_background, name="revocation-purge", daemon=True).start()
+
+    def _remember(self, jti: Optional[str], subject: Optional[str], issued_before: Optional[int], expires: int):
+        if jti is not None:
+            self._jtis[jti] = expires
+        elif subject is not None and issued_before is not None:
+            self._cutoffs[subject] = max(issued_before, self._cutoffs.get(subject, 0))
+
+    def _forget_expired(self):
+        now = time.time()
+        for jti in [jti for jti, expires in self._jtis.items() if expires <= now]:
+            del self._jtis[jti]
+        # A cutoff only matters while tokens issued before it can still be unexpired
+        oldest_live_token = (now - settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60) * 1000
+        for subject in [subject for subject, cutoff in self._cutoffs.items() if cutoff <= oldest_live_token]:
+            del self._cutoffs[subject]
+
+    def revoke_token(self, db: Session, claims: dict):
+        """Revokes one token (e.g. on logout). Tokens without a 'jti' cannot be revoked singly."""
+        jti = claims.get("jti")
+        if jti is None:
+            return
+        expires_at = datetime.utcfromtimestamp(claims["exp"]) if "exp" in claims else \
+            datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        db.add(models.RevokedToken(jti=jti, subject=claims.get("sub"), expires_at=expires_at))
+        db.commit()
+        with self._lock:
+            self._remember(jti, None, None, _epoch(expires_at))
+
+    def revoke_subject(self, db: Session, subject: str):
+        """Revokes every token issued so far for 'subject' (the username in 'sub')."""
+        now = time.time()
+        # 'iat' has millisecond precision: include the current millisecond
+        issued_before = int(now * 1000) + 1
+        expires_at = datetime.utcfromtimestamp(now) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        db.add(models.RevokedToken(subject=subject, issued_before=issued_before, expires_at=expires_at))
+        db.commit()
+        with self._lock:
+            self._remember(None, subject, issued_before, _epoch(expires_at))
+
+
+def purge_expired_revocations(db: Session) -> int:
+    """Deletes revoked_tokens rows whose tokens have all expired. Returns how many were deleted."""
+    deleted = db.query(models.RevokedToken)\
+        .filter(models.RevokedToken.expires_at < datetime.utcnow())\
+        .delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def _purge_in_background():
+    db = PrimarySessionLocal()
+    try:
+        purge_expired_revocations(db)
+    except Exception:
+        logger.exception("Could not purge expired token revocations")
+    finally:
+        db.close()
+
+
+revocation_list = RevocationList(settings.REVOCATION_REFRESH_SECONDS)
@@ -1,15 +1,65 @@
 # my_fastapi_angular_backend/app/core/security.py
 
+import hashlib
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
 from passlib.context import CryptContext
+from passlib.hash import argon2
 from jose import jwt, JWTError # Ensure JWTError is imported for proper handling
 
 from app.core.config import settings
 
-# Set up the password hashing context using bcrypt.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+try:
+    # PyJWT verifies HS256 tokens several times faster than python-jose; jose stays the fallback
+    import jwt as pyjwt
+except ImportError:
+    pyjwt = None
+
+PASSWORD_SCHEMES = ("bcrypt", "argon2")
+
+
+def build_pwd_context(
+        scheme: str = "bcrypt",
+        bcrypt_rounds: int = 12,
+        argon2_time_cost: int = 3,
+        argon2_memory_cost: int = 65536,
+        argon2_parallelism: int = 4,
+) -> CryptContext:
+    """
+    Password hashing context. 'scheme' hashes new passwords; the other scheme is still verified
+    but deprecated, and so is a hash made with other cost parameters: needs_update() is True for
+    both, and they are rehashed at the next successful login (see verify_password_and_update).
+    argon2 needs the optional 'argon2-cffi' package; choosing it without one fails here, at
+    startup, instead of at the first login or registration.
+    """
+    if scheme not in PASSWORD_SCHEMES:
+        raise ValueError(f"Unknown password hash scheme '{scheme}' (expected one of {PASSWORD_SCHEMES})")
+    if scheme == "argon2" and not argon2.has_backend():
+        raise RuntimeError("PASSWORD_HASH_SCHEME is 'argon2' but the 'argon2-cffi' package is not installed")
+    return CryptContext(
+        schemes=[scheme] + [other for other in PASSWORD_SCHEMES if other != scheme],
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+# Set up the password hashing context (scheme and cost come from settings).
+pwd_context = build_pwd_context(
+    scheme=settings.PASSWORD_HASH_SCHEME,
+    bcrypt_rounds=settings.BCRYPT_ROUNDS,
+    argon2_time_cost=settings.ARGON2_TIME_COST,
+    argon2_memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2_parallelism=settings.ARGON2_PARALLELISM,
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -18,9 +68,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_password_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies a password like verify_password() and, when it matches but the stored hash uses an
+    old scheme or cost (needs_update), also returns a new hash to store: (valid, new_hash or None).
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """
-    Hashes a plain-text password using bcrypt.
+    Hashes a plain-text password with the configured scheme and cost.
     """
     return pwd_context.hash(password)
 
@@ -37,19 +94,93 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         # Default expiration from settings (e.g., 30 minutes) if not specified
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire}) # Add expiration timestamp to the payload
+    # 'jti' identifies the token for revocation (logout); 'iat' (with milliseconds) lets
+    # password changes revoke every token issued before them (see app/core/revocation.py).
+    # Truncated, not rounded: a token must never look younger than it is
+    to_encode.update({"exp": expire, "iat": int(time.time() * 1000) / 1000, "jti": uuid.uuid4().hex})
     # Encode the JWT using the secret key and algorithm from settings
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    if pyjwt is not None:
+        encoded_jwt = pyjwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    else:
+        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def generate_refresh_token() -> str:
+    """A random, opaque refresh token (384 bits); only its hash is stored."""
+    return secrets.token_urlsafe(48)
+
+
+def hash_refresh_token(token: str) -> str:
+    """
+    SHA-256 of a refresh token. The token is random and long, so a fast hash is enough
+    (no bcrypt), and the hash is a direct unique-index lookup.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _decode_and_verify(token: str) -> dict:
+    if pyjwt is not None:
+        try:
+            return pyjwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except pyjwt.PyJWTError as e:
+            raise JWTError(str(e))
+    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+
+class _ClaimsCache:
+    """
+    Bounded LRU of token -> verified claims, so a token sent with every request is parsed and
+    HMAC-verified only once. Entries are dropped when the token's 'exp' passes.
+    Only successfully verified tokens are stored; a lock guards it for threadpool routes.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is None:
+                return None
+            exp = claims.get("exp")
+            if exp is not None and exp <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def put(self, token: str, claims: dict):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[token] = claims
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+claims_cache = _ClaimsCache(settings.JWT_CLAIMS_CACHE_SIZE)
+
+
 def decode_token(token: str) -> Optional[dict]:
     """
     Decodes a JWT token.
     Returns the payload as a dictionary if the token is valid and not expired.
     Returns None if the token is invalid (e.g., tampered, expired, wrong secret).
+    Verified tokens are remembered until they expire (see _ClaimsCache); the returned
+    dictionary is a copy, so callers may modify it.
     """
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError: # Catch specific JWT errors during decoding (e.g., ExpiredSignatureError)
-        return None
\ No newline at end of file
+    claims = claims_cache.get(token)
+    if claims is None:
+        try:
+            claims = _decode_and_verify(token)
+        except JWTError: # Catch specific JWT errors during decoding (e.g., ExpiredSignatureError)
+            return None
+        claims_cache.put(token, claims)
+    return dict(claims)
@@ -0,0 +1,105 @@
+# my_fastapi_angular_backend/app/core/totp.py
+"""
+TOTP verification with replay protection.
+
+A TOTP code stays valid for its 30-second time step (plus one step either side for clock drift),
+so on its own a code seen once - over a shoulder, in a log, by a phishing proxy - can be replayed
+for up to 90 seconds. verify_totp() accepts each (user, time step) pair once: the accepted step is
+recorded in a TTL set until it can no longer be valid.
+
+Used steps live in process memory by default. Set TOTP_REPLAY_STORAGE_URL=redis://... (needs the
+'redis' package) so every worker sees the same set. Async routes call verify_totp_async(), which
+runs the Redis round trip in the thread pool instead of on the event loop.
+"""
+import hmac
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import pyotp
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # optional: only needed for TOTP_REPLAY_STORAGE_URL=redis://...
+    redis = None
+
+VALID_WINDOW = 1  # accepted steps on either side of the current one
+
+
+class MemoryUsedSteps:
+    blocking = False
+
+    def __init__(self):
+        self._used: Dict[Tuple[int, int], float] = {}  # (user_id, step) -> expiry (monotonic)
+        self._lock = threading.Lock()
+
+    def add_once(self, user_id: int, step: int, ttl: float) -> bool:
+        """Records (user_id, step); False if it was already recorded and has not expired."""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._used) > 10_000:
+                for key in [key for key, expires in self._used.items() if expires <= now]:
+                    del self._used[key]
+            expires = self._used.get((user_id, step))
+            if expires is not None and expires > now:
+                return False
+            self._used[(user_id, step)] = now + ttl
+            return True
+
+
+class RedisUsedSteps:
+    blocking = True  # a network round trip per call
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("TOTP_REPLAY_STORAGE_URL points to Redis but the 'redis' package is not installed")
+        self.client = redis.Redis.from_url(url)
+
+    def add_once(self, user_id: int, step: int, ttl: float) -> bool:
+        return bool(self.client.set(f"totp_used:{user_id}:{step}", 1, nx=True, ex=max(1, int(ttl) + 1)))
+
+
+def _create_store(url: str):
+    if url.startswith(("redis://", "rediss://")):
+        return RedisUsedSteps(url)
+    return MemoryUsedSteps()
+
+
+used_steps = _create_store(settings.TOTP_REPLAY_STORAGE_URL)
+
+
+def _matching_step(totp: pyotp.TOTP, code: str, now: float) -> Optional[int]:
+    current = int(now // totp.interval)
+    for offset in range(-VALID_WINDOW, VALID_WINDOW + 1):
+        step = current + offset
+        if hmac.compare_digest(totp.generate_otp(step), code):
+            return step
+    return None
+
+
+def verify_totp(user_id: int, secret: str, code: Optional[str]) -> bool:
+    """
+    True if 'code' is valid for 'secret' right now and this user has not used that time step
+    before. Uses the secret from the already loaded user; no database access.
+    """
+    if not secret or not code:
+        return False
+    code = code.strip()
+    totp = pyotp.TOTP(secret)
+    now = time.time()
+    step = _matching_step(totp, code, now)
+    if step is None:
+        return False
+    # The step stops being accepted once it falls out of the window
+    ttl = (step + VALID_WINDOW + 1) * totp.interval - now
+    return used_steps.add_once(user_id, step, ttl)
+
+
+async def verify_totp_async(user_id: int, secret: str, code: Optional[str]) -> bool:
+    """verify_totp() for async routes: a blocking used-step store runs in the thread pool."""
+    if used_steps.blocking:
+        return await run_in_threadpool(verify_totp, user_id, secret, code)
+    return verify_totp(user_id, secret, code)
@@ -0,0 +1,313 @@
+# my_fastapi_angular_backend/app/database/audit_maintenance.py
+"""
+Partition maintenance and retention for the 'audit_logs' table.
+
+On MySQL the table is RANGE-partitioned by month (partitions are named pYYYYMM plus a
+catch-all 'pmax'), so retention is an archive + DROP PARTITION instead of a huge DELETE.
+On other dialects (SQLite in development) old rows are archived and deleted in batches.
+
+Archived rows are written as gzip-compressed JSON lines, one file per dropped partition:
+    <AUDIT_ARCHIVE_DIR>/audit_logs_YYYYMM.jsonl.gz
+or, for the batched fallback, one file per batch and month, named after its first row id:
+    <AUDIT_ARCHIVE_DIR>/audit_logs_YYYYMM_<first id>.jsonl.gz
+Files are rewritten, never appended to, so a run that is retried after a crash does not
+archive the same rows twice.
+
+Run it periodically (e.g. from cron):
+    python -m app.database.audit_maintenance --retention-days 180
+"""
+import argparse
+import gzip
+import json
+import os
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+from app.database.models import AuditLog
+
+audit_table = AuditLog.__table__
+ARCHIVE_COLUMNS = [
+    audit_table.c.id,
+    audit_table.c.timestamp,
+    audit_table.c.endpoint,
+    audit_table.c.ip_address,
+    audit_table.c.user_id,
+    audit_table.c.username,
+]
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value: date) -> date:
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+def _partition_name(month: date) -> str:
+    return f"p{month.year:04d}{month.month:02d}"
+
+
+def _partition_month(name: str) -> Optional[date]:
+    """Returns the first day of the month a 'pYYYYMM' partition holds, or None for 'pmax'."""
+    if len(name) != 7 or not name.startswith("p") or not name[1:].isdigit():
+        return None
+    return date(int(name[1:5]), int(name[5:7]), 1)
+
+
+def _archive_path(archive_dir: str, month: date, first_id: Optional[int] = None) -> str:
+    suffix = "" if first_id is None else f"_{first_id}"
+    return os.path.join(archive_dir, f"audit_logs_{month.year:04d}{month.month:02d}{suffix}.jsonl.gz")
+
+
+def _row_to_json(row) -> str:
+    return json.dumps({
+        "id": row.id,
+        "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+        "endpoint": row.endpoint,
+        "ip_address": row.ip_address,
+        "user_id": row.user_id,
+        "username": row.username,
+    }, ensure_ascii=False)
+
+
+def list_audit_partitions(conn: Connection) -> List[str]:
+    """Returns the partition names of audit_logs in order (empty if the table is not partitioned)."""
+    rows = conn.execute(text(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {"table": audit_table.name}).scalars().all()
+    return list(rows)
+
+
+def _partition_definitions(first_month: date, last_month: date) -> Tuple[List[str], List[str]]:
+    """
+    Monthly partitions from 'first_month' through 'last_month' followed by 'pmax', as
+    (names of the monthly partitions, PARTITION clauses).
+    """
+    names = []
+    definitions = []
+    month = _month_start(first_month)
+    while month <= last_month:
+        name = _partition_name(month)
+        definitions.append(
+            f"PARTITION {name} VALUES LESS THAN (TO_DAYS('{_next_month(month).isoformat()}'))"
+        )
+        names.append(name)
+        month = _next_month(month)
+    definitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return names, definitions
+
+
+def _last_wanted_month(today: date, months_ahead: int) -> date:
+    month = _month_start(today)
+    for _ in range(months_ahead):
+        month = _next_month(month)
+    return month
+
+
+def _oldest_month(conn: Connection, today: date) -> date:
+    """Month of the oldest audit row (the current month for an empty table)."""
+    oldest = conn.execute(select(func.min(audit_table.c.timestamp))).scalar()
+    return _month_start(oldest.date() if oldest is not None else today)
+
+
+def partition_audit_table(
+    engine: Engine,
+    months_ahead: int = settings.AUDIT_PARTITION_MONTHS_AHEAD,
+    today: Optional[date] = None,
+) -> bool:
+    """
+    Converts an existing, unpartitioned MySQL audit_logs table (created before partitioning was
+    introduced) into the partitioned layout. Existing rows get one partition per month back to
+    the oldest row, so the retention run can drop them month by month; nothing old is left in
+    'pmax'. Drops the old user_id foreign key, which MySQL does not allow on partitioned tables.
+    This rewrites the table, so run it in a maintenance window.
+    Returns True if the table was converted.
+    """
+    if engine.dialect.name != "mysql":
+        return False
+    today = today or datetime.utcnow().date()
+    with engine.begin() as conn:
+        if list_audit_partitions(conn):
+            return False
+        _, definitions = _partition_definitions(_oldest_month(conn, today), _last_wanted_month(today, months_ahead))
+        foreign_keys = conn.execute(text(
+            "SELECT CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS "
+            "WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+        ), {"table": audit_table.name}).scalars().all()
+        for fk_name in foreign_keys:
+            conn.execute(text(f"ALTER TABLE audit_logs DROP FOREIGN KEY `{fk_name}`"))
+        conn.execute(text(
+            "ALTER TABLE audit_logs DROP PRIMARY KEY, ADD PRIMARY KEY (id, timestamp) "
+            f"PARTITION BY RANGE (TO_DAYS(timestamp)) ({', '.join(definitions)})"
+        ))
+    return True
+
+
+def ensure_audit_partitions(
+    engine: Engine,
+    months_ahead: int = settings.AUDIT_PARTITION_MONTHS_AHEAD,
+    today: Optional[date] = None,
+) -> List[str]:
+    """
+    Makes sure monthly partitions exist from the current month up to 'months_ahead' months
+    in the future by splitting them off 'pmax'. If the table has only 'pmax', they start at the
+    month of the oldest row instead, so old rows get droppable monthly partitions too.
+    Cheap and idempotent; called at startup and by the maintenance command.
+    Returns the names of the partitions it created.
+    No-op on dialects other than MySQL or when the table is not partitioned.
+    """
+    if engine.dialect.name != "mysql":
+        return []
+    today = today or datetime.utcnow().date()
+
+    with engine.begin() as conn:
+        existing = list_audit_partitions(conn)
+        if not existing:
+            return []
+        months = [m for m in (_partition_month(name) for name in existing) if m is not None]
+        # Ranges must stay increasing, so new partitions can only be added after the last one.
+        month = _next_month(max(months)) if months else _oldest_month(conn, today)
+        created, definitions = _partition_definitions(month, _last_wanted_month(today, months_ahead))
+        if created:
+            conn.execute(text(
+                f"ALTER TABLE audit_logs REORGANIZE PARTITION pmax INTO ({', '.join(definitions)})"
+            ))
+    return created
+
+
+def _archive_partition(engine: Engine, partition: str, path: str, batch_size: int) -> int:
+    """Streams one partition into a gzip JSONL file through a server-side cursor."""
+    written = 0
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(text(
+            f"SELECT id, timestamp, endpoint, ip_address, user_id, username "
+            f"FROM audit_logs PARTITION ({partition}) ORDER BY id"
+        ))
+        # 'wt' on purpose: if a previous run died before dropping the partition,
+        # the file is rewritten from the complete partition instead of duplicated.
+        with gzip.open(path, "wt", encoding="utf-8") as archive:
+            for row in result:
+                archive.write(_row_to_json(row) + "\n")
+                written += 1
+    return written
+
+
+def _purge_partitions(engine: Engine, cutoff: date, archive_dir: Optional[str], batch_size: int) -> Tuple[int, List[str]]:
+    with engine.connect() as conn:
+        partitions = list_audit_partitions(conn)
+
+    archived = 0
+    dropped = []
+    for name in partitions:
+        month = _partition_month(name)
+        # Only whole months that end on or before the cutoff are dropped.
+        if month is None or _next_month(month) > cutoff:
+            continue
+        if archive_dir:
+            archived += _archive_partition(engine, name, _archive_path(archive_dir, month), batch_size)
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE audit_logs DROP PARTITION {name}"))
+        dropped.append(name)
+    return archived, dropped
+
+
+def _purge_rows(engine: Engine, cutoff: date, archive_dir: Optional[str], batch_size: int) -> int:
+    """
+    Fallback for unpartitioned tables: archive and delete old rows in id-ordered batches.
+    Each batch is archived to its own files (per month, named after the batch's first row id of
+    that month) before its DELETE commits. If the run dies in between, the rows are still in
+    the table and the retry selects the same batch and overwrites the same files.
+    """
+    cutoff_dt = datetime.combine(cutoff, datetime.min.time())
+    removed = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(*ARCHIVE_COLUMNS)
+                .where(audit_table.c.timestamp < cutoff_dt)
+                .order_by(audit_table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            if archive_dir:
+                by_month = {}
+                for row in rows:
+                    by_month.setdefault(_month_start(row.timestamp.date()), []).append(row)
+                for month, month_rows in by_month.items():
+                    path = _archive_path(archive_dir, month, month_rows[0].id)
+                    with gzip.open(path, "wt", encoding="utf-8") as archive:
+                        for row in month_rows:
+                            archive.write(_row_to_json(row) + "\n")
+
+            conn.execute(delete(audit_table).where(audit_table.c.id.in_([row.id for row in rows])))
+            removed += len(rows)
+    return removed
+
+
+def purge_audit_logs(
+    engine: Engine,
+    retention_days: int = settings.AUDIT_RETENTION_DAYS,
+    archive_dir: Optional[str] = settings.AUDIT_ARCHIVE_DIR,
+    batch_size: int = 5000,
+    today: Optional[date] = None,
+) -> dict:
+    """
+    Removes audit rows older than 'retention_days' (counted in UTC, like the stored
+    timestamps), archiving them first unless
+    'archive_dir' is None. On a partitioned MySQL table whole monthly partitions are
+    archived and dropped, so a partition is kept until its entire month is past the cutoff.
+    Returns a small summary dict.
+    """
+    cutoff = (today or datetime.utcnow().date()) - timedelta(days=retention_days)
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+
+    if engine.dialect.name == "mysql":
+        with engine.connect() as conn:
+            partitioned = bool(list_audit_partitions(conn))
+        if partitioned:
+            archived, dropped = _purge_partitions(engine, cutoff, archive_dir, batch_size)
+            return {"cutoff": cutoff.isoformat(), "rows_archived": archived, "partitions_dropped": dropped}
+
+    removed = _purge_rows(engine, cutoff, archive_dir, batch_size)
+    return {"cutoff": cutoff.isoformat(), "rows_archived": removed if archive_dir else 0, "rows_deleted": removed}
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.database.database import engine
+
+    parser = argparse.ArgumentParser(description="Audit log partition maintenance and retention.")
+    parser.add_argument("--retention-days", type=int, default=settings.AUDIT_RETENTION_DAYS)
+    parser.add_argument("--archive-dir", default=settings.AUDIT_ARCHIVE_DIR)
+    parser.add_argument("--no-archive", action="store_true", help="Drop old rows without archiving them.")
+    parser.add_argument("--months-ahead", type=int, default=settings.AUDIT_PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--convert", action="store_true",
+                        help="Convert an existing unpartitioned MySQL table before running maintenance.")
+    args = parser.parse_args(argv)
+
+    if args.convert and partition_audit_table(engine, months_ahead=args.months_ahead):
+        print("audit_logs converted to a partitioned table")
+    created = ensure_audit_partitions(engine, months_ahead=args.months_ahead)
+    if created:
+        print(f"created partitions: {', '.join(created)}")
+    summary = purge_audit_logs(
+        engine,
+        retention_days=args.retention_days,
+        archive_dir=None if args.no_archive else args.archive_dir,
+    )
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
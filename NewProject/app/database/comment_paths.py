@@ -0,0 +1,96 @@
+# my_fastapi_angular_backend/app/database/comment_paths.py
+"""
+Backfills the materialized paths of comments written before threads existed.
+
+prompt_comments.path and depth are set by crud.create_comment; older rows have path NULL, which
+crud.comment_path treats as a thread root. This fills them in batches, one commit per batch: a
+top-level comment gets path = its own segment and depth 0, a legacy reply gets its parent's path
+plus its segment once the parent has one. The reply counts of the prompts touched are then
+recomputed from the new paths.
+
+    python -m app.database.comment_paths --batch-size 1000
+or the 'backfill_comment_paths' job.
+"""
+import argparse
+import json
+from collections import Counter
+from typing import List, Optional
+
+from sqlalchemy import bindparam, or_, select, update
+from sqlalchemy.orm import Session, aliased
+
+from app.database import models
+from app.database.crud import comment_path_segment, path_comment_ids
+
+
+def _recount_replies(db: Session, prompt_id: int):
+    comments = models.PromptComment.__table__
+    rows = db.execute(
+        select(comments.c.comment_id, comments.c.path)
+        .where(comments.c.prompt_id == prompt_id, comments.c.path.is_not(None))
+    ).all()
+    replies = Counter(ancestor for _, path in rows for ancestor in path_comment_ids(path)[:-1])
+    db.execute(
+        update(comments).where(comments.c.comment_id == bindparam("id"))
+        .values(reply_count=bindparam("replies"), updated_at=comments.c.updated_at),
+        [{"id": comment_id, "replies": replies[comment_id]} for comment_id, _ in rows],
+    )
+
+
+def backfill_comment_paths(db: Session, batch_size: int = 1000) -> dict:
+    """Sets path and depth of comments (live prompts or not) that have no path yet."""
+    summary = {"comments": 0, "batches": 0, "prompts": 0}
+    parent = aliased(models.PromptComment)
+    prompt_ids = set()
+    while True:
+        # Only comments whose parent already has a path, so a batch never depends on itself;
+        # each round reaches one reply level further down
+        rows = db.execute(
+            select(models.PromptComment.comment_id, models.PromptComment.prompt_id, parent.path, parent.depth)
+            .outerjoin(parent, parent.comment_id == models.PromptComment.parent_id)
+            .where(models.PromptComment.path.is_(None),
+                   or_(models.PromptComment.parent_id.is_(None), parent.path.is_not(None)))
+            .order_by(models.PromptComment.comment_id).limit(batch_size)
+            .execution_options(include_deleted=True)
+        ).all()
+        if not rows:
+            break
+        # updated_at is set to itself so its onupdate does not fire: this is not an edit
+        comments = models.PromptComment.__table__
+        db.execute(
+            update(comments).where(comments.c.comment_id == bindparam("id"))
+            .values(path=bindparam("new_path"), depth=bindparam("new_depth"), updated_at=comments.c.updated_at),
+            [{"id": comment_id,
+              "new_path": (parent_path or "") + comment_path_segment(comment_id),
+              "new_depth": parent_depth + 1 if parent_path else 0}
+             for comment_id, _, parent_path, parent_depth in rows],
+        )
+        db.commit()
+        prompt_ids.update(prompt_id for _, prompt_id, _, _ in rows)
+        summary["comments"] += len(rows)
+        summary["batches"] += 1
+
+    # Legacy replies were never counted on their ancestors
+    for prompt_id in sorted(prompt_ids):
+        _recount_replies(db, prompt_id)
+        db.commit()
+    summary["prompts"] = len(prompt_ids)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.database.database import PrimarySessionLocal
+
+    parser = argparse.ArgumentParser(description="Fill in the thread paths of comments that have none.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    db = PrimarySessionLocal()
+    try:
+        print(json.dumps(backfill_comment_paths(db, args.batch_size)))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 # my_fastapi_angular_backend/app/database/crud.py
-from typing import Optional, List, Tuple
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, List, Tuple, Iterator, Dict
 
 from fastapi.params import Depends
 
@@ -14,7 +16,12 @@ from app.database import models
 from app.database.models import User, Prompt  # Import your SQLAlchemy ORM model
 from app.schemas.label import LabelUpdate
 from app.schemas.user import UserCreate, UserUpdate  # Import your Pydantic schema for input
-from app.core.security import get_password_hash # Import your hashing utility
+from app.core.security import get_password_hash, generate_refresh_token, hash_refresh_token # Import your hashing utility
+from app.core.config import settings
+from app.core.events import publish_prompt_event
+from app.core.revocation import revocation_list
+from app.core.permissions import admin_cache, can_manage, is_admin
+from app.database.prompt_dedup import content_hash
 from app.schemas import prompt as prompt_schemas
 from app.schemas import user as user_schemas
 from app.schemas import label as label_schemas
@@ -24,7 +31,8 @@ def create_prompt(db: Session, prompt: prompt_schemas.PromptCreate, user_id: int
     " Create a new prompt "
     db_prompt = models.Prompt(
         **prompt.model_dump(),
-        user_id=user_id
+        user_id=user_id,
+        content_hash=content_hash(prompt.content),
     )
     db.add(db_prompt)
     db.commit()
@@ -35,6 +43,42 @@ def get_prompt(db: Session, prompt_id: int ):
     return db.query(models.Prompt).filter(models.Prompt.id == prompt_id).first()
 
 
+def get_prompt_version(db: Session, prompt_id: int, user_id: Optional[int] = None):
+    """
+    Returns the few columns that determine a prompt's API representation, in one query:
+    id, user_id, is_public, created_at, updated_at, like_count, comment_count, author_username and,
+    when 'user_id' is given, whether that user liked it ('liked').
+    Used to answer permission checks and ETag revalidation without loading the prompt.
+    Returns None if the prompt does not exist.
+    """
+    like_count = select(func.count(models.PromptLike.id))\
+        .where(models.PromptLike.prompt_id == models.Prompt.id)\
+        .correlate(models.Prompt).scalar_subquery()
+    columns = [
+        models.Prompt.id,
+        models.Prompt.user_id,
+        models.Prompt.is_public,
+        models.Prompt.created_at,
+        models.Prompt.updated_at,
+        like_count.label("like_count"),
+        models.Prompt.comment_count,
+        models.User.username.label("author_username"),
+    ]
+    if user_id is not None:
+        columns.append(
+            select(models.PromptLike.id)
+            .where(models.PromptLike.prompt_id == models.Prompt.id, models.PromptLike.user_id == user_id)
+            .correlate(models.Prompt).exists().label("liked")
+        )
+    return db.query(*columns)\
+        .outerjoin(models.User, models.User.id == models.Prompt.user_id)\
+        .filter(models.Prompt.id == prompt_id).first()
+
+def prompt_exists(db: Session, prompt_id: int) -> bool:
+    """Cheap existence check (primary key lookup, no row load)."""
+    return db.query(models.Prompt.id).filter(models.Prompt.id == prompt_id).first() is not None
+
+
 def get_prompt_pure(db: Session, prompt_id: int ):
     " Get a prompt by prompt_id but only content of it for llm connection "
     return db.query(models.Prompt.content).filter(models.Prompt.id == prompt_id).first()
@@ -49,7 +93,7 @@ def get_public_prompts(db: Session, skip: int = 0, limit: int = 100) -> List[mod
 
 def get_recent_public_prompts(db: Session, skip: int = 0, limit: int = 10) -> List[models.Prompt]:
     """Retrieves the most recent public prompts with pagination."""
-    return db.query(models.Prompt)\
+    return db.query(models.Prompt).options(joinedload(models.Prompt.author))\
              .filter(models.Prompt.is_public == True)\
              .order_by(desc(models.Prompt.created_at))\
              .offset(skip).limit(limit).all()
@@ -81,6 +125,7 @@ def create_prompt_like(db: Session, prompt_id: int, user_id: int):
     db.add(db_like)
     db.commit()
     db.refresh(db_like)
+    _publish_like_count(db, prompt_id)
     return db_like
 
 
@@ -92,18 +137,42 @@ def delete_prompt_like(db: Session, prompt_id: int, user_id: int):
     if db_like:
         db.delete(db_like)
         db.commit()
+        _publish_like_count(db, prompt_id)
     return db_like
 
 
+def _publish_like_count(db: Session, prompt_id: int):
+    """Pushes the prompt's new like count to live subscribers (GET /prompts/{id}/events)."""
+    like_count = db.query(func.count(models.PromptLike.id)).filter(models.PromptLike.prompt_id == prompt_id).scalar()
+    publish_prompt_event(prompt_id, "like_count", {"like_count": like_count})
+
+
 def get_prompt_like(db: Session, prompt_id: int, user_id: int):
     """Checks if a user has liked a specific prompt."""
     return db.query(models.PromptLike).filter(
         and_(models.PromptLike.prompt_id == prompt_id, models.PromptLike.user_id == user_id)
     ).first()
 
+def attach_like_counts(db: Session, prompts: List[models.Prompt]) -> List[models.Prompt]:
+    """
+    Sets no_of_likes on a page of prompts with one GROUP BY, instead of each prompt loading
+    all of its PromptLike rows when it is serialized.
+    """
+    prompt_ids = {prompt.id for prompt in prompts}
+    counts = {}
+    if prompt_ids:
+        counts = dict(
+            db.query(models.PromptLike.prompt_id, func.count(models.PromptLike.id))
+            .filter(models.PromptLike.prompt_id.in_(prompt_ids))
+            .group_by(models.PromptLike.prompt_id)
+        )
+    for prompt in prompts:
+        prompt.no_of_likes = counts.get(prompt.id, 0)
+    return prompts
+
 def get_user_liked_prompts(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[models.Prompt]:
     """Retrieves all prompts liked by a specific user."""
-    return db.query(models.Prompt)\
+    return db.query(models.Prompt).options(joinedload(models.Prompt.author))\
              .join(models.PromptLike, models.Prompt.id == models.PromptLike.prompt_id)\
              .filter(models.PromptLike.user_id == user_id)\
              .offset(skip).limit(limit).all()
@@ -112,7 +181,7 @@ def get_user_liked_prompts(db: Session, user_id: int, skip: int = 0, limit: int
 def get_most_liked_public_prompts(db: Session, skip: int = 0, limit: int = 10) -> List[models.Prompt]:
     """Retrieves the most liked public prompts directly using the no_of_likes column."""
 
-    result = db.query(models.Prompt) \
+    result = db.query(models.Prompt).options(joinedload(models.Prompt.author)) \
         .filter(models.Prompt.is_public == True) \
         .order_by(desc(models.Prompt.no_of_likes)) \
         .offset(skip).limit(limit).all()
@@ -130,15 +199,29 @@ def update_prompt(db: Session, prompt_id: int, prompt_update: prompt_schemas.Pro
         update_data.pop('no_of_likes', None) # Ensure no_of_likes isn't updated via this method
         for key, value in update_data.items():
             setattr(db_prompt, key, value)
+        if "content" in update_data:
+            db_prompt.content_hash = content_hash(db_prompt.content)
         db.commit()
         db.refresh(db_prompt)
     return db_prompt
 
 def delete_prompt(db: Session, prompt_id: int):
-    """Deletes a prompt by its ID."""
+    """Deletes a prompt by its ID (soft delete; see soft_delete_prompt)."""
+    return soft_delete_prompt(db, prompt_id)
+
+def soft_delete_prompt(db: Session, prompt_id: int):
+    """
+    Marks a prompt deleted (deleted_at). It disappears from every query at once; its likes,
+    comments and labels are removed later by the purge job, off the request path.
+    Returns the prompt as it was, or None if it does not exist (or is already deleted).
+    """
     db_prompt = db.query(models.Prompt).filter(models.Prompt.id == prompt_id).first()
     if db_prompt:
-        db.delete(db_prompt)
+        # Keep updated_at as it is (no onupdate): deletion is not an edit
+        db.query(models.Prompt).filter(models.Prompt.id == prompt_id).update(
+            {models.Prompt.deleted_at: datetime.utcnow(), models.Prompt.updated_at: models.Prompt.updated_at},
+            synchronize_session=False,
+        )
         db.commit()
     return db_prompt
 
@@ -183,11 +266,15 @@ def update_user_profile(db: Session, user_id: int, user_update: user_schemas.Use
     if db_user:
         # model_dump(exclude_unset=True) ensures only provided fields are updated
         update_data = user_update.model_dump(exclude_unset=True)
+        old_username = db_user.username
         for key, value in update_data.items():
             setattr(db_user, key, value)
         db.add(db_user) # Add to session (might be redundant if already in session, but safe)
         db.commit()
         db.refresh(db_user)
+        if db_user.username != old_username:
+            # Tokens name the user by username: do not let them pass to a future owner of the old name
+            revocation_list.revoke_subject(db, old_username)
     return db_user # Returns the updated user object or None if not found
 
 
@@ -200,11 +287,23 @@ def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[models.User]
 
 # --- NEW: Function to delete a user ---
 def delete_user(db: Session, user_id: int):
-    """Deletes a user by ID."""
+    """
+    Deletes a user by ID: the account is disabled and marked at once (a few single-row writes),
+    and its prompts, likes and comments are removed afterwards in batches by
+    app.database.user_purge.purge_user (a 'purge_user' job enqueued by the routes).
+    """
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
     if db_user:
-        db.delete(db_user)
+        username = db_user.username
+        db.query(models.User).filter(models.User.id == user_id).update(
+            {models.User.is_active: False, models.User.deleted_at: datetime.utcnow()},
+            synchronize_session=False,
+        )
+        db.query(models.AdminUser).filter(models.AdminUser.user_id == user_id).delete(synchronize_session=False)
         db.commit()
+        admin_cache.invalidate()
+        revoke_user_refresh_tokens(db, user_id)
+        revocation_list.revoke_subject(db, username)
     return True # Returns True if successfull deletion
 def get_user(db: Session, user_id: int) -> Optional[models.User]:
     db_user = db.query(models.User).filter(models.User.id == user_id).first()
@@ -219,29 +318,179 @@ def update_user_password(db: Session, user_id: int, hashed_new_password: str):
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
+        # Sign out every session that logged in with the old password
+        revocation_list.revoke_subject(db, db_user.username)
+        revoke_user_refresh_tokens(db, user_id)
     return db_user
 
 
+def rehash_user_password(db: Session, user_id: int, hashed_password: str):
+    """
+    Stores a rehash of the user's unchanged password (new scheme or cost, after a login).
+    Unlike update_user_password this signs nobody out: the password itself is the same.
+    """
+    db.query(models.User).filter(models.User.id == user_id)\
+        .update({models.User.hashed_password: hashed_password}, synchronize_session=False)
+    db.commit()
+
+
+# --- Refresh tokens ---
+def create_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+    """
+    Stores a new refresh token for the user and returns the raw token (shown to the client once).
+    A new login starts a new family; rotations pass the family of the token they replace.
+    """
+    token = generate_refresh_token()
+    db.add(models.RefreshToken(
+        user_id=user_id,
+        family_id=family_id or uuid.uuid4().hex,
+        token_hash=hash_refresh_token(token),
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    db.commit()
+    return token
+
+
+def get_refresh_token(db: Session, token: str) -> Optional[models.RefreshToken]:
+    return db.query(models.RefreshToken).filter(models.RefreshToken.token_hash == hash_refresh_token(token)).first()
+
+
+def mark_refresh_token_used(db: Session, refresh_token_id: int) -> bool:
+    """
+    Atomically marks a token as used. Returns False if it was already used or revoked, which
+    also covers two requests racing with the same token: only one of them wins.
+    """
+    updated = db.query(models.RefreshToken).filter(
+        models.RefreshToken.id == refresh_token_id,
+        models.RefreshToken.used_at.is_(None),
+        models.RefreshToken.revoked_at.is_(None),
+    ).update({models.RefreshToken.used_at: datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return updated == 1
+
+
+def revoke_refresh_token_family(db: Session, family_id: str):
+    db.query(models.RefreshToken).filter(
+        models.RefreshToken.family_id == family_id,
+        models.RefreshToken.revoked_at.is_(None),
+    ).update({models.RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+
+
+def revoke_user_refresh_tokens(db: Session, user_id: int):
+    db.query(models.RefreshToken).filter(
+        models.RefreshToken.user_id == user_id,
+        models.RefreshToken.revoked_at.is_(None),
+    ).update({models.RefreshToken.revoked_at: datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+
+
+def delete_expired_refresh_tokens(db: Session, user_id: int):
+    """Housekeeping on refresh: drops the user's expired tokens (indexed by user_id)."""
+    db.query(models.RefreshToken).filter(
+        models.RefreshToken.user_id == user_id,
+        models.RefreshToken.expires_at < datetime.utcnow(),
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
 
 
 def create_comment(
     db: Session,
     comment: comment_schemas.CommentCreate,
     user_id: int,
-    prompt_id: int
+    prompt_id: int,
+    parent: Optional[models.PromptComment] = None
 ) -> models.PromptComment:
-    """Creates a new comment for a given prompt by a given user."""
+    """
+    Creates a new comment for a given prompt by a given user, as a reply to 'parent' if given
+    (the caller checks that the parent belongs to the same prompt).
+    The reply counts of all ancestors are bumped in the same transaction.
+    """
     db_comment = models.PromptComment(
         prompt_id=prompt_id,
         user_id=user_id,
-        content=comment.content
+        content=comment.content,
+        parent_id=parent.comment_id if parent else None,
+        depth=parent.depth + 1 if parent else 0,
     )
     db.add(db_comment)
+    db.flush()  # assigns comment_id, which is the last path segment
+    db_comment.path = (comment_path(parent) if parent else "") + comment_path_segment(db_comment.comment_id)
+    if parent:
+        db.query(models.PromptComment)\
+            .filter(models.PromptComment.comment_id.in_(path_comment_ids(comment_path(parent))))\
+            .update({models.PromptComment.reply_count: models.PromptComment.reply_count + 1},
+                    synchronize_session=False)
+    _add_to_comment_count(db, prompt_id, 1)
     db.commit()
     db.refresh(db_comment)
+
+    event = comment_schemas.CommentResponse.model_validate(db_comment).model_dump(mode="json")
+    event["author_username"] = db_comment.user.username if db_comment.user else None
+    publish_prompt_event(prompt_id, "comment", event)
     return db_comment
 
 
+def _add_to_comment_count(db: Session, prompt_id: int, delta: int):
+    # updated_at is assigned to itself so its onupdate does not mark the prompt as edited
+    db.query(models.Prompt).filter(models.Prompt.id == prompt_id).update(
+        {models.Prompt.comment_count: models.Prompt.comment_count + delta,
+         models.Prompt.updated_at: models.Prompt.updated_at},
+        synchronize_session=False,
+    )
+
+
+def recount_comment_counts(db: Session, prompt_ids: Optional[List[int]] = None):
+    """
+    Recomputes prompts.comment_count from prompt_comments (all prompts, or only 'prompt_ids').
+    For backfilling existing databases and after bulk deletes that bypass delete_comment.
+    """
+    actual = select(func.count(models.PromptComment.comment_id))\
+        .where(models.PromptComment.prompt_id == models.Prompt.id)\
+        .correlate(models.Prompt).scalar_subquery()
+    query = db.query(models.Prompt)
+    if prompt_ids is not None:
+        if not prompt_ids:
+            return
+        query = query.filter(models.Prompt.id.in_(prompt_ids))
+    query.update({models.Prompt.comment_count: actual, models.Prompt.updated_at: models.Prompt.updated_at},
+                 synchronize_session=False)
+    db.commit()
+
+
+def comment_path_segment(comment_id: int) -> str:
+    return f"{comment_id:010d}/"
+
+
+def comment_path(db_comment: models.PromptComment) -> str:
+    """
+    The comment's materialized path. Comments written before paths existed have none until
+    app.database.comment_paths backfills them; they count as thread roots meanwhile.
+    """
+    return db_comment.path or comment_path_segment(db_comment.comment_id)
+
+
+def path_comment_ids(path: str) -> List[int]:
+    """Comment ids along a materialized path, root first."""
+    return [int(segment) for segment in path.split("/") if segment]
+
+
+def _subtree_range(path: str) -> Tuple[str, str]:
+    # Every descendant's path starts with 'path'; '0' is the character right after '/',
+    # so [path, path-without-last-slash + '0') is exactly the subtree.
+    return path, path[:-1] + "0"
+
+
+def _subtree_filter(db_comment: models.PromptComment):
+    low, high = _subtree_range(comment_path(db_comment))
+    in_range = and_(models.PromptComment.path >= low, models.PromptComment.path < high)
+    if db_comment.path is None:
+        return or_(models.PromptComment.comment_id == db_comment.comment_id, in_range)
+    return in_range
+
+
 def get_comment(db: Session, comment_id: int) -> Optional[models.PromptComment]:
     """Retrieves a single comment by its ID."""
     return db.query(models.PromptComment).filter(models.PromptComment.comment_id == comment_id).first()
@@ -251,14 +500,70 @@ def get_comments_for_prompt(
     db: Session,
     prompt_id: int,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    top_level_only: bool = False
 ) -> List[models.PromptComment]:
-    """Retrieves all comments for a specific prompt, ordered by creation date."""
-    return db.query(models.PromptComment)\
-        .filter(models.PromptComment.prompt_id == prompt_id)\
+    """
+    Retrieves all comments for a specific prompt, ordered by creation date.
+    'top_level_only' skips replies (their reply_count tells whether a thread is worth loading).
+    """
+    query = db.query(models.PromptComment).filter(models.PromptComment.prompt_id == prompt_id)
+    if top_level_only:
+        query = query.filter(models.PromptComment.parent_id.is_(None))
+    return query\
         .order_by(desc(models.PromptComment.created_at))\
         .offset(skip).limit(limit).all()
 
+def get_latest_comments_for_prompts(
+    db: Session,
+    prompt_ids: List[int],
+    per_prompt: int = 2
+) -> Dict[int, List[models.PromptComment]]:
+    """
+    Returns the 'per_prompt' latest comments of each prompt in 'prompt_ids' (newest first),
+    with author_username set, using one ROW_NUMBER() OVER (PARTITION BY prompt_id) query.
+    Every requested prompt id is a key, with an empty list if it has no comments.
+    """
+    previews: Dict[int, List[models.PromptComment]] = {prompt_id: [] for prompt_id in prompt_ids}
+    if not prompt_ids:
+        return previews
+
+    ranked = select(
+        models.PromptComment.comment_id,
+        func.row_number().over(
+            partition_by=models.PromptComment.prompt_id,
+            order_by=(desc(models.PromptComment.created_at), desc(models.PromptComment.comment_id)),
+        ).label("position"),
+    ).where(models.PromptComment.prompt_id.in_(prompt_ids)).subquery()
+
+    rows = db.query(models.PromptComment, models.User.username)\
+        .join(ranked, ranked.c.comment_id == models.PromptComment.comment_id)\
+        .outerjoin(models.User, models.User.id == models.PromptComment.user_id)\
+        .filter(ranked.c.position <= per_prompt)\
+        .order_by(models.PromptComment.prompt_id, ranked.c.position)\
+        .all()
+    for comment, author_username in rows:
+        comment.author_username = author_username
+        previews[comment.prompt_id].append(comment)
+    return previews
+
+def get_comments_version(db: Session, prompt_id: int) -> Tuple[tuple, Optional[datetime]]:
+    """
+    Returns ((comment count, highest comment_id, sum of comment versions, latest author update),
+    latest change time) for a prompt. Any added, edited or deleted comment changes the first
+    tuple, and so does an edit of a comment author (the responses carry author_username).
+    """
+    count, max_id, versions, comments_changed, authors_changed = db.query(
+        func.count(models.PromptComment.comment_id),
+        func.max(models.PromptComment.comment_id),
+        func.sum(models.PromptComment.version),
+        func.max(func.coalesce(models.PromptComment.updated_at, models.PromptComment.created_at)),
+        func.max(models.User.updated_at),
+    ).outerjoin(models.User, models.User.id == models.PromptComment.user_id)\
+        .filter(models.PromptComment.prompt_id == prompt_id).one()
+    last_change = max((value for value in (comments_changed, authors_changed) if value is not None), default=None)
+    return (count, max_id, versions, authors_changed), last_change
+
 def update_comment(
     db: Session,
     comment_id: int,
@@ -269,6 +574,7 @@ def update_comment(
     if db_comment:
         # Assuming only content can be updated for comments based on CommentUpdate schema
         db_comment.content = comment_update.content
+        db_comment.version = (db_comment.version or 0) + 1
         db.add(db_comment)
         db.commit()
         db.refresh(db_comment)
@@ -277,15 +583,62 @@ def update_comment(
 
 
 def delete_comment(db: Session, comment_id: int):
-    """Deletes a comment by its ID."""
+    """Deletes a comment by its ID, together with all replies below it."""
     db_comment = db.query(models.PromptComment).filter(models.PromptComment.comment_id == comment_id).first()
     if db_comment:
-        db.delete(db_comment)
+        delete_comment_subtree(db, db_comment)
         db.commit()
         return True # Indicate success
     return False # Comment not found or not deleted
 
 
+def delete_comment_subtree(db: Session, db_comment: models.PromptComment) -> int:
+    """
+    Deletes a comment and all replies below it, keeping the ancestors' reply counts and the
+    prompt's comment count right. Does not commit. Returns how many comments were removed.
+    """
+    removed = 1 + db_comment.reply_count
+    path = comment_path(db_comment)
+    ancestor_ids = path_comment_ids(path)[:-1]
+    if ancestor_ids:
+        db.query(models.PromptComment)\
+            .filter(models.PromptComment.comment_id.in_(ancestor_ids))\
+            .update({models.PromptComment.reply_count: models.PromptComment.reply_count - removed},
+                    synchronize_session=False)
+    # The whole subtree in one range delete (parent_id is also ON DELETE CASCADE). A comment
+    # without a path is not inside its own range, so it is matched by id; deleting it here rather
+    # than with db.delete means a caller that expunges the session before committing cannot lose it
+    db.query(models.PromptComment).filter(
+        models.PromptComment.prompt_id == db_comment.prompt_id,
+        _subtree_filter(db_comment),
+    ).delete(synchronize_session=False)
+    _add_to_comment_count(db, db_comment.prompt_id, -removed)
+    return removed
+
+
+def get_comment_thread(
+    db: Session,
+    prompt_id: int,
+    root: Optional[models.PromptComment] = None,
+    max_depth: Optional[int] = None,
+    limit: int = 500
+) -> List[models.PromptComment]:
+    """
+    Returns the comments of a prompt in rendering order (each comment followed by its replies),
+    with their authors, using one range query on (prompt_id, path).
+    'root' restricts the result to that comment and its subtree; 'max_depth' limits how many
+    reply levels below the root (or below the top level) are returned.
+    """
+    query = db.query(models.PromptComment).options(joinedload(models.PromptComment.user))\
+        .filter(models.PromptComment.prompt_id == prompt_id)
+    base_depth = 0
+    if root is not None:
+        query = query.filter(_subtree_filter(root))
+        base_depth = root.depth
+    if max_depth is not None:
+        query = query.filter(models.PromptComment.depth <= base_depth + max_depth)
+    return query.order_by(models.PromptComment.path).limit(limit).all()
+
 
 def create_label(db: Session, label: label_schemas.LabelCreate) -> models.Label:
     """
@@ -415,7 +768,7 @@ def get_most_liked_prompts_by_label_name_with_like_status(
     if not db_label:
         return None  # Return None if label name is not found
 
-    base_query = db.query(models.Prompt).join(models.PromptLabel)\
+    base_query = db.query(models.Prompt).options(joinedload(models.Prompt.author)).join(models.PromptLabel)\
         .filter(models.Prompt.is_public == True, models.PromptLabel.label_id == db_label.id)\
         .order_by(desc(models.Prompt.no_of_likes))
 
@@ -446,7 +799,7 @@ def get_most_recent_prompts_by_label_name_with_like_status(
     if not db_label:
         return None  # Return None if label name is not found
 
-    base_query = db.query(models.Prompt).join(models.PromptLabel)\
+    base_query = db.query(models.Prompt).options(joinedload(models.Prompt.author)).join(models.PromptLabel)\
         .filter(models.Prompt.is_public == True, models.PromptLabel.label_id == db_label.id)\
         .order_by(desc(models.Prompt.created_at))
 
@@ -482,14 +835,7 @@ def get_labels_for_prompt(
     # 1. Is the prompt public?
     # 2. Is there a current user and are they the author of the prompt?
     # 3. Is there a current user and are they an admin?
-    if (current_user):
-     is_author = current_user and db_prompt.user_id == current_user.id
-     is_admin = current_user.id == 1 # Your admin check function
-    else:
-     is_author = False
-     is_admin = False
-
-    if db_prompt.is_public or is_author or is_admin:
+    if db_prompt.is_public or can_manage(current_user, db_prompt.user_id):
         # Extract the labels from the association objects
         labels = [pl.label for pl in db_prompt.labels]
         return labels
@@ -510,20 +856,17 @@ def get_prompts_count_by_label_name(db: Session, label_name: str) -> int:
         )
     ).count())
 
-def get_prompts_count_by_label_name_auth(db: Session, label_name: str, user_id: int) -> int:
+def get_prompts_count_by_label_name_auth(db: Session, label_name: str, current_user: user_schemas.UserInDB) -> int:
     """
     Returns the count of prompts associated with a given label name,
-    where the prompts are either public or owned by the specified user.
+    where the prompts are either public or owned by the current user (all of them for an admin).
     """
-    return db.query(models.Prompt).join(models.PromptLabel).join(models.Label).filter(
+    query = db.query(models.Prompt).join(models.PromptLabel).join(models.Label).filter(
         models.Label.name == label_name
-    ).filter(
-        or_(
-            models.Prompt.is_public == True,
-            models.Prompt.user_id == user_id,
-            user_id ==1
-        )
-    ).count()
+    )
+    if not is_admin(current_user):
+        query = query.filter(or_(models.Prompt.is_public == True, models.Prompt.user_id == current_user.id))
+    return query.count()
 
 
 def get_likes_count_for_user(db: Session, user_id: int) -> int:
@@ -540,4 +883,153 @@ def get_likes_count_for_user(db: Session, user_id: int) -> int:
     ).count())
 
 def get_user_count(db: Session) -> int:
-    return db.query(models.User).count()
\ No newline at end of file
+    return db.query(models.User).count()
+
+
+# --- Audit log queries (admin) ---
+AUDIT_EXPORT_COLUMNS = ["id", "timestamp", "endpoint", "ip_address", "user_id", "username"]
+
+def _filtered_audit_logs(
+    query,
+    user_id: Optional[int] = None,
+    endpoint: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Applies the optional audit filters. Each equality filter has a (column, timestamp) index."""
+    if user_id is not None:
+        query = query.filter(models.AuditLog.user_id == user_id)
+    if endpoint is not None:
+        query = query.filter(models.AuditLog.endpoint == endpoint)
+    if ip_address is not None:
+        query = query.filter(models.AuditLog.ip_address == ip_address)
+    if start is not None:
+        query = query.filter(models.AuditLog.timestamp >= start)
+    if end is not None:
+        query = query.filter(models.AuditLog.timestamp < end)
+    return query
+
+def get_audit_logs(
+    db: Session,
+    user_id: Optional[int] = None,
+    endpoint: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    before: Optional[Tuple[datetime, int]] = None,
+    limit: int = 100,
+) -> List[models.AuditLog]:
+    """
+    Retrieves audit logs newest first using keyset pagination.
+    'before' is the (timestamp, id) of the last row of the previous page; rows strictly older
+    than it are returned, so deep pages cost the same as the first one (no OFFSET scan).
+    """
+    query = _filtered_audit_logs(db.query(models.AuditLog), user_id, endpoint, ip_address, start, end)
+    if before is not None:
+        before_timestamp, before_id = before
+        query = query.filter(or_(
+            models.AuditLog.timestamp < before_timestamp,
+            and_(models.AuditLog.timestamp == before_timestamp, models.AuditLog.id < before_id),
+        ))
+    return query.order_by(desc(models.AuditLog.timestamp), desc(models.AuditLog.id)).limit(limit).all()
+
+def iter_audit_logs(
+    db: Session,
+    user_id: Optional[int] = None,
+    endpoint: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = 1000,
+) -> Iterator[dict]:
+    """
+    Streams matching audit logs oldest first as plain dicts.
+    Uses yield_per, which fetches through a server-side cursor in 'batch_size' row batches
+    instead of loading the whole result set.
+    """
+    columns = [getattr(models.AuditLog, name) for name in AUDIT_EXPORT_COLUMNS]
+    query = _filtered_audit_logs(db.query(*columns), user_id, endpoint, ip_address, start, end)
+    query = query.order_by(models.AuditLog.timestamp, models.AuditLog.id).yield_per(batch_size)
+    for row in query:
+        yield row._asdict()
+
+
+# --- Bulk exports (admin) ---
+PROMPT_EXPORT_COLUMNS = [
+    "id", "user_id", "author_username", "content", "llm_link", "is_public",
+    "created_at", "updated_at", "like_count", "comment_count", "labels",
+]
+LIKE_EXPORT_COLUMNS = ["id", "prompt_id", "user_id"]
+COMMENT_EXPORT_COLUMNS = ["comment_id", "prompt_id", "parent_id", "user_id", "author_username", "content", "created_at"]
+
+def iter_prompts_export(
+    db: Session,
+    label_db: Session,
+    public_only: bool = False,
+    batch_size: int = 1000,
+) -> Iterator[dict]:
+    """
+    Streams every prompt with its author, like count, comment count and label names.
+    Prompts come from a server-side cursor on 'db' in 'batch_size' partitions; labels are
+    fetched once per partition on 'label_db', because the streaming connection cannot run
+    another query while its cursor is open.
+    """
+    like_count = select(func.count(models.PromptLike.id))\
+        .where(models.PromptLike.prompt_id == models.Prompt.id)\
+        .correlate(models.Prompt).scalar_subquery()
+
+    stmt = select(
+        models.Prompt.id,
+        models.Prompt.user_id,
+        models.User.username.label("author_username"),
+        models.Prompt.content,
+        models.Prompt.llm_link,
+        models.Prompt.is_public,
+        models.Prompt.created_at,
+        models.Prompt.updated_at,
+        like_count.label("like_count"),
+        models.Prompt.comment_count,
+    ).outerjoin(models.User, models.User.id == models.Prompt.user_id).order_by(models.Prompt.id)
+    if public_only:
+        stmt = stmt.where(models.Prompt.is_public == True)
+
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        prompt_ids = [row.id for row in partition]
+        labels_by_prompt = {}
+        for prompt_id, label_name in label_db.execute(
+            select(models.PromptLabel.prompt_id, models.Label.name)
+            .join(models.Label, models.Label.id == models.PromptLabel.label_id)
+            .where(models.PromptLabel.prompt_id.in_(prompt_ids))
+        ):
+            labels_by_prompt.setdefault(prompt_id, []).append(label_name)
+
+        for row in partition:
+            item = row._asdict()
+            item["labels"] = labels_by_prompt.get(row.id, [])
+            yield item
+
+def iter_likes_export(db: Session, batch_size: int = 5000) -> Iterator[dict]:
+    """Streams every like of a live prompt through a server-side cursor."""
+    # The join lets the soft-delete criteria on Prompt drop likes of deleted prompts, which the
+    # prompt export leaves out too
+    stmt = select(models.PromptLike.id, models.PromptLike.prompt_id, models.PromptLike.user_id)\
+        .join(models.Prompt, models.Prompt.id == models.PromptLike.prompt_id)\
+        .order_by(models.PromptLike.id)
+    for row in db.execute(stmt.execution_options(yield_per=batch_size)):
+        yield row._asdict()
+
+def iter_comments_export(db: Session, batch_size: int = 1000) -> Iterator[dict]:
+    """Streams every comment with its author's username through a server-side cursor."""
+    stmt = select(
+        models.PromptComment.comment_id,
+        models.PromptComment.prompt_id,
+        models.PromptComment.parent_id,
+        models.PromptComment.user_id,
+        models.User.username.label("author_username"),
+        models.PromptComment.content,
+        models.PromptComment.created_at,
+    ).outerjoin(models.User, models.User.id == models.PromptComment.user_id).order_by(models.PromptComment.comment_id)
+    for row in db.execute(stmt.execution_options(yield_per=batch_size)):
+        yield row._asdict()
@@ -1,6 +1,11 @@
 # my_fastapi_angular_backend/app/database/database.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import random
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, Select
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from starlette.requests import Request
 from app.core.config import settings # Import your settings for DATABASE_URL
 
 # SQLAlchemy database connection URL from your settings
@@ -12,18 +17,95 @@ engine = create_engine(
     pool_pre_ping=True # Helps prevent stale connections
 )
 
+# Read replicas (settings.DATABASE_REPLICA_URLS); 'engine' above is the primary.
+replica_engines = [create_engine(url, pool_pre_ping=True) for url in settings.DATABASE_REPLICA_URLS]
+
+
+class StickyWriters:
+    """
+    Subjects (usernames) that wrote recently. Their reads go to the primary for 'seconds', so a
+    user sees their own writes even before the replicas catch up. Kept per process.
+    """
+
+    MAX_KEYS = 100_000
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._until: Dict[str, float] = {}
+
+    def mark(self, subject: Optional[str]):
+        if subject is None or self.seconds <= 0:
+            return
+        now = time.monotonic()
+        if len(self._until) >= self.MAX_KEYS:
+            self._until = {key: until for key, until in self._until.items() if until > now}
+        self._until[subject] = now + self.seconds
+
+    def is_sticky(self, subject: Optional[str]) -> bool:
+        return subject is not None and self._until.get(subject, 0.0) > time.monotonic()
+
+
+sticky_writers = StickyWriters(settings.REPLICA_STICKY_SECONDS)
+
+
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs to a replica and everything else to the primary.
+
+    A session reads from one replica, picked on its first read, so its queries see one point in
+    time. Sessions created with info={"use_primary": True} (PrimarySessionLocal, requests that
+    are not GET/HEAD/OPTIONS, see get_db) never use a replica. A single statement can ask for the
+    primary with .execution_options(use_primary=True); SELECT ... FOR UPDATE always does.
+
+    Once a session writes (flush, INSERT/UPDATE/DELETE, anything that is not a SELECT) it stays on
+    the primary, and its subject (session.info["subject"], set by get_current_user) is marked
+    sticky for REPLICA_STICKY_SECONDS. Without replicas every statement goes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not replica_engines:
+            return engine
+        if self._flushing or (clause is not None and not isinstance(clause, Select)):
+            # A write: this session stays on the primary, and so do its user's next requests
+            self.info["use_primary"] = True
+            sticky_writers.mark(self.info.get("subject"))
+            return engine
+        if self.info.get("use_primary") or clause is None or clause._for_update_arg is not None \
+                or clause._execution_options.get("use_primary"):
+            return engine
+        if sticky_writers.is_sticky(self.info.get("subject")):
+            return engine
+        replica = self.info.get("replica")
+        if replica is None:
+            replica = self.info["replica"] = random.choice(replica_engines)
+        return replica
+
+
 # Configure a SessionLocal class for database interactions.
 # 'autocommit=False' means you have to explicitly call db.commit().
 # 'autoflush=False' means objects are not flushed until commit or query.
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+# Sessions that must see the latest committed data: background jobs, CLIs that write,
+# token revocations, audit entries.
+PrimarySessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine,
+                                   info={"use_primary": True})
 
 # Base class for your SQLAlchemy ORM models.
 Base = declarative_base()
 
 # Dependency function to get a database session.
 # This pattern is used by FastAPI's Depends() for dependency injection.
-def get_db():
+# One session per request: FastAPI caches the dependency, so the route, get_current_user
+# and the admin checks all receive this same session (audit logging uses its own, see
+# app/core/logging_handler.py). A Session only checks a
+# connection out of the pool on its first query (and hands it back on commit/rollback), so a
+# request rejected before any query (bad token, rate limit, cached response) never touches the pool.
+# Requests that may write (anything but GET/HEAD/OPTIONS) use the primary from their first query,
+# so their reads and checks are never answered by a lagging replica.
+def get_db(request: Request):
     db = SessionLocal()
+    if request.method not in ("GET", "HEAD", "OPTIONS"):
+        db.info["use_primary"] = True
     try:
         yield db # Provides the database session to the endpoint/dependency
     finally:
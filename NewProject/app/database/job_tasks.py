@@ -0,0 +1,79 @@
+# my_fastapi_angular_backend/app/database/job_tasks.py
+"""
+Built-in background job handlers (see app/core/jobs.py).
+
+Each handler receives its own session plus the job payload as keyword arguments, and returns a
+JSON-serializable summary stored on the job. Raising makes the job retry with backoff, so
+handlers must be safe to run again after a partial run (every one below is).
+"""
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import jobs
+from app.core.config import settings
+from app.database import crud
+from app.database.comment_paths import backfill_comment_paths
+from app.database.prompt_dedup import backfill_content_hashes
+from app.database.prompt_purge import purge_deleted_prompts
+from app.core.revocation import purge_expired_revocations
+from app.database.user_purge import purge_user
+
+
+@jobs.register("purge_user")
+def purge_user_job(db: Session, user_id: int) -> dict:
+    """Removes a deleted account's data (crud.delete_user enqueues it)."""
+    return purge_user(db, user_id)
+
+
+@jobs.register("purge_deleted_prompts")
+def purge_deleted_prompts_job(db: Session, older_than_days: Optional[int] = None) -> dict:
+    days = settings.PROMPT_PURGE_AFTER_DAYS if older_than_days is None else older_than_days
+    return purge_deleted_prompts(db, older_than_days=days)
+
+
+@jobs.register("recount_comment_counts")
+def recount_comment_counts_job(db: Session, prompt_ids: Optional[List[int]] = None) -> dict:
+    """Reconciles prompts.comment_count with the comments table."""
+    crud.recount_comment_counts(db, prompt_ids)
+    return {"prompts": "all" if prompt_ids is None else len(prompt_ids)}
+
+
+@jobs.register("audit_maintenance")
+def audit_maintenance_job(db: Session, retention_days: Optional[int] = None) -> dict:
+    """Creates upcoming audit_logs partitions and archives/drops rows past retention."""
+    from app.database.audit_maintenance import ensure_audit_partitions, purge_audit_logs
+    from app.database.database import engine
+
+    created = ensure_audit_partitions(engine, months_ahead=settings.AUDIT_PARTITION_MONTHS_AHEAD)
+    summary = purge_audit_logs(
+        engine,
+        retention_days=settings.AUDIT_RETENTION_DAYS if retention_days is None else retention_days,
+        archive_dir=settings.AUDIT_ARCHIVE_DIR,
+    )
+    summary["partitions_created"] = created
+    return summary
+
+
+@jobs.register("purge_finished_jobs")
+def purge_finished_jobs_job(db: Session, older_than_days: Optional[int] = None) -> dict:
+    days = settings.JOB_RETENTION_DAYS if older_than_days is None else older_than_days
+    return {"deleted": jobs.purge_finished_jobs(db, days)}
+
+
+@jobs.register("purge_expired_revocations")
+def purge_expired_revocations_job(db: Session) -> dict:
+    """Deletes revoked_tokens rows whose tokens have all expired (also done hourly by each worker)."""
+    return {"deleted": purge_expired_revocations(db)}
+
+
+@jobs.register("backfill_content_hashes")
+def backfill_content_hashes_job(db: Session, batch_size: int = 1000) -> dict:
+    """Hashes prompts created before prompts.content_hash existed."""
+    return backfill_content_hashes(db, batch_size)
+
+
+@jobs.register("backfill_comment_paths")
+def backfill_comment_paths_job(db: Session, batch_size: int = 1000) -> dict:
+    """Sets the thread paths of comments written before prompt_comments.path existed."""
+    return backfill_comment_paths(db, batch_size)
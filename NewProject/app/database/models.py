@@ -1,9 +1,11 @@
 # my_fastapi_angular_backend_v2/app/database/models.py
+from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, select
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, UniqueConstraint, select, Index, \
+    event, DDL, BigInteger, exists
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql import func  # For database functions like 'now()'
-from sqlalchemy.orm import relationship  # <-- This import is crucial for relationships
+from sqlalchemy.orm import relationship, backref, Session, with_loader_criteria  # <-- This import is crucial for relationships
 from sqlalchemy.types import Integer as SQLInteger
 
 from app.database.database import Base  # Import the declarative base
@@ -24,6 +26,8 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())  # Automatically updated on change
     totp_secret = Column(String(32), nullable=True)
     totp_enabled = Column(Boolean, default=False)
+    # Set when the account is deleted; its data is then removed by app/database/user_purge.py
+    deleted_at = Column(DateTime, nullable=True, index=True)
 
 
     # --- THESE ARE THE CRUCIAL MISSING LINES ---
@@ -47,6 +51,12 @@ class User(Base):
         cascade="all, delete-orphan",
         uselist=False
     )
+    refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan")
+
+    @property
+    def is_admin(self) -> bool:
+        """Superadmin (id 1) or listed in 'admins'. Loads admin_entry unless it was eager loaded."""
+        return self.id == 1 or self.admin_entry is not None
 
 class Prompt(Base):
     """SQLAlchemy ORM model for the 'prompts' table."""
@@ -65,6 +75,25 @@ class Prompt(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Maintained by crud.create_comment / delete_comment so listings need no COUNT per prompt
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Soft delete: set by crud.soft_delete_prompt, rows are hard-deleted later in batches by
+    # app/database/prompt_purge.py. Deleted prompts are left out of every ORM query (see below).
+    deleted_at = Column(DateTime, nullable=True)
+
+    # SHA-256 of the normalized content (app/database/prompt_dedup.py), set by crud.create_prompt /
+    # update_prompt, so duplicate checks are an index lookup instead of a scan of 'content'
+    content_hash = Column(String(64), nullable=True)
+
+    # Feed/listing indexes lead with deleted_at: live rows (deleted_at IS NULL) form one contiguous
+    # range, so feeds never scan deleted ones, and the purge job reads the deleted range by age.
+    __table_args__ = (
+        Index("ix_prompts_live_public_created", "deleted_at", "is_public", "created_at"),
+        Index("ix_prompts_live_user", "user_id", "deleted_at"),
+        Index("ix_prompts_live_content_hash", "content_hash", "deleted_at"),
+    )
+
     author = relationship("User", back_populates="prompts")
     liked_by_users = relationship("PromptLike", back_populates="prompt", cascade="all, delete-orphan")
     # --- THIS LINE REMAINS EXACTLY AS YOU PROVIDED IT ---
@@ -75,10 +104,15 @@ class Prompt(Base):
     @hybrid_property
     def no_of_likes(self) -> int:
         """
-        Getter for no_of_likes. When accessing prompt_instance.no_of_likes,
-        this returns the count of related PromptLike objects in Python.
+        Getter for no_of_likes. Listings set it for a whole page with one GROUP BY
+        (crud.attach_like_counts); otherwise this counts the related PromptLike objects in Python.
         """
-        return len(self.liked_by_users)
+        like_count = self.__dict__.get("_like_count")
+        return like_count if like_count is not None else len(self.liked_by_users)
+
+    @no_of_likes.setter
+    def no_of_likes(self, value: int):
+        self._like_count = value
 
     @no_of_likes.expression
     def no_of_likes(cls):
@@ -129,6 +163,24 @@ class PromptComment(Base):
     prompt = relationship("Prompt", back_populates="comments")
     user = relationship("User", back_populates="comments")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped on every edit; timestamps only have second resolution, so the comment list ETag uses this
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # --- Threads (materialized path) ---
+    # 'path' holds the zero-padded ids from the thread root down to this comment, each followed by
+    # '/', e.g. "0000000012/0000000045/". Sorting by path gives rendering order (depth first,
+    # oldest sibling first) and a whole subtree is one range on (prompt_id, path).
+    parent_id = Column(Integer, ForeignKey("prompt_comments.comment_id", ondelete="CASCADE"), nullable=True, index=True)
+    path = Column(String(255), nullable=True)  # set right after insert, once comment_id is known
+    depth = Column(Integer, nullable=False, default=0, server_default="0")
+    # Number of replies below this comment (whole subtree), kept up to date by crud on write
+    reply_count = Column(Integer, nullable=False, default=0, server_default="0")
+    parent = relationship("PromptComment", remote_side=[comment_id], backref=backref("replies", passive_deletes=True))
+
+    __table_args__ = (
+        Index("ix_prompt_comments_prompt_id_path", "prompt_id", "path"),
+    )
 
 class Label(Base):
     __tablename__ = "labels"
@@ -167,15 +219,35 @@ class AdminUser(Base):
 class AuditLog(Base):
     __tablename__ = "audit_logs" # Or "audit_log" if you prefer singular
 
+    # On MySQL the table is range-partitioned by month on 'timestamp' (see the DDL below and
+    # app/database/audit_maintenance.py). MySQL requires the partitioning column to be part of
+    # every unique key and does not allow foreign keys on partitioned tables, so the primary key
+    # becomes (id, timestamp) there and user_id is a plain indexed column instead of a FK.
     id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=func.now(), nullable=False)
+    # Naive UTC, set on the Python side so the stored value round-trips exactly on every dialect
+    # (keyset pagination compares against timestamps read back from this column).
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
     endpoint = Column(String(255), nullable=False)
     ip_address = Column(String(45), nullable=False) # IPv6 can be up to 45 chars
-    user_id = Column(Integer, ForeignKey("users.id",ondelete='SET NULL'), nullable=True) # Nullable for unauthenticated requests
+    user_id = Column(Integer, nullable=True) # Nullable for unauthenticated requests
     username = Column(String(255), nullable=True) # Store username directly for easier querying
 
-    # Optional: Relationship back to User if you want to query via user object
-    user = relationship("User", backref="audit_logs")
+    # Read-only relationship back to User. It is viewonly so deleting a user never loads
+    # (or rewrites) that user's audit rows; the audit trail keeps the id and username as they were.
+    user = relationship(
+        "User",
+        primaryjoin="foreign(AuditLog.user_id) == User.id",
+        backref=backref("audit_logs", viewonly=True),
+        viewonly=True,
+    )
+
+    # Indexes backing the admin audit queries (time range, per user, per endpoint, per IP).
+    __table_args__ = (
+        Index("ix_audit_logs_timestamp", "timestamp"),
+        Index("ix_audit_logs_user_id_timestamp", "user_id", "timestamp"),
+        Index("ix_audit_logs_endpoint_timestamp", "endpoint", "timestamp"),
+        Index("ix_audit_logs_ip_address_timestamp", "ip_address", "timestamp"),
+    )
 
     # Optional: You might want more details, e.g., method (GET/POST), status code, response time
     # method = Column(String(10), nullable=True)
@@ -184,3 +256,108 @@ class AuditLog(Base):
 
     def __repr__(self):
         return f"<AuditLog(id={self.id}, endpoint='{self.endpoint}', user_id={self.user_id}, ip='{self.ip_address}')>"
+
+
+# Turn a freshly created audit_logs table into a monthly RANGE-partitioned one on MySQL.
+# It starts with a single catch-all 'pmax' partition; audit_maintenance.ensure_audit_partitions()
+# splits monthly partitions off it ahead of time. Other dialects (e.g. SQLite in development) keep
+# a plain table and rely on batched deletes for retention.
+event.listen(
+    AuditLog.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE audit_logs DROP PRIMARY KEY, ADD PRIMARY KEY (id, timestamp) "
+        "PARTITION BY RANGE (TO_DAYS(timestamp)) (PARTITION pmax VALUES LESS THAN MAXVALUE)"
+    ).execute_if(dialect="mysql"),
+)
+
+
+class RevokedToken(Base):
+    """
+    Revoked access tokens (see app/core/revocation.py). A row revokes either one token ('jti')
+    or every token of 'subject' issued before 'issued_before' (epoch milliseconds).
+    Rows can be deleted once 'expires_at' has passed.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(64), nullable=True, unique=True)
+    subject = Column(String(255), nullable=True, index=True)
+    issued_before = Column(BigInteger, nullable=True)
+    revoked_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class RefreshToken(Base):
+    """
+    Refresh tokens (only their SHA-256 is stored). Each login starts a 'family'; every refresh
+    marks the presented token used and issues the next one in the same family. Presenting a token
+    that was already used means it was copied, so the whole family is revoked.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    used_at = Column(DateTime, nullable=True)  # set when rotated
+    revoked_at = Column(DateTime, nullable=True)
+
+    user = relationship("User", back_populates="refresh_tokens")
+
+
+
+class Job(Base):
+    """
+    Background job queue (app/core/jobs.py). Workers claim 'queued' rows whose run_after has
+    passed; failures are retried with exponential backoff until max_attempts, then 'failed'.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False, default="{}")  # JSON keyword arguments for the handler
+    status = Column(String(16), nullable=False, default="queued")  # queued, running, succeeded, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = Column(String(64), nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)  # JSON returned by the handler
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_deleted_prompts(execute_state):
+    """
+    Adds "prompts.deleted_at IS NULL" to every ORM SELECT involving Prompt (in joins and aliases
+    too), and "its prompt is not soft-deleted" (an EXISTS on prompts) to every ORM SELECT involving
+    PromptComment, so soft-deleted prompts and their comments disappear from feeds, counts, comment
+    reads and exports without each query repeating the filter.
+    Opt out with .execution_options(include_deleted=True).
+
+    Not covered: lazy relationship loads and deferred column loads of objects already loaded
+    (they belong to a row that passed the filter), Core statements on Table objects, and
+    UPDATE/DELETE statements.
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get("include_deleted", False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(Prompt, lambda cls: cls.deleted_at.is_(None), include_aliases=True),
+            with_loader_criteria(
+                PromptComment,
+                lambda cls: exists().where(Prompt.id == cls.prompt_id, Prompt.deleted_at.is_(None)),
+                include_aliases=True,
+            ),
+        )
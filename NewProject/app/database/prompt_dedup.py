@@ -0,0 +1,144 @@
+# my_fastapi_angular_backend/app/database/prompt_dedup.py
+"""
+Detects duplicate prompts by a hash of their normalized content.
+
+prompts.content_hash is the SHA-256 of the content after Unicode NFKC normalization, case
+folding and collapsing every run of whitespace into one space, so reposts that differ only in
+case, spacing or line breaks hash the same. crud.create_prompt / update_prompt (and the bulk
+import) set it, and ix_prompts_live_content_hash turns "does this text exist already?" into one
+index lookup instead of a scan of 'content'.
+
+Prompts created before the column existed have no hash; fill it in batches with
+    python -m app.database.prompt_dedup --backfill
+or the 'backfill_content_hashes' job. Without --backfill the command lists duplicate groups.
+"""
+import argparse
+import hashlib
+import json
+import re
+import unicodedata
+from typing import List, Optional
+
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.orm import Session, joinedload
+
+from app.database import models
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_content(content: str) -> str:
+    """The form of 'content' that is hashed: NFKC, case-folded, whitespace collapsed and trimmed."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", content).casefold()).strip()
+
+
+def content_hash(content: str) -> str:
+    """Hex SHA-256 of the normalized content (64 characters)."""
+    return hashlib.sha256(normalize_content(content).encode("utf-8")).hexdigest()
+
+
+def find_duplicates(
+        db: Session,
+        content: str,
+        viewer_id: Optional[int] = None,
+        exclude_id: Optional[int] = None,
+        limit: int = 10,
+) -> List[models.Prompt]:
+    """
+    Live prompts with the same normalized content that 'viewer_id' may see (public ones and their
+    own), oldest first. 'exclude_id' leaves out the prompt being edited.
+    """
+    visible = models.Prompt.is_public == True
+    if viewer_id is not None:
+        visible = or_(visible, models.Prompt.user_id == viewer_id)
+    query = db.query(models.Prompt).options(joinedload(models.Prompt.author))\
+        .filter(models.Prompt.content_hash == content_hash(content), visible)
+    if exclude_id is not None:
+        query = query.filter(models.Prompt.id != exclude_id)
+    return query.order_by(models.Prompt.id).limit(limit).all()
+
+
+def find_own_duplicate(db: Session, content: str, user_id: int, exclude_id: Optional[int] = None) -> Optional[int]:
+    """Id of a live prompt of 'user_id' with the same normalized content, if any."""
+    stmt = select(models.Prompt.id).where(
+        models.Prompt.content_hash == content_hash(content), models.Prompt.user_id == user_id)
+    if exclude_id is not None:
+        stmt = stmt.where(models.Prompt.id != exclude_id)
+    return db.execute(stmt.limit(1)).scalar()
+
+
+def duplicate_groups(db: Session, skip: int = 0, limit: int = 50) -> List[dict]:
+    """
+    Hashes shared by more than one live prompt, largest groups first:
+    [{"content_hash": ..., "count": 3, "prompt_ids": [...]}]. Two queries per page.
+    """
+    count = func.count(models.Prompt.id)
+    groups = db.execute(
+        select(models.Prompt.content_hash, count.label("count"))
+        .where(models.Prompt.content_hash.is_not(None))
+        .group_by(models.Prompt.content_hash)
+        .having(count > 1)
+        .order_by(count.desc(), models.Prompt.content_hash)
+        .offset(skip).limit(limit)
+    ).all()
+    if not groups:
+        return []
+
+    ids_by_hash = {row.content_hash: [] for row in groups}
+    for prompt_id, hash_ in db.execute(
+        select(models.Prompt.id, models.Prompt.content_hash)
+        .where(models.Prompt.content_hash.in_(ids_by_hash))
+        .order_by(models.Prompt.id)
+    ):
+        ids_by_hash[hash_].append(prompt_id)
+    return [{"content_hash": row.content_hash, "count": row.count, "prompt_ids": ids_by_hash[row.content_hash]}
+            for row in groups]
+
+
+def backfill_content_hashes(db: Session, batch_size: int = 1000) -> dict:
+    """Hashes prompts (live and soft-deleted) that have no content_hash yet, one commit per batch."""
+    summary = {"prompts": 0, "batches": 0}
+    while True:
+        rows = db.execute(
+            select(models.Prompt.id, models.Prompt.content)
+            .where(models.Prompt.content_hash.is_(None))
+            .order_by(models.Prompt.id).limit(batch_size)
+            .execution_options(include_deleted=True)
+        ).all()
+        if not rows:
+            return summary
+        # One executemany UPDATE per batch. updated_at is set to itself so its onupdate does not
+        # fire: hashing is not an edit
+        prompts = models.Prompt.__table__
+        db.execute(
+            update(prompts).where(prompts.c.id == bindparam("prompt_id"))
+            .values(content_hash=bindparam("hash"), updated_at=prompts.c.updated_at),
+            [{"prompt_id": prompt_id, "hash": content_hash(content)} for prompt_id, content in rows],
+        )
+        db.commit()
+        summary["prompts"] += len(rows)
+        summary["batches"] += 1
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.database.database import PrimarySessionLocal
+
+    parser = argparse.ArgumentParser(description="Backfill prompt content hashes or list duplicate prompts.")
+    parser.add_argument("--backfill", action="store_true", help="Hash prompts that have no content_hash yet.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=50, help="Duplicate groups to list.")
+    args = parser.parse_args(argv)
+
+    db = PrimarySessionLocal()
+    try:
+        if args.backfill:
+            print(json.dumps(backfill_content_hashes(db, args.batch_size)))
+        else:
+            for group in duplicate_groups(db, limit=args.limit):
+                print(json.dumps(group))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
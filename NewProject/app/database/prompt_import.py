@@ -0,0 +1,298 @@
+# my_fastapi_angular_backend/app/database/prompt_import.py
+"""
+Bulk prompt import from JSONL or CSV.
+
+Each input row looks like PromptCreate plus an optional list of label names:
+    {"content": "...", "is_public": true, "labels": ["writing", "email"]}
+CSV files use the columns content,is_public,labels with labels written as "writing|email".
+
+Rows are read lazily and processed in batches of 'batch_size'. Every batch is validated row by
+row, missing labels are created with one multi-row INSERT, the prompts are written with one
+multi-row INSERT and the PromptLabel associations with another, then the batch is committed.
+A row that fails validation (or the database), or a line that is not valid UTF-8, is reported
+with its line number and skipped; it never aborts the rest of the import.
+
+Command line:
+    python -m app.database.prompt_import prompts.jsonl --user-id 1 --batch-size 500
+"""
+import argparse
+import codecs
+import csv
+import json
+from itertools import islice
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.database import models
+from app.database.prompt_dedup import content_hash
+from app.schemas.prompt import PromptImportRow, PromptImportError, PromptImportReport
+
+IMPORT_FORMATS = ("jsonl", "csv")
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+# (line number, parsed row or the parse error message)
+RawRow = Tuple[int, Any]
+
+
+def parse_jsonl(lines: Iterable[str]) -> Iterator[RawRow]:
+    """Yields (line, dict) for every non-empty line; unparsable lines yield (line, error message)."""
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, f"invalid JSON: {e.msg}"
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[RawRow]:
+    """Yields (line, dict) for every CSV record; the first line must be the header."""
+    reader = csv.DictReader(lines)
+    for record in reader:
+        # Empty cells mean "use the schema default" (e.g. is_public)
+        yield reader.line_num, {key: value for key, value in record.items() if key and value not in (None, "")}
+
+
+class _Utf8Lines:
+    """
+    Decodes a binary stream line by line. A line that is not valid UTF-8 is replaced by an empty
+    line (which both parsers skip) and its number is queued in 'bad_lines'. A newline byte never
+    occurs inside a multi-byte UTF-8 sequence, so splitting before decoding is safe.
+    """
+
+    def __init__(self, stream: IO[bytes]):
+        self.stream = stream
+        self.bad_lines: List[int] = []
+
+    def __iter__(self) -> Iterator[str]:
+        decode = codecs.getdecoder("utf-8")
+        for line_no, line in enumerate(self.stream, start=1):
+            try:
+                yield decode(line)[0]
+            except UnicodeDecodeError:
+                self.bad_lines.append(line_no)
+                yield ""
+
+
+def parse_import_file(stream: IO[bytes], import_format: str) -> Iterator[RawRow]:
+    """Parses a binary stream; lines that are not valid UTF-8 yield (line, error message)."""
+    lines = _Utf8Lines(stream)
+    rows = parse_csv(lines) if import_format == "csv" else parse_jsonl(lines)
+    for row in rows:
+        while lines.bad_lines:
+            yield lines.bad_lines.pop(0), "not valid UTF-8"
+        yield row
+    for line_no in lines.bad_lines:
+        yield line_no, "not valid UTF-8"
+
+
+def _batched(rows: Iterable[RawRow], size: int) -> Iterator[List[RawRow]]:
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _error_text(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}" for item in error.errors()
+    )
+
+
+class _ReportBuilder:
+    def __init__(self, max_errors: int):
+        self.report = PromptImportReport()
+        self.max_errors = max_errors
+
+    def fail(self, line: int, error: str):
+        self.report.failed += 1
+        if len(self.report.errors) < self.max_errors:
+            self.report.errors.append(PromptImportError(line=line, error=error))
+        else:
+            self.report.errors_truncated = True
+
+
+def _resolve_labels(db: Session, names: Iterable[str], label_ids: Dict[str, int]) -> int:
+    """
+    Fills 'label_ids' (name -> id, a cache kept for the whole import) for the given names,
+    creating missing labels with one multi-row INSERT. Commits on its own so later batch
+    failures never roll back labels other rows already point to. Returns how many were created.
+    """
+    missing = {name for name in names if name not in label_ids}
+    if not missing:
+        return 0
+
+    for label_id, name in db.execute(select(models.Label.id, models.Label.name).where(models.Label.name.in_(missing))):
+        label_ids[name] = label_id
+    to_create = sorted(name for name in missing if name not in label_ids)
+    if not to_create:
+        return 0
+
+    created = 0
+    try:
+        db.execute(insert(models.Label), [{"name": name} for name in to_create])
+        db.commit()
+        created = len(to_create)
+    except IntegrityError:
+        # Someone created one of them concurrently: fall back to one insert per label
+        db.rollback()
+        for name in to_create:
+            try:
+                db.execute(insert(models.Label), [{"name": name}])
+                db.commit()
+                created += 1
+            except IntegrityError:
+                db.rollback()
+
+    for label_id, name in db.execute(select(models.Label.id, models.Label.name).where(models.Label.name.in_(to_create))):
+        label_ids[name] = label_id
+    return created
+
+
+def _insert_prompts(db: Session, values: List[Dict[str, Any]]) -> List[int]:
+    """
+    Inserts the prompt rows with one multi-row INSERT and returns their ids in input order.
+    Auto-increment ids are assigned in VALUES order, so where the dialect has INSERT..RETURNING
+    (SQLite, MariaDB, PostgreSQL) the sorted returned ids line up with the rows. (RETURNING with
+    sort_by_parameter_order would make SQLAlchemy fall back to one INSERT per row on SQLite.)
+    On MySQL the ids are LAST_INSERT_ID() onwards; they are consecutive unless InnoDB interleaves
+    concurrent inserts (innodb_autoinc_lock_mode=2), so they are checked against the content
+    hashes, and a mismatch fails the batch, which is then retried one row at a time.
+    """
+    dialect = db.get_bind().dialect
+    prompts = models.Prompt.__table__
+    if dialect.insert_returning:
+        return sorted(db.execute(insert(prompts).values(values).returning(prompts.c.id)).scalars())
+    if dialect.name != "mysql":
+        return [db.execute(insert(prompts).values(row)).inserted_primary_key[0] for row in values]
+
+    first_id = db.execute(insert(prompts).values(values)).lastrowid
+    if len(values) == 1:
+        return [first_id]
+    inserted = db.execute(
+        select(prompts.c.id, prompts.c.content_hash)
+        .where(prompts.c.id.between(first_id, first_id + len(values) - 1), prompts.c.user_id == values[0]["user_id"])
+        .order_by(prompts.c.id)
+    ).all()
+    if [row.content_hash for row in inserted] != [row["content_hash"] for row in values]:
+        raise SQLAlchemyError("bulk insert ids are not consecutive")
+    return [row.id for row in inserted]
+
+
+def _insert_rows(db: Session, rows: List[Tuple[int, PromptImportRow]], user_id: int, label_ids: Dict[str, int]):
+    """Inserts prompts and their label associations for 'rows' (no commit)."""
+    prompt_ids = _insert_prompts(db, [
+        {**row.model_dump(exclude={"labels"}), "user_id": user_id, "content_hash": content_hash(row.content)}
+        for _, row in rows
+    ])
+
+    associations = [
+        {"prompt_id": prompt_id, "label_id": label_ids[name]}
+        for prompt_id, (_, row) in zip(prompt_ids, rows)
+        for name in row.labels
+    ]
+    if associations:
+        db.execute(insert(models.PromptLabel), associations)
+
+
+def import_prompts(
+    db: Session,
+    rows: Iterable[RawRow],
+    user_id: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_errors: int = MAX_REPORTED_ERRORS,
+) -> PromptImportReport:
+    """
+    Imports parsed rows (see parse_import_file) as prompts owned by 'user_id',
+    committing once per 'batch_size' rows. Returns a PromptImportReport.
+    """
+    builder = _ReportBuilder(max_errors)
+    label_ids: Dict[str, int] = {}
+
+    for batch in _batched(rows, batch_size):
+        valid: List[Tuple[int, PromptImportRow]] = []
+        for line, raw in batch:
+            builder.report.total_rows += 1
+            if isinstance(raw, str):
+                builder.fail(line, raw)
+                continue
+            if not isinstance(raw, dict):
+                builder.fail(line, "row must be a JSON object")
+                continue
+            try:
+                valid.append((line, PromptImportRow.model_validate(raw)))
+            except ValidationError as e:
+                builder.fail(line, _error_text(e))
+
+        if not valid:
+            continue
+
+        try:
+            builder.report.labels_created += _resolve_labels(
+                db, {name for _, row in valid for name in row.labels}, label_ids
+            )
+        except SQLAlchemyError as e:
+            db.rollback()
+            for line, _ in valid:
+                builder.fail(line, f"could not create labels: {e.__class__.__name__}")
+            continue
+
+        resolvable = []
+        for line, row in valid:
+            unknown = [name for name in row.labels if name not in label_ids]
+            if unknown:
+                builder.fail(line, f"could not create labels: {', '.join(unknown)}")
+            else:
+                resolvable.append((line, row))
+
+        try:
+            _insert_rows(db, resolvable, user_id, label_ids)
+            db.commit()
+            builder.report.imported += len(resolvable)
+        except SQLAlchemyError:
+            # Isolate the offending row(s): retry the batch one row per transaction
+            db.rollback()
+            for line, row in resolvable:
+                try:
+                    _insert_rows(db, [(line, row)], user_id, label_ids)
+                    db.commit()
+                    builder.report.imported += 1
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    builder.fail(line, f"database error: {e.__class__.__name__}")
+
+    return builder.report
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.database.database import PrimarySessionLocal
+
+    parser = argparse.ArgumentParser(description="Bulk import prompts from a JSONL or CSV file.")
+    parser.add_argument("path")
+    parser.add_argument("--user-id", type=int, required=True, help="Owner of the imported prompts.")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to the file extension.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    import_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "jsonl")
+    db = PrimarySessionLocal()
+    try:
+        if db.get(models.User, args.user_id) is None:
+            parser.error(f"user {args.user_id} does not exist")
+        with open(args.path, "rb") as stream:
+            report = import_prompts(db, parse_import_file(stream, import_format), args.user_id, args.batch_size)
+    finally:
+        db.close()
+    print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
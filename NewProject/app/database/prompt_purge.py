@@ -0,0 +1,94 @@
+# my_fastapi_angular_backend/app/database/prompt_purge.py
+"""
+Hard-deletes soft-deleted prompts.
+
+Deleting a prompt only sets 'deleted_at' (crud.soft_delete_prompt), which is one cheap UPDATE on
+the request path. This job removes prompts deleted more than PROMPT_PURGE_AFTER_DAYS ago together
+with their likes, comments and label links, in batches of PROMPT_PURGE_BATCH_SIZE prompts with one
+commit per batch, so no single transaction locks a large part of the tables.
+
+Run it periodically (e.g. from cron):
+    python -m app.database.prompt_purge --older-than-days 7
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import models
+
+
+def _deleted_prompt_ids(db: Session, cutoff: datetime, batch_size: int) -> List[int]:
+    stmt = select(models.Prompt.id)\
+        .where(models.Prompt.deleted_at.is_not(None), models.Prompt.deleted_at < cutoff)\
+        .order_by(models.Prompt.deleted_at)\
+        .limit(batch_size)\
+        .execution_options(include_deleted=True)
+    return list(db.execute(stmt).scalars())
+
+
+def hard_delete_prompts(db: Session, prompt_ids: List[int]) -> dict:
+    """
+    Deletes the given prompts with their likes, label links and comments, one statement per table.
+    Does not commit. Returns the number of rows deleted per table.
+    """
+    # Children first: the foreign keys have no ON DELETE CASCADE (except replies -> parent)
+    likes = db.execute(
+        delete(models.PromptLike).where(models.PromptLike.prompt_id.in_(prompt_ids))).rowcount
+    labels = db.execute(
+        delete(models.PromptLabel).where(models.PromptLabel.prompt_id.in_(prompt_ids))).rowcount
+    # One statement for the whole batch: replies go with their parents (parent_id cascades)
+    comments = db.execute(
+        delete(models.PromptComment).where(models.PromptComment.prompt_id.in_(prompt_ids))
+        .execution_options(synchronize_session=False)).rowcount
+    prompts = db.execute(
+        delete(models.Prompt).where(models.Prompt.id.in_(prompt_ids))
+        .execution_options(synchronize_session=False)).rowcount
+    return {"prompts": prompts, "likes": likes, "comments": comments, "labels": labels}
+
+
+def purge_deleted_prompts(
+        db: Session,
+        older_than_days: int = settings.PROMPT_PURGE_AFTER_DAYS,
+        batch_size: int = settings.PROMPT_PURGE_BATCH_SIZE,
+        max_batches: Optional[int] = None,
+) -> dict:
+    """
+    Deletes prompts soft-deleted before now - older_than_days, batch by batch, until none are
+    left (or max_batches batches ran). Returns how many prompts and dependent rows were removed.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    summary = {"cutoff": cutoff.isoformat(), "prompts": 0, "likes": 0, "comments": 0, "labels": 0, "batches": 0}
+    while max_batches is None or summary["batches"] < max_batches:
+        prompt_ids = _deleted_prompt_ids(db, cutoff, batch_size)
+        if not prompt_ids:
+            break
+        for table, count in hard_delete_prompts(db, prompt_ids).items():
+            summary[table] += count
+        db.commit()
+        summary["batches"] += 1
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.database.database import PrimarySessionLocal
+
+    parser = argparse.ArgumentParser(description="Hard-delete soft-deleted prompts in batches.")
+    parser.add_argument("--older-than-days", type=int, default=settings.PROMPT_PURGE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.PROMPT_PURGE_BATCH_SIZE)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    db = PrimarySessionLocal()
+    try:
+        print(json.dumps(purge_deleted_prompts(db, args.older_than_days, args.batch_size, args.max_batches)))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
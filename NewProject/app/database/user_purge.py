@@ -0,0 +1,139 @@
+# my_fastapi_angular_backend/app/database/user_purge.py
+"""
+Removes deleted user accounts in the background.
+
+Deleting an account (crud.delete_user) only marks the user: is_active = False, deleted_at = now,
+tokens revoked, admin rights dropped. That is a few single-row statements, so the request
+returns at once. purge_user() then removes everything the user owns with bulk DELETE statements,
+in batches of USER_PURGE_BATCH_SIZE rows and one commit per batch, so no transaction holds locks
+for long:
+
+    likes given -> comments written (with the replies below them) -> prompts (with their likes,
+    comments and labels) -> refresh tokens -> the user row
+
+The routes enqueue it as a 'purge_user' job (app/core/jobs.py), which retries on failure.
+Every step is safe to repeat. Accounts still marked (deleted_at) can also be finished by hand:
+    python -m app.database.user_purge
+"""
+import argparse
+import json
+import logging
+from typing import Callable, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database import crud, models
+from app.database.prompt_purge import hard_delete_prompts
+
+logger = logging.getLogger("my_fastapi_app")
+
+
+def _log_progress(summary: dict):
+    logger.info("Purging user %s: %s", summary["user_id"], summary)
+
+
+def purge_user(
+        db: Session,
+        user_id: int,
+        batch_size: int = settings.USER_PURGE_BATCH_SIZE,
+        progress: Optional[Callable[[dict], None]] = _log_progress,
+) -> dict:
+    """
+    Deletes a user marked for deletion and everything they own, batch by batch. 'progress' is
+    called with the running totals after every committed batch. Returns the totals.
+    A user that no longer exists is done already (a repeated job). A user that exists but is
+    not marked raises RuntimeError and is left alone: the job is retried, as the mark may not be
+    visible yet.
+    """
+    summary = {"user_id": user_id, "likes": 0, "comments": 0, "prompts": 0, "prompt_likes": 0,
+               "prompt_comments": 0, "prompt_labels": 0, "refresh_tokens": 0, "done": False}
+    user = db.execute(select(models.User.deleted_at).where(models.User.id == user_id)).first()
+    if user is None:
+        summary["done"] = True
+        return summary
+    if user.deleted_at is None:
+        raise RuntimeError(f"User {user_id} is not marked for deletion")
+
+    def batch_done():
+        db.commit()
+        if progress is not None:
+            progress(dict(summary))
+
+    # Likes the user gave
+    while True:
+        like_ids = list(db.execute(
+            select(models.PromptLike.id).where(models.PromptLike.user_id == user_id).limit(batch_size)
+        ).scalars())
+        if not like_ids:
+            break
+        summary["likes"] += db.execute(
+            delete(models.PromptLike).where(models.PromptLike.id.in_(like_ids))).rowcount
+        batch_done()
+
+    # Comments the user wrote, shallowest first: deleting one removes the replies below it too
+    while True:
+        comments = db.query(models.PromptComment)\
+            .filter(models.PromptComment.user_id == user_id)\
+            .order_by(models.PromptComment.depth, models.PromptComment.comment_id)\
+            .limit(batch_size).execution_options(include_deleted=True).all()
+        if not comments:
+            break
+        deleted_paths = set()
+        for comment in comments:
+            path = comment.path or ""
+            ancestors = {(comment.prompt_id, path[:i + 1]) for i, char in enumerate(path) if char == "/"}
+            if ancestors & deleted_paths:
+                continue  # already gone with an earlier comment's subtree in this batch
+            summary["comments"] += crud.delete_comment_subtree(db, comment)
+            deleted_paths.add((comment.prompt_id, path))
+        db.expunge_all()
+        batch_done()
+
+    # The user's prompts, live and soft-deleted, with everything attached to them
+    while True:
+        prompt_ids = list(db.execute(
+            select(models.Prompt.id).where(models.Prompt.user_id == user_id).limit(batch_size)
+            .execution_options(include_deleted=True)
+        ).scalars())
+        if not prompt_ids:
+            break
+        removed = hard_delete_prompts(db, prompt_ids)
+        summary["prompts"] += removed["prompts"]
+        summary["prompt_likes"] += removed["likes"]
+        summary["prompt_comments"] += removed["comments"]
+        summary["prompt_labels"] += removed["labels"]
+        batch_done()
+
+    summary["refresh_tokens"] = db.execute(
+        delete(models.RefreshToken).where(models.RefreshToken.user_id == user_id)).rowcount
+    db.execute(delete(models.AdminUser).where(models.AdminUser.user_id == user_id))
+    db.execute(delete(models.User).where(models.User.id == user_id))
+    summary["done"] = True
+    batch_done()
+    return summary
+
+
+def pending_user_ids(db: Session) -> List[int]:
+    """Users marked for deletion whose data has not been removed yet."""
+    return list(db.execute(select(models.User.id).where(models.User.deleted_at.is_not(None))).scalars())
+
+
+def main(argv: Optional[List[str]] = None):
+    from app.database.database import PrimarySessionLocal
+
+    parser = argparse.ArgumentParser(description="Finish deleting user accounts marked for deletion.")
+    parser.add_argument("--batch-size", type=int, default=settings.USER_PURGE_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    db = PrimarySessionLocal()
+    try:
+        for user_id in pending_user_ids(db):
+            print(json.dumps(purge_user(db, user_id, args.batch_size, progress=lambda s: print(json.dumps(s)))))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# my_fastapi_angular_backend_v2/app/schemas/audit.py
+
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+# Schema for a single audit log row returned to administrators
+class AuditLogResponse(BaseModel):
+    id: int
+    timestamp: datetime
+    endpoint: str
+    ip_address: str
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+# One page of audit logs. Pass 'next_cursor' back as ?cursor= to get the next (older) page;
+# it is None on the last page.
+class AuditLogPage(BaseModel):
+    items: List[AuditLogResponse]
+    next_cursor: Optional[str] = None
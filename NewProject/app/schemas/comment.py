@@ -11,7 +11,7 @@ class CommentBase(BaseModel):
 # Schema for creating a new comment (input for POST requests)
 class CommentCreate(CommentBase):
     # prompt_id and user_id will come from the URL path and authentication token respectively
-    pass
+    parent_id: Optional[int] = None # Set to reply to another comment of the same prompt
 
 # Schema for updating a comment (only content can be updated)
 class CommentUpdate(BaseModel):
@@ -23,6 +23,9 @@ class CommentResponse(CommentBase):
     prompt_id: int
     user_id: int
     created_at: datetime
+    parent_id: Optional[int] = None
+    depth: int = 0 # 0 for top-level comments
+    reply_count: int = 0 # Replies in the whole subtree below this comment
     # We will manually populate this in the router to avoid N+1 issues
     author_username: Optional[str] = None # To display the username of the comment's author
 
@@ -0,0 +1,30 @@
+# my_fastapi_angular_backend/app/schemas/job.py
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Json
+
+# A background job as shown to administrators (payload/result are stored as JSON text)
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    payload: Json[Any]
+    status: str
+    attempts: int
+    max_attempts: int
+    run_after: datetime
+    locked_by: Optional[str] = None
+    last_error: Optional[str] = None
+    result: Optional[Json[Any]] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Input for POST /admin/jobs
+class JobCreate(BaseModel):
+    kind: str
+    payload: Dict[str, Any] = {}
+    delay_seconds: float = 0
@@ -1,7 +1,7 @@
 # my_fastapi_angular_backend_v2/app/schemas/prompt.py
 
-from pydantic import BaseModel, Field # Import Field for optional default values
-from typing import Optional # For optional fields
+from pydantic import BaseModel, Field, field_validator # Import Field for optional default values
+from typing import Optional, List # For optional fields
 from datetime import datetime # For datetime fields in responses
 
 # --- Base Schema for Prompt properties common to creation and public view ---
@@ -22,6 +22,7 @@ class PromptPublic(PromptBase):
     user_id: int # ID of the author
     author_username: Optional[str] = None # Will be populated via relationship, not direct DB column
     no_of_likes: int = 0 # Will be populated by a query or ORM relationship, not direct DB column
+    comment_count: int = 0 # Maintained column on prompts, kept up to date on comment create/delete
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -34,6 +35,12 @@ class PromptWithLikeStatus(PromptPublic):
     class Config:
         from_attributes = True
 
+# --- Duplicate detection (app/database/prompt_dedup.py) ---
+class PromptDuplicateGroup(BaseModel):
+    content_hash: str
+    count: int
+    prompt_ids: List[int]
+
 # --- Schema for liking/unliking a Prompt (input for POST /prompts/{prompt_id}/like) ---
 class PromptLikeCreate(BaseModel):
     # This schema is simple, usually just takes prompt_id from path
@@ -49,3 +56,42 @@ class PromptLikePublic(BaseModel):
     class Config:
         from_attributes = True
 
+
+# --- Schemas for bulk prompt import (POST /admin/import/prompts and the CLI) ---
+class PromptImportRow(PromptCreate):
+    """One row of an import file: a PromptCreate plus the names of labels to attach."""
+    labels: List[str] = []
+
+    @field_validator("labels", mode="before")
+    @classmethod
+    def split_labels(cls, value):
+        # CSV files carry labels as a single "a|b|c" cell
+        if isinstance(value, str):
+            value = value.split("|")
+        return value
+
+    @field_validator("labels")
+    @classmethod
+    def clean_labels(cls, value: List[str]) -> List[str]:
+        names = []
+        for name in value:
+            name = name.strip()
+            if not name:
+                continue
+            if len(name) > 50:
+                raise ValueError(f"label '{name[:20]}...' is longer than 50 characters")
+            if name not in names:
+                names.append(name)
+        return names
+
+class PromptImportError(BaseModel):
+    line: int # 1-based line number in the uploaded file
+    error: str
+
+class PromptImportReport(BaseModel):
+    total_rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    labels_created: int = 0
+    errors: List[PromptImportError] = [] # capped, see 'errors_truncated'
+    errors_truncated: bool = False
@@ -16,6 +16,13 @@ class Token(AccessToken):
     """
     pass
 
+class TokenPair(Token):
+    """Access token plus the refresh token that renews it (POST /auth/refresh)."""
+    refresh_token: str
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class TokenPayload(BaseModel):
     """
     Schema for the data expected within the JWT payload.
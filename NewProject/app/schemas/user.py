@@ -30,6 +30,7 @@ class UserInDB(UserBase):
     is_active: bool
     totp_enabled: bool = False
     totp_secret: Optional[str] = None
+    is_admin: bool = False # Loaded with the user by get_current_user (see app/core/permissions.py)
 
     class Config:
         # Important for Pydantic V2 to work with ORM models.
@@ -1,11 +1,19 @@
 # my_fastapi_angular_backend/main.py
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware # Important for Angular frontend
 
 from app.api.Rooters import labels
 # Import necessary database components for table creation
 from app.database.database import Base, engine
+from app.database.audit_maintenance import ensure_audit_partitions
+from app.api.compression import CompressionMiddleware
+from app.api.rate_limiting import RateLimitMiddleware
+from app.api.serialization import FastJSONResponse
+from app.core.config import settings
+from app.core import jobs
 
 # Import the authentication router from your endpoints file
 from app.api.enpoints import router as auth_router
@@ -19,14 +27,38 @@ from app.api.Rooters.totpy import router as totp_router
 # It's suitable for development as it ensures tables exist.
 # In a production environment, you would typically use Alembic for migrations.
 Base.metadata.create_all(bind=engine)
+# Keep the upcoming monthly audit_logs partitions in place (no-op outside MySQL).
+ensure_audit_partitions(engine)
+
+# --- Background job workers ---
+# Started with the app and stopped on shutdown (see app/core/jobs.py); JOB_WORKERS=0 leaves
+# the jobs to a separate 'python -m app.core.jobs' process.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.JOB_WORKERS > 0:
+        jobs.worker.start()
+    yield
+    jobs.worker.stop()
 
 # --- FastAPI Application Setup ---
 app = FastAPI(
     title="FastAPI Auth API Backend for Angular",
     description="A pure API backend for an Angular application, with user authentication and MySQL.",
     version="0.1.0",
+    lifespan=lifespan,
+    # orjson (when installed) for every JSON response, not only the list endpoints
+    default_response_class=FastJSONResponse,
 )
 
+# --- Rate Limiting ---
+# Added before CORS so that CORS (the outer middleware) also decorates 429 responses.
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        default_rate=settings.RATE_LIMIT_DEFAULT,
+        policies=settings.RATE_LIMIT_POLICIES,
+    )
+
 # --- CORS Middleware ---
 # This is CRUCIAL when your frontend (Angular) is served from a different origin
 # (e.g., Angular on http://localhost:4200 and FastAPI on http://localhost:8000).
@@ -46,6 +78,18 @@ app.add_middleware(
     allow_headers=["*"], # Allows all headers (including Authorization header for JWT)
 )
 
+# --- Response Compression ---
+# gzip (brotli/zstd when installed) for JSON bodies above COMPRESSION_MIN_SIZE.
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+    zstd_level=settings.ZSTD_LEVEL,
+    cache_entries=settings.COMPRESSION_CACHE_ENTRIES,
+    cache_max_body=settings.COMPRESSION_CACHE_MAX_BODY,
+)
+
 # --- Include API Routers ---
 # This includes the authentication-related endpoints from app/api/endpoints.py
 # All routes defined in that router will be prefixed with "/auth"